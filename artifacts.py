@@ -0,0 +1,170 @@
+# artifacts.py
+
+import argparse
+import json
+import os
+import threading
+
+import numpy as np
+
+# Artifact names shared by the exporters, the online trainer and the loaders.
+COST_ARTIFACT = "cost_model"
+MAKER_TAKER_ARTIFACT = "maker_taker"
+IMPACT_ARTIFACT = "impact"
+
+
+def impact_artifact_name(key):
+    """Artifact name of the calibrated impact parameters for a ``venue:symbol`` key."""
+    return f"{IMPACT_ARTIFACT}.{key.replace(':', '_').replace(os.sep, '_')}"
+
+
+def _pointer_path(directory, name):
+    return os.path.join(directory, f"{name}.latest")
+
+
+def _version_of(path):
+    return int(os.path.basename(path).rsplit(".v", 1)[1].split(".")[0])
+
+
+def latest_version(directory, name):
+    """Version number the ``<name>.latest`` pointer refers to (0 if none)."""
+    path = latest_artifact(directory, name)
+    return 0 if path is None else _version_of(path)
+
+
+def latest_artifact(directory, name):
+    """Path of the newest published artifact, or None."""
+    try:
+        with open(_pointer_path(directory, name)) as f:
+            filename = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(directory, filename) if filename else None
+
+
+def find_artifact(path, name):
+    """
+    Resolve ``path`` to an artifact file: an ``.npz`` file is returned as
+    is, a directory resolves to its latest ``name`` artifact. Returns None
+    for anything else (e.g. a legacy pickle).
+    """
+    if os.path.isdir(path):
+        return latest_artifact(path, name)
+    if path.endswith(".npz"):
+        return path
+    return None
+
+
+def _atomic_write(path, write):
+    tmp = f"{path}.tmp{os.getpid()}"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def publish_artifact(directory, name, arrays, meta=None, keep=5):
+    """
+    Write ``arrays`` as ``<name>.vNNNNNN.npz`` and move the ``<name>.latest``
+    pointer to it. Both steps are atomic renames, so a reader sees either
+    the old version or the new one, never a partial file. Only the newest
+    ``keep`` versions are kept on disk.
+    Returns the new version number.
+    """
+    os.makedirs(directory, exist_ok=True)
+    version = latest_version(directory, name) + 1
+    filename = f"{name}.v{version:06d}.npz"
+    meta = dict(meta or {}, name=name, version=version)
+    payload = dict(arrays, __meta__=np.array(json.dumps(meta)))
+
+    def write_npz(tmp):
+        with open(tmp, "wb") as f:
+            np.savez(f, **payload)
+
+    def write_pointer(tmp):
+        with open(tmp, "w") as f:
+            f.write(filename)
+
+    _atomic_write(os.path.join(directory, filename), write_npz)
+    _atomic_write(_pointer_path(directory, name), write_pointer)
+    stale = os.path.join(directory, f"{name}.v{version - keep:06d}.npz")
+    if version > keep and os.path.exists(stale):
+        os.remove(stale)
+    return version
+
+
+def load_artifact(path):
+    """Return ``(arrays, meta)`` for an artifact written by publish_artifact."""
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {k: data[k] for k in data.files if k != "__meta__"}
+        meta = json.loads(str(data["__meta__"])) if "__meta__" in data.files else {}
+    return arrays, meta
+
+
+def _export(cost_path, maker_taker_path, directory):
+    # Imported here: exporting needs the pickled models (and so sklearn),
+    # loading the result does not.
+    from cost_model import CostRegressionModel
+    from models import ModelManager
+
+    if cost_path:
+        model = CostRegressionModel(cost_path)
+        version = model.export(directory)
+        print(f"📦 {cost_path} -> {COST_ARTIFACT} v{version}")
+    if maker_taker_path:
+        manager = ModelManager(maker_taker_path)
+        version = manager.export(directory)
+        print(f"📦 {maker_taker_path} -> {MAKER_TAKER_ARTIFACT} v{version}")
+
+
+class ArtifactWatcher:
+    """
+    Background thread that polls ``<name>.latest`` and calls
+    ``on_update(arrays, meta)`` whenever a newer version is published.
+
+    Loading happens on this thread; ``on_update`` should only swap a
+    reference so the tick path never waits on disk or deserialisation.
+    """
+
+    def __init__(self, directory, name, on_update, interval=1.0, load_existing=True):
+        self.directory = directory
+        self.name = name
+        self.on_update = on_update
+        self.interval = interval
+        self.version = 0 if load_existing else latest_version(directory, name)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"watch-{name}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self.poll()
+            if self._stop.wait(self.interval):
+                return
+
+    def poll(self):
+        path = latest_artifact(self.directory, self.name)
+        if path is None or _version_of(path) <= self.version:
+            return
+        try:
+            arrays, meta = load_artifact(path)
+        except (OSError, ValueError) as e:
+            print(f"[⚠️ Artifact load error] {path}: {e}")
+            return
+        self.version = _version_of(path)
+        self.on_update(arrays, meta)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export pickled models as versioned npz artifacts.")
+    parser.add_argument("--cost", default="cost_model.pkl", help="cost regression pickle ('' to skip)")
+    parser.add_argument("--maker-taker", default="maker_taker_model.pkl", help="maker/taker pickle ('' to skip)")
+    parser.add_argument("--out", default="models", help="artifact directory")
+    args = parser.parse_args()
+    _export(args.cost, args.maker_taker, args.out)
+
+
+if __name__ == "__main__":
+    main()
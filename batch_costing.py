@@ -0,0 +1,208 @@
+# batch_costing.py
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from estimators import MarketStats
+from orderbook import OrderBook
+from pricing import DEFAULT_FEE_TIER, FEE_TIERS, IMPACT_PARAMS, load_impact_params, quote_costs
+
+RESULT_COLUMNS = ["exec_price", "filled", "slippage", "fees", "impact", "net_cost", "maker_taker", "predicted_cost"]
+
+
+def read_orders(path, chunksize=100_000):
+    """
+    Yield DataFrame chunks of an order file (CSV or Parquet, by extension).
+
+    Needs columns ``side`` and ``quantity``; optional ``order_price``,
+    ``fee_tier`` or ``fee_rate``, ``volatility`` and ``time_of_day``.
+    """
+    if path.endswith((".parquet", ".pq")):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Reading Parquet needs pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path if path != "-" else sys.stdin, chunksize=chunksize)
+
+
+def book_from_snapshot(path):
+    """OrderBook and MarketStats from one JSON L2 snapshot."""
+    with open(path) as f:
+        data = json.load(f)
+    book = OrderBook()
+    book.apply(data)
+    return book, MarketStats()
+
+
+def book_from_replay(path, at_ts_ns=None):
+    """
+    OrderBook as of ``at_ts_ns`` (default: end of log) rebuilt from a
+    replay.FrameLog, with MarketStats fed from every frame on the way.
+    """
+    from replay import FrameLog
+
+    log = FrameLog(path)
+    stop = log.seek(at_ts_ns + 1) if at_ts_ns is not None else len(log)
+    book = OrderBook()
+    stats = MarketStats()
+    for ts, frame in log.iter_frames(0, stop):
+        book.apply(json.loads(frame))
+        if book.is_ready():
+            stats.update(float(book.bid_px[0]), float(book.ask_px[0]), ts / 1e9)
+    return book, stats
+
+
+def cost_chunk(chunk, book, volatility=0.02, cost_model=None, model_manager=None, fee_tier=DEFAULT_FEE_TIER,
+               impact_params=IMPACT_PARAMS):
+    """Cost one DataFrame of orders; returns it with RESULT_COLUMNS appended."""
+    if "fee_rate" in chunk:
+        fee = chunk["fee_rate"].to_numpy(dtype=float)
+    elif "fee_tier" in chunk:
+        fee = chunk["fee_tier"].map(FEE_TIERS).to_numpy(dtype=float)
+        if np.isnan(fee).any():
+            unknown = sorted(set(chunk["fee_tier"][np.isnan(fee)].astype(str)))
+            raise ValueError(f"Unknown fee tiers {unknown}; expected one of {list(FEE_TIERS)}")
+    else:
+        fee = FEE_TIERS[fee_tier]
+
+    side = np.char.lower(np.char.strip(chunk["side"].to_numpy(dtype=str)))
+    bad = ~np.isin(side, ("buy", "sell"))
+    if bad.any():
+        unknown = sorted({str(s) for s in chunk["side"][bad]})
+        raise ValueError(f"Unknown sides {unknown}; side must be 'Buy' or 'Sell'")
+
+    quantity = pd.to_numeric(chunk["quantity"], errors="coerce").to_numpy(dtype=float)
+    bad = ~(np.isfinite(quantity) & (quantity > 0))
+    if bad.any():
+        rows = chunk.index[bad].tolist()
+        raise ValueError(f"{len(rows)} orders without a positive quantity (rows {rows[:10]}); "
+                         "quantity must be positive")
+
+    order_price = None
+    if "order_price" in chunk:
+        order_price = chunk["order_price"].to_numpy(dtype=float)
+        order_price = np.where(np.isnan(order_price), book.mid(), order_price)
+
+    quote = quote_costs(
+        book,
+        side,
+        quantity,
+        order_price,
+        fee=fee,
+        volatility=chunk["volatility"].to_numpy(dtype=float) if "volatility" in chunk else volatility,
+        time_of_day=chunk["time_of_day"].to_numpy(dtype=float) if "time_of_day" in chunk else None,
+        cost_model=cost_model,
+        model_manager=model_manager,
+        impact_params=impact_params,
+    )
+    out = chunk.copy()
+    for name in RESULT_COLUMNS:
+        out[name] = quote[name]
+    out["maker_taker"] = np.select([quote["maker_taker"] == 1, quote["maker_taker"] == 0], ["maker", "taker"], "")
+    return out
+
+
+def cost_orders(chunks, book, volatility=0.02, cost_model=None, model_manager=None, fee_tier=DEFAULT_FEE_TIER,
+                impact_params=IMPACT_PARAMS):
+    """Lazily cost an iterable of order chunks; yields costed chunks."""
+    for chunk in chunks:
+        yield cost_chunk(chunk, book, volatility, cost_model, model_manager, fee_tier, impact_params)
+
+
+class ResultWriter:
+    """
+    Streams costed chunks to CSV (``-`` for stdout) or Parquet, so only one
+    chunk is ever held in memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._parquet = path.endswith((".parquet", ".pq"))
+        self._writer = None
+        self._file = None
+
+    def write(self, chunk):
+        if self._parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            if self._file is None:
+                self._file = sys.stdout if self.path == "-" else open(self.path, "w", newline="")
+            chunk.to_csv(self._file, header=self.rows == 0, index=False)
+            self._file.flush()
+        self.rows += len(chunk)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None and self._file is not sys.stdout:
+            self._file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost a file of hypothetical orders against an order book.")
+    parser.add_argument("orders", help="CSV or Parquet with side, quantity[, order_price, fee_tier, ...]")
+    parser.add_argument("--out", default="-", help="CSV or Parquet output ('-' for stdout)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--book", help="JSON L2 snapshot to cost against")
+    source.add_argument("--replay", help="replay.py capture to rebuild the book from")
+    parser.add_argument("--at", type=float, default=None, help="book time in the capture, unix seconds")
+    parser.add_argument("--volatility", type=float, default=None,
+                        help="override sigma (default: estimated from the capture, else 0.02)")
+    parser.add_argument("--fee-tier", default=DEFAULT_FEE_TIER, choices=list(FEE_TIERS))
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--cost-model", default="cost_model.pkl", help="pickle, npz artifact or artifact dir")
+    parser.add_argument("--models", default="maker_taker_model.pkl", help="maker/taker pickle, artifact or dir")
+    parser.add_argument("--impact", default=None, help="artifact dir with calibrated impact parameters")
+    args = parser.parse_args()
+
+    from cost_model import CostRegressionModel
+    from models import ModelManager
+
+    if args.book:
+        book, stats = book_from_snapshot(args.book)
+    else:
+        book, stats = book_from_replay(args.replay, int(args.at * 1e9) if args.at is not None else None)
+    if not book.is_ready():
+        parser.error("the order book is empty")
+    volatility = args.volatility if args.volatility is not None else stats.sigma
+    impact_params, version = load_impact_params(args.impact, f"{book.exchange}:{book.symbol}")
+    if version:
+        print(f"📐 Calibrated impact v{version}: eta={impact_params['eta']:.4g} gamma={impact_params['gamma']:.4g}",
+              file=sys.stderr)
+
+    # Keep model-loading chatter out of the results when streaming to stdout.
+    with contextlib.redirect_stdout(sys.stderr):
+        cost_model = CostRegressionModel(args.cost_model) if os.path.exists(args.cost_model) else None
+        model_manager = ModelManager(args.models) if os.path.exists(args.models) else None
+
+    writer = ResultWriter(args.out)
+    start = time.perf_counter()
+    try:
+        for chunk in cost_orders(read_orders(args.orders, args.chunksize), book, volatility,
+                                 cost_model, model_manager, args.fee_tier, impact_params):
+            writer.write(chunk)
+            elapsed = time.perf_counter() - start
+            print(f"⏱️ {writer.rows:,} orders costed ({writer.rows / elapsed:,.0f}/s)", file=sys.stderr)
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
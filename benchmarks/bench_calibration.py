@@ -0,0 +1,55 @@
+# benchmarks/bench_calibration.py
+#
+# Usage: python -m benchmarks.bench_calibration
+#
+# Calibrates impact parameters on a synthetic capture (10 frames/s) and
+# extrapolates the wall time to a 30-day capture at the same frame rate.
+
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_frame
+from replay import FrameRecorder
+
+MONTH_S = 30 * 86400
+
+
+def write_capture(path, n_frames, depth=100, frames_per_sec=10, seed=0):
+    rng = np.random.default_rng(seed)
+    mids = 60000.0 + np.cumsum(rng.normal(0, 2.0, n_frames))
+    recorder = FrameRecorder(path)
+    t0 = time.time_ns()
+    step = int(1e9 / frames_per_sec)
+    for i, mid in enumerate(mids):
+        recorder.write(json.dumps(make_frame(rng, mid, depth)), t0 + i * step)
+    recorder.close()
+    return n_frames / frames_per_sec
+
+
+def run(n_frames=50_000, workers=None, sample_interval=1.0):
+    from calibration import calibrate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        capture = os.path.join(tmp, "cap", "BTC-USDT-SWAP")
+        seconds = write_capture(capture, n_frames)
+        start = time.perf_counter()
+        results = calibrate([capture], out=os.path.join(tmp, "models"), workers=workers,
+                            sample_interval=sample_interval)
+        elapsed = time.perf_counter() - start
+
+    eta = next(iter(results.values()))["eta"] if results else float("nan")
+    return {
+        "frames_per_sec": n_frames / elapsed,
+        "capture_seconds_per_sec": seconds / elapsed,
+        "projected_month_min": MONTH_S / (seconds / elapsed) / 60,
+        "eta": eta,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>24}: {value:,.4f}")
@@ -0,0 +1,84 @@
+# benchmarks/bench_cost_model.py
+#
+# Usage: python -m benchmarks.bench_cost_model
+
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from cost_model import CostRegressionModel, FEATURES
+
+
+def make_training_frame(n=2000, seed=3):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "quantity": rng.uniform(0.1, 200, n),
+        "price": rng.normal(60000, 500, n),
+        "side": rng.integers(0, 2, n),
+        "volatility": rng.uniform(1e-5, 1e-3, n),
+        "time_of_day": rng.uniform(0, 1, n),
+    })
+    cost = 0.0008 * df.quantity * df.price / 1000 + 5e4 * df.volatility + rng.normal(0, 0.1, n)
+    return df, cost
+
+
+def write_model(path):
+    df, cost = make_training_frame()
+    with open(path, "wb") as f:
+        pickle.dump(LinearRegression().fit(df[FEATURES], cost), f)
+
+
+def legacy_predict(model, quantity, price, side, volatility, time_of_day):
+    """The pre-batching implementation: one DataFrame per call."""
+    side_encoded = 1 if side.lower() == "buy" else 0
+    features = pd.DataFrame([[quantity, price, side_encoded, volatility, time_of_day]],
+                            columns=FEATURES)
+    return model.predict(features)[0]
+
+
+def run(n_rows=100000, n_legacy=500):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cost_model.pkl")
+        write_model(path)
+        model = CostRegressionModel(path)
+
+    rng = np.random.default_rng(0)
+    q = rng.uniform(0.1, 200, n_rows)
+    p = rng.normal(60000, 500, n_rows)
+    s = np.where(rng.random(n_rows) < 0.5, "Buy", "Sell")
+    v = rng.uniform(1e-5, 1e-3, n_rows)
+    t = rng.uniform(0, 1, n_rows)
+
+    start = time.perf_counter()
+    for i in range(n_legacy):
+        legacy_predict(model.model, q[i], p[i], s[i], v[i], t[i])
+    legacy_rate = n_legacy / (time.perf_counter() - start)
+
+    rows = [(float(q[i]), float(p[i]), str(s[i]), float(v[i]), float(t[i])) for i in range(n_legacy * 20)]
+    start = time.perf_counter()
+    for row in rows:
+        model.predict_cost(*row)
+    single_rate = len(rows) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    batched = model.predict_costs(q, p, s, v, t)
+    batch_rate = n_rows / (time.perf_counter() - start)
+
+    check = [legacy_predict(model.model, q[i], p[i], s[i], v[i], t[i]) for i in range(10)]
+    assert np.allclose(batched[:10], check)
+
+    return {
+        "legacy_rows_per_sec": legacy_rate,
+        "single_row_rows_per_sec": single_rate,
+        "batched_rows_per_sec": batch_rate,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>26}: {value:,.0f}")
@@ -0,0 +1,80 @@
+# benchmarks/bench_decode.py
+#
+# Usage: python -m benchmarks.bench_decode [CAPTURE]
+#
+# Frame decode + OrderBook.apply per message for each decoder in
+# decoders.py, on frames read back from a replay.py capture (a synthetic
+# one unless CAPTURE is given). Time is the best of a few passes;
+# allocation is the tracemalloc peak per message, averaged.
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from decoders import make_decoder, orjson
+from orderbook import OrderBook
+from replay import FrameLog, FrameRecorder
+from benchmarks.synthetic import make_raw_frames
+
+
+def _recorded_frames(n_frames, depth, capture=None):
+    if capture is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            recorder = FrameRecorder(os.path.join(tmp, "capture"))
+            for frame in make_raw_frames(n_frames, depth=depth):
+                recorder.write(frame)
+            recorder.close()
+            return _recorded_frames(n_frames, depth, os.path.join(tmp, "capture"))
+    # Websocket frames arrive as str.
+    return [frame.decode() for _, frame in FrameLog(capture).iter_frames(0, n_frames)]
+
+
+def _time_per_message(fn, frames, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for frame in frames:
+            fn(frame)
+        best = min(best, time.perf_counter() - start)
+    return best / len(frames) * 1e6
+
+
+def _alloc_per_message(fn, frames):
+    tracemalloc.start()
+    try:
+        total = 0
+        for frame in frames:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn(frame)
+            total += tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return total / len(frames) / 1024
+
+
+def run(n_frames=2000, depth=400, book_depth=50, repeats=3, capture=None):
+    frames = _recorded_frames(n_frames, depth, capture)
+    decoders = {"json": make_decoder("json"), "book": make_decoder("book", book_depth)}
+    if orjson is not None:
+        decoders["orjson"] = make_decoder("orjson")
+
+    results = {}
+    for name, decode in decoders.items():
+        book = OrderBook()
+
+        def tick(frame):
+            book.apply(decode(frame))
+
+        results[f"{name}_decode_us"] = _time_per_message(decode, frames, repeats)
+        results[f"{name}_decode_apply_us"] = _time_per_message(tick, frames, repeats)
+        results[f"{name}_alloc_kb"] = _alloc_per_message(tick, frames[:200])
+    results["book_speedup"] = results["json_decode_apply_us"] / results["book_decode_apply_us"]
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run(capture=sys.argv[1] if len(sys.argv) > 1 else None).items():
+        print(f"{name:>24}: {value:,.1f}")
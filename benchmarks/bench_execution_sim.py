@@ -0,0 +1,49 @@
+# benchmarks/bench_execution_sim.py
+#
+# Usage: python -m benchmarks.bench_execution_sim
+#
+# Tape build rate (decoding a capture window into level arrays) and
+# simulation rate (parent orders per second on a built tape), with the
+# projected time to sweep one schedule set over a day at 10 frames/s.
+
+import os
+import tempfile
+import time
+
+from benchmarks.bench_calibration import write_capture
+from execution_sim import SCHEDULES, STYLES, BookTape, simulate
+from replay import FrameLog
+
+DAY_FRAMES = 86400 * 10
+
+
+def run(n_frames=20_000, duration=300.0, slices=20, quantity=20.0, repeats=5):
+    with tempfile.TemporaryDirectory() as tmp:
+        capture = os.path.join(tmp, "BTC-USDT-SWAP")
+        write_capture(capture, n_frames)
+        start = time.perf_counter()
+        tape = BookTape.from_log(FrameLog(capture))
+        build = time.perf_counter() - start
+
+    window = int(duration * 10)
+    starts = [int(tape.ts_ns[i]) for i in range(0, len(tape) - window, window)]
+    start = time.perf_counter()
+    n = 0
+    for _ in range(repeats):
+        for s in starts:
+            for schedule in SCHEDULES:
+                for style in STYLES:
+                    simulate(tape, "buy", quantity, schedule, slices, duration, style, start_ns=s)
+                    n += 1
+    sim = time.perf_counter() - start
+    orders_per_day = DAY_FRAMES / window * len(SCHEDULES) * len(STYLES)
+    return {
+        "tape_frames_per_sec": n_frames / build,
+        "parent_orders_per_sec": n / sim,
+        "day_sweep_s": DAY_FRAMES / (n_frames / build) + orders_per_day / (n / sim),
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>24}: {value:,.2f}")
@@ -0,0 +1,125 @@
+# benchmarks/bench_gui.py
+#
+# Usage: QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_gui
+#
+# Drives MainWindow offscreen: a feeder thread pushes pre-decoded book
+# deltas through on_frame at ``tick_rate`` while 100k orders and log lines
+# are added from the GUI thread. Reports how late a 5 ms probe timer fires
+# (event-loop responsiveness), render_frame cost and achieved rates.
+
+import os
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+
+from benchmarks.synthetic import make_frame
+
+
+def _deltas(book_mid, n, seed=1):
+    rng = np.random.default_rng(seed)
+    deltas = []
+    for _ in range(n):
+        side = "bids" if rng.random() < 0.5 else "asks"
+        offset = 0.1 * rng.integers(0, 50)
+        px = book_mid - 0.05 - offset if side == "bids" else book_mid + 0.05 + offset
+        size = 0.0 if rng.random() < 0.2 else float(rng.exponential(2.0))
+        deltas.append({"action": "update", side: [[round(px, 1), size]]})
+    return deltas
+
+
+def run(seconds=5.0, tick_rate=10_000, orders=100_000, order_batch=2_000):
+    from gui import MainWindow
+
+    app = QApplication.instance() or QApplication([])
+    window = MainWindow()
+    window.show()
+    window.on_frame(make_frame(np.random.default_rng(0), 60000.0, 50))
+    deltas = _deltas(window.order_book.mid(), 20_000)
+
+    stop = threading.Event()
+    ticks = 0
+
+    def feeder():
+        nonlocal ticks
+        start = time.perf_counter()
+        while not stop.is_set():
+            # Pace to tick_rate, catching up in bursts when behind.
+            due = int((time.perf_counter() - start) * tick_rate)
+            while ticks < due:
+                window.on_frame(deltas[ticks % len(deltas)])
+                ticks += 1
+            time.sleep(0.0005)
+
+    lateness = []
+    renders = []
+    added = 0
+    probe_interval = 0.005
+    last = [time.perf_counter()]
+
+    def probe():
+        now = time.perf_counter()
+        lateness.append(max(0.0, now - last[0] - probe_interval))
+        last[0] = now
+
+    def add_orders():
+        nonlocal added
+        for _ in range(min(order_batch, orders - added)):
+            window.orders_model.add_row([time.strftime("%H:%M:%S"), "BTC-USDT-SWAP", "Buy", "1", "60000.00", "Pending", ""])
+            window.append_log(f"📝 Order {added}")
+            added += 1
+
+    render = window.render_frame
+
+    def timed_render():
+        t = time.perf_counter()
+        render()
+        renders.append(time.perf_counter() - t)
+
+    window.frame_timer.timeout.disconnect()
+    window.frame_timer.timeout.connect(timed_render)
+
+    probe_timer = QTimer()
+    probe_timer.timeout.connect(probe)
+    probe_timer.start(int(probe_interval * 1000))
+    order_timer = QTimer()
+    order_timer.timeout.connect(add_orders)
+    order_timer.start(10)
+
+    thread = threading.Thread(target=feeder, daemon=True)
+    start = time.perf_counter()
+    thread.start()
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    thread.join()
+    probe_timer.stop()
+    order_timer.stop()
+    window.frame_timer.stop()
+    window.render_frame()
+
+    lateness_ms = np.array(lateness) * 1e3
+    render_ms = np.array(renders) * 1e3
+    results = {
+        "ticks_per_sec": ticks / elapsed,
+        "orders_per_sec": added / elapsed,
+        "table_rows": window.orders_model.rowCount(),
+        "frames_per_sec": len(renders) / elapsed,
+        "render_p50_ms": float(np.percentile(render_ms, 50)),
+        "render_p99_ms": float(np.percentile(render_ms, 99)),
+        "loop_lag_p50_ms": float(np.percentile(lateness_ms, 50)),
+        "loop_lag_p99_ms": float(np.percentile(lateness_ms, 99)),
+        "loop_lag_max_ms": float(lateness_ms.max()),
+    }
+    window.close()
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>16}: {value:,.2f}")
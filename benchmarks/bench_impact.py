@@ -0,0 +1,44 @@
+# benchmarks/bench_impact.py
+#
+# Usage: python -m benchmarks.bench_impact
+
+import time
+
+import numpy as np
+
+from impact_model import AlmgrenChrissModel, cost_variances, expected_costs, trajectories
+
+
+def run(n_points=1_000_000, n_objects=20000, n_trajectories=100_000, n_steps=10):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(1, 1000, n_points)
+    sigma = rng.uniform(1e-4, 0.05, n_points)
+    eta = rng.uniform(1e-4, 0.1, n_points)
+    lambd = 10 ** rng.uniform(-8, 4, n_points)
+    T = rng.uniform(0.1, 100, n_points)
+
+    start = time.perf_counter()
+    for i in range(n_objects):
+        AlmgrenChrissModel(X[i], n_steps, sigma[i], eta[i], 0.01, lambd[i], T[i]).expected_cost()
+    object_rate = n_objects / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    expected_costs(X, sigma, eta, 0.01, lambd, T)
+    cost_variances(X, sigma, eta, lambd, T)
+    grid_rate = n_points / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    trajectories(X[:n_trajectories], sigma[:n_trajectories], eta[:n_trajectories],
+                 lambd[:n_trajectories], T[:n_trajectories], n_steps)
+    trajectory_rate = n_trajectories / (time.perf_counter() - start)
+
+    return {
+        "per_object_points_per_sec": object_rate,
+        "vectorized_points_per_sec": grid_rate,
+        "trajectories_per_sec": trajectory_rate,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>28}: {value:,.0f}")
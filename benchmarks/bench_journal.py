@@ -0,0 +1,53 @@
+# benchmarks/bench_journal.py
+#
+# Usage: python -m benchmarks.bench_journal
+
+import tempfile
+import time
+
+from journal import TradeJournal, read_columnar
+
+
+def make_trades(n):
+    return [
+        {
+            "timestamp": "2024-01-01T00:00:00Z",
+            "exchange": "okx",
+            "symbol": "BTC-USDT-SWAP",
+            "action": "buy",
+            "maker_taker": "taker" if i % 3 else "maker",
+            "price": 60000.0 + i * 0.1,
+            "qty": 0.5,
+            "impact_ratio": 1.6e-6,
+            "volatility": 1e-4,
+            "mid": 60000.0 + i * 0.1 - 0.05,
+            "slippage": 0.05,
+        }
+        for i in range(n)
+    ]
+
+
+def run(n_trades=200_000):
+    trades = make_trades(n_trades)
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = TradeJournal(directory=tmp)
+        start = time.perf_counter()
+        for trade in trades:
+            journal.append(trade)
+        append_s = time.perf_counter() - start
+        journal.close()
+        total_s = time.perf_counter() - start
+
+        cols = read_columnar(f"{tmp}/{journal.prefix}-{time.strftime('%Y%m%d', time.gmtime())}.cols")
+        assert len(cols["price"]) == n_trades
+
+    return {
+        "append_trades_per_sec": n_trades / append_s,
+        "sustained_trades_per_sec": n_trades / total_s,
+        "max_flush_ms": journal.max_flush_ms,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>26}: {value:,.1f}")
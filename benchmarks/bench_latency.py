@@ -0,0 +1,40 @@
+# benchmarks/bench_latency.py
+#
+# Usage: python -m benchmarks.bench_latency
+
+import time
+from time import perf_counter_ns
+
+from latency import LatencyRegistry
+
+
+def run(n=1_000_000):
+    registry = LatencyRegistry()
+    h = registry.histogram("bench")
+
+    start = time.perf_counter()
+    for _ in range(n):
+        pass
+    empty = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n):
+        t0 = perf_counter_ns()
+        h.record(perf_counter_ns() - t0)
+    measured = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n // 10):
+        with registry.stage("bench_ctx"):
+            pass
+    ctx = time.perf_counter() - start
+
+    return {
+        "overhead_ns_per_measurement": (measured - empty) / n * 1e9,
+        "overhead_ns_per_stage_block": ctx / (n // 10) * 1e9,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>28}: {value:,.0f}")
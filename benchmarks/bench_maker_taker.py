@@ -0,0 +1,53 @@
+# benchmarks/bench_maker_taker.py
+#
+# Usage: python -m benchmarks.bench_maker_taker
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from models import ModelManager
+
+
+def run(n_ticks=20000, n_batch=1_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        mgr = ModelManager(model_path=os.path.join(tmp, "maker_taker_model.pkl"), retrain_if_missing=True)
+    sk = mgr.maker_taker_model
+    compiled = mgr.compiled_model
+
+    rng = np.random.default_rng(0)
+    ratios = rng.uniform(0.0, 2.0, n_batch)
+    # Include values straddling the decision boundary to check exact agreement.
+    boundary = np.nextafter(compiled.threshold, [-np.inf, np.inf])
+    check = np.concatenate([ratios[:100_000], boundary, [compiled.threshold]])
+    assert np.array_equal(mgr.predict_maker_taker_batch(check), sk.predict(check.reshape(-1, 1)))
+    assert np.allclose(mgr.predict_proba(check), sk.predict_proba(check.reshape(-1, 1)), rtol=0, atol=1e-15)
+
+    ticks = ratios[:n_ticks].tolist()
+    start = time.perf_counter()
+    for r in ticks[:2000]:
+        sk.predict([[r]])
+    sklearn_rate = 2000 / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for r in ticks:
+        mgr.predict_maker_taker(r)
+    fast_rate = n_ticks / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    mgr.predict_maker_taker_batch(ratios)
+    batch_rate = n_batch / (time.perf_counter() - start)
+
+    return {
+        "sklearn_ticks_per_sec": sklearn_rate,
+        "compiled_ticks_per_sec": fast_rate,
+        "batch_rows_per_sec": batch_rate,
+        "per_tick_speedup": fast_rate / sklearn_rate,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>24}: {value:,.1f}")
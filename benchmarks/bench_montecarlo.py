@@ -0,0 +1,26 @@
+# benchmarks/bench_montecarlo.py
+#
+# Usage: python -m benchmarks.bench_montecarlo
+
+import os
+import time
+
+from montecarlo import ac_schedule, simulate_costs
+
+
+def run(n_paths=2_000_000, steps=50, max_workers=None):
+    holdings = ac_schedule(100.0, steps, 0.5, 0.01, 0.01, 1e-2, 1.0)
+    max_workers = max_workers or os.cpu_count()
+    results = {}
+    workers = 1
+    while workers <= max_workers:
+        start = time.perf_counter()
+        simulate_costs(holdings, 1.0, 0.5, 0.01, 0.01, n_paths, seed=0, workers=workers)
+        results[f"paths_per_sec_{workers}w"] = n_paths / (time.perf_counter() - start)
+        workers *= 2
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>22}: {value:,.0f}")
@@ -0,0 +1,56 @@
+# benchmarks/bench_orderbook.py
+#
+# Usage: python -m benchmarks.bench_orderbook
+
+import time
+
+import numpy as np
+
+from orderbook import OrderBook
+from benchmarks.synthetic import make_frames
+
+
+def run(n_frames=2000, depth=400, n_deltas=20000):
+    frames = make_frames(n_frames, depth=depth)
+    book = OrderBook()
+
+    start = time.perf_counter()
+    for frame in frames:
+        book.apply(frame)
+    snapshot_rate = n_frames / (time.perf_counter() - start)
+
+    rng = np.random.default_rng(1)
+    mid = book.mid()
+    deltas = []
+    for _ in range(n_deltas):
+        side = "bids" if rng.random() < 0.5 else "asks"
+        offset = 0.1 * rng.integers(0, 50)
+        px = mid - 0.05 - offset if side == "bids" else mid + 0.05 + offset
+        size = 0.0 if rng.random() < 0.2 else float(rng.exponential(2.0))
+        deltas.append({"action": "update", side: [[round(px, 1), size]]})
+
+    start = time.perf_counter()
+    for delta in deltas:
+        book.apply(delta)
+    delta_rate = n_deltas / (time.perf_counter() - start)
+
+    quantities = [0.5, 10.0, 100.0]
+    start = time.perf_counter()
+    for frame in frames[:500]:
+        book.apply(frame)
+        for q in quantities:
+            book.vwap("buy", q)
+        book.depth_within_bps("sell", 10)
+        book.imbalance(20)
+    query_rate = 500 / (time.perf_counter() - start)
+
+    return {
+        "snapshot_updates_per_sec": snapshot_rate,
+        "delta_updates_per_sec": delta_rate,
+        "update_plus_queries_per_sec": query_rate,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>30}: {value:,.0f}")
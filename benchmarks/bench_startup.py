@@ -0,0 +1,75 @@
+# benchmarks/bench_startup.py
+#
+# Usage: python -m benchmarks.bench_startup
+#
+# Time-to-first-decision of a fresh WebSocketTrader process: interpreter
+# start, imports, model load and one processed order book frame, with the
+# models loaded from the pickles versus the exported npz artifacts.
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_frame
+from models import ModelManager
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("pandas", "sklearn", "joblib", "scipy", "websockets", "PyQt5")
+
+_CHILD = f"""
+import json, sys
+from websocket_client import WebSocketTrader
+trader = WebSocketTrader(model_path=sys.argv[1], report_interval=None)
+with open(sys.argv[2]) as f:
+    trader.process_orderbook(json.load(f))
+print("DECIDED", json.dumps([m for m in {HEAVY!r} if m in sys.modules]), flush=True)
+trader.close()
+"""
+
+
+def _first_decision(model_path, frame_path, cwd):
+    env = dict(os.environ, PYTHONPATH=REPO, PYTHONUNBUFFERED="1")
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", _CHILD, model_path, frame_path], cwd=cwd, env=env,
+                            stdout=subprocess.PIPE, text=True)
+    elapsed, heavy = None, None
+    for line in proc.stdout:
+        if line.startswith("DECIDED"):
+            elapsed = time.perf_counter() - start
+            heavy = json.loads(line.split(" ", 1)[1])
+    proc.wait()
+    if elapsed is None:
+        raise RuntimeError(f"child exited with {proc.returncode} before deciding")
+    return elapsed, heavy
+
+
+def run(repeats=5):
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = os.path.join(tmp, "maker_taker_model.pkl")
+        artifact_dir = os.path.join(tmp, "models")
+        ModelManager(model_path=pickle_path, retrain_if_missing=True).export(artifact_dir)
+        frame_path = os.path.join(tmp, "frame.json")
+        with open(frame_path, "w") as f:
+            json.dump(make_frame(np.random.default_rng(0), 60000.0, 50), f)
+
+        results = {}
+        for mode, path in (("pickle", pickle_path), ("artifact", artifact_dir)):
+            times = []
+            for _ in range(repeats):
+                elapsed, heavy = _first_decision(path, frame_path, tmp)
+                times.append(elapsed)
+            results[f"{mode}_first_decision_ms"] = statistics.median(times) * 1000
+            results[f"{mode}_heavy_import_count"] = len(heavy)
+            print(f"{mode}: heavy imports before the first decision: {', '.join(heavy) or '-'}")
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>30}: {value:,.1f}")
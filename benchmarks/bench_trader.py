@@ -0,0 +1,115 @@
+# benchmarks/bench_trader.py
+#
+# Usage: python -m benchmarks.bench_trader
+#
+# The tick path of WebSocketTrader on synthetic L2 frames: process_orderbook
+# called directly, then end to end through FeedPipeline from a local
+# replay.serve websocket (no network) at a fixed offered rate. Per-tick
+# output goes to /dev/null.
+
+import asyncio
+import contextlib
+import os
+import socket
+import tempfile
+import time
+from time import perf_counter_ns
+
+from benchmarks.synthetic import make_frames, make_raw_frames
+from latency import LATENCY, TICK_TOTAL, LatencyHistogram
+
+
+def _trader(tmp, **kwargs):
+    from journal import TradeJournal
+    from models import ModelManager
+    from websocket_client import WebSocketTrader
+
+    os.makedirs(tmp, exist_ok=True)
+    model_path = os.path.join(tmp, "maker_taker_model.pkl")
+    ModelManager(model_path, retrain_if_missing=True)
+    journal = TradeJournal(directory=os.path.join(tmp, "journal"))
+    return WebSocketTrader(journal=journal, model_path=model_path, report_interval=None, **kwargs)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_direct(tmp, n_frames, depth):
+    frames = make_frames(n_frames, depth=depth)
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        trader = _trader(tmp)
+        hist = LatencyHistogram("process_orderbook")
+        start = time.perf_counter()
+        for frame in frames:
+            t0 = perf_counter_ns()
+            trader.process_orderbook(frame)
+            hist.record(perf_counter_ns() - t0)
+        elapsed = time.perf_counter() - start
+        trader.close()
+    summary = hist.summary()
+    return {
+        "direct_ticks_per_sec": n_frames / elapsed,
+        "direct_p50_us": summary["p50_us"],
+        "direct_p99_us": summary["p99_us"],
+    }
+
+
+def run_websocket(tmp, n_frames, depth, rate, timeout=120.0):
+    """
+    Serve frames recorded ``rate`` per second at recorded pace and time the
+    full tick path. Throughput is capped by ``rate``, so it is reported as
+    ``ws_offered_rate`` (not compared); the latencies and drops are the signal.
+    """
+    from pipeline import DROP_OLDEST
+    from replay import FrameLog, FrameRecorder, serve
+
+    capture = os.path.join(tmp, "capture")
+    recorder = FrameRecorder(capture)
+    t0 = time.time_ns()
+    for i, frame in enumerate(make_raw_frames(n_frames, depth=depth)):
+        recorder.write(frame, t0 + int(i * 1e9 / rate))
+    recorder.close()
+    port = _free_port()
+
+    async def main():
+        server = asyncio.create_task(serve(FrameLog(capture), port=port, speed=1.0))
+        await asyncio.sleep(0.2)
+        trader = _trader(tmp, url=f"ws://127.0.0.1:{port}/local/SYNTH",
+                         queue_policy=DROP_OLDEST, queue_size=n_frames)
+        LATENCY.histogram(TICK_TOTAL).reset()
+        metrics = trader.pipeline.metrics
+        start = time.perf_counter()
+        client = asyncio.create_task(trader.connect_websocket())
+        while metrics.processed + metrics.dropped < n_frames and time.perf_counter() - start < timeout:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        for task in (client, server):
+            task.cancel()
+        await asyncio.gather(client, server, return_exceptions=True)
+        trader.close()
+        return elapsed, metrics.processed, metrics.dropped
+
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        elapsed, processed, dropped = asyncio.run(main())
+    summary = LATENCY.histogram(TICK_TOTAL).summary()
+    return {
+        "ws_offered_rate": processed / elapsed,
+        "ws_tick_p50_us": summary["p50_us"],
+        "ws_tick_p99_us": summary["p99_us"],
+        "ws_dropped": dropped,
+    }
+
+
+def run(n_frames=5000, depth=400, ws_frames=2500, ws_rate=500):
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_direct(os.path.join(tmp, "direct"), n_frames, depth)
+        results.update(run_websocket(os.path.join(tmp, "ws"), ws_frames, depth, ws_rate))
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>22}: {value:,.1f}")
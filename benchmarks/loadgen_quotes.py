@@ -0,0 +1,123 @@
+# benchmarks/loadgen_quotes.py
+#
+# Usage: python -m benchmarks.loadgen_quotes                      (in-process service on a synthetic book)
+#        python -m benchmarks.loadgen_quotes --port 8080          (against a running quote_service.py)
+#
+# Closed-loop load: ``concurrency`` keep-alive connections each send
+# ``requests`` POST /quote requests back to back. Reports quotes/sec and
+# the client-side latency distribution.
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from time import perf_counter_ns
+
+import numpy as np
+
+from latency import LatencyHistogram
+
+
+def _request(host, order):
+    body = json.dumps(order).encode()
+    return (f"POST /quote HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+
+async def _read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b""):
+            break
+        name, _, value = header.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def load(host="127.0.0.1", port=8080, concurrency=64, requests=200, seed=0):
+    rng = np.random.default_rng(seed)
+    payloads = [
+        _request(host, {"side": "Buy" if rng.random() < 0.5 else "Sell",
+                        "quantity": round(float(rng.lognormal(0.0, 1.0)), 4)})
+        for _ in range(256)
+    ]
+    hist = LatencyHistogram("quote")
+    errors = 0
+
+    async def client(i):
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for k in range(requests):
+                start = perf_counter_ns()
+                writer.write(payloads[(i * requests + k) % len(payloads)])
+                status, body = await _read_response(reader)
+                hist.record(perf_counter_ns() - start)
+                if status != 200 or b'"error"' in body:
+                    errors += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    summary = hist.summary()
+    return {
+        "quotes_per_sec": hist.count / elapsed,
+        "p50_ms": summary["p50_us"] / 1000,
+        "p99_ms": summary["p99_us"] / 1000,
+        "p999_ms": summary["p999_us"] / 1000,
+        "max_ms": summary["max_us"] / 1000,
+        "errors": errors,
+    }
+
+
+def run(concurrency=64, requests=200, window=0.002):
+    """Load an in-process QuoteService quoting against a synthetic book."""
+    from benchmarks.bench_cost_model import write_model
+    from benchmarks.synthetic import make_frame
+    from cost_model import CostRegressionModel
+    from models import ModelManager
+    from quote_service import QuoteService
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_model(os.path.join(tmp, "cost_model.pkl"))
+        cost_model = CostRegressionModel(os.path.join(tmp, "cost_model.pkl"))
+        model_manager = ModelManager(os.path.join(tmp, "maker_taker_model.pkl"), retrain_if_missing=True)
+
+    service = QuoteService(cost_model=cost_model, model_manager=model_manager, window=window)
+    service.on_frame(make_frame(np.random.default_rng(0), 60000.0, 400))
+
+    async def main():
+        port = await service.start(port=0)
+        try:
+            return await load(port=port, concurrency=concurrency, requests=requests)
+        finally:
+            service.server.close()
+
+    results = asyncio.run(main())
+    batches = service.batcher.snapshot()
+    results["mean_batch"] = batches["mean_batch"]
+    results["max_batch"] = batches["max_batch"]
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="target a running service instead")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=200, help="per connection")
+    args = parser.parse_args()
+
+    if args.port is None:
+        results = run(args.concurrency, args.requests)
+    else:
+        results = asyncio.run(load(args.host, args.port, args.concurrency, args.requests))
+    for name, value in results.items():
+        print(f"{name:>16}: {value:,.2f}")
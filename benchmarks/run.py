@@ -0,0 +1,189 @@
+# benchmarks/run.py
+#
+# Usage: python -m benchmarks.run                       (compare against benchmarks/baseline.json)
+#        python -m benchmarks.run --save                (record a new baseline)
+#        python -m benchmarks.run trader journal --quick
+#
+# Runs each benchmark's run() in its own subprocess, so peak memory is per
+# benchmark and one crash does not take the suite down. Results go to a
+# JSON report; metrics that regress past --threshold against the baseline
+# make the exit status 1. Baselines are machine specific: record one per
+# machine or CI runner, with the same --quick setting you compare with.
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# name -> (module, run() kwargs for --quick). The default suite covers the
+# tick path; the others are opt-in by name.
+SUITE = {
+    "trader": ("benchmarks.bench_trader", {"n_frames": 2000, "ws_frames": 1000}),
+    "decode": ("benchmarks.bench_decode", {"n_frames": 500}),
+    "orderbook": ("benchmarks.bench_orderbook", {"n_frames": 500, "n_deltas": 5000}),
+    "maker_taker": ("benchmarks.bench_maker_taker", {"n_ticks": 5000, "n_batch": 200_000}),
+    "cost_model": ("benchmarks.bench_cost_model", {"n_rows": 20_000, "n_legacy": 100}),
+    "impact": ("benchmarks.bench_impact", {"n_points": 200_000, "n_objects": 5000, "n_trajectories": 20_000}),
+    "journal": ("benchmarks.bench_journal", {"n_trades": 50_000}),
+    "latency": ("benchmarks.bench_latency", {"n": 200_000}),
+}
+OPTIONAL = {
+    "montecarlo": ("benchmarks.bench_montecarlo", {"n_paths": 200_000}),
+    "startup": ("benchmarks.bench_startup", {"repeats": 2}),
+    "quote_service": ("benchmarks.loadgen_quotes", {"concurrency": 16, "requests": 50}),
+    "calibration": ("benchmarks.bench_calibration", {"n_frames": 10_000}),
+    "execution_sim": ("benchmarks.bench_execution_sim", {"n_frames": 5000, "repeats": 1}),
+    "gui": ("benchmarks.bench_gui", {"seconds": 2.0, "orders": 20_000}),
+}
+
+# Name patterns marking a metric as higher-is-better or lower-is-better.
+# Anything else (counts, fitted values) is reported but never fails a run.
+_HIGHER = ("per_sec", "speedup")
+_LOWER = ("overhead", "dropped", "errors", "heavy_import")
+_LOWER_SUFFIXES = ("_us", "_ms", "_s", "_kb", "_mb", "_min")
+
+
+def direction(metric):
+    """+1 if higher is better, -1 if lower is better, 0 if not compared."""
+    if any(tag in metric for tag in _HIGHER):
+        return 1
+    if metric.endswith(_LOWER_SUFFIXES) or any(tag in metric for tag in _LOWER):
+        return -1
+    return 0
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def run_one(name, quick=False):
+    """Run one benchmark in this process; returns its metrics plus wall time and peak RSS."""
+    module, quick_kwargs = {**SUITE, **OPTIONAL}[name]
+    start = time.perf_counter()
+    # Benchmarks and the code they load print progress; keep stdout for the result.
+    with contextlib.redirect_stdout(sys.stderr):
+        results = importlib.import_module(module).run(**(quick_kwargs if quick else {}))
+    results = {k: float(v) for k, v in results.items()}
+    results["wall_s"] = time.perf_counter() - start
+    results["peak_rss_mb"] = _peak_rss_mb()
+    return results
+
+
+def run_isolated(name, quick=False, timeout=1800):
+    cmd = [sys.executable, "-m", "benchmarks.run", "--child", name] + (["--quick"] if quick else [])
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, timeout=timeout, text=True,
+                          cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name} exited with status {proc.returncode}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """
+    Regressions of ``results`` against ``baseline`` beyond ``threshold``
+    (a fraction). Returns a list of ``(bench, metric, old, new, change)``.
+    """
+    regressions = []
+    for bench, metrics in results.items():
+        old_metrics = baseline.get(bench, {})
+        for metric, new in metrics.items():
+            old = old_metrics.get(metric)
+            sign = direction(metric)
+            if old is None or not sign or metric == "wall_s":
+                continue
+            if old == 0:
+                worse = sign < 0 and new > 0
+                change = float("inf") if worse else 0.0
+            else:
+                change = (new - old) / abs(old) * -sign
+                worse = change > threshold
+            if worse:
+                regressions.append((bench, metric, old, new, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and check it against a baseline.")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: {' '.join(SUITE)}; "
+                                                 f"also {' '.join(OPTIONAL)})")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads, for CI")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression, as a fraction")
+    parser.add_argument("--out", default=None, help="also write this run's report here")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(args.child, args.quick)))
+        return 0
+
+    names = args.names or list(SUITE)
+    unknown = [n for n in names if n not in SUITE and n not in OPTIONAL]
+    if unknown:
+        parser.error(f"unknown benchmarks {unknown}")
+
+    results = {}
+    failed = []
+    for name in names:
+        print(f"⏱️ {name} ...", flush=True)
+        try:
+            results[name] = run_isolated(name, args.quick)
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed.append(name)
+            continue
+        for metric, value in results[name].items():
+            print(f"   {metric:>28}: {value:,.3f}")
+
+    report = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "quick": args.quick,
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    status = 1 if failed else 0
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f).get("results", {})
+        report["results"] = dict(baseline, **results)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("quick") != args.quick:
+            print("⚠️ Baseline was recorded with a different --quick setting; comparisons may be off.")
+        regressions = compare(results, baseline.get("results", {}), args.threshold)
+        for bench, metric, old, new, change in regressions:
+            print(f"📉 {bench}.{metric}: {old:,.3f} -> {new:,.3f} ({change:+.0%} worse)")
+        if regressions:
+            status = 1
+        else:
+            print(f"✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    else:
+        print(f"ℹ️ No baseline at {args.baseline}; run with --save to record one.")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+# benchmarks/synthetic.py
+
+import json
+import time
+
+import numpy as np
+
+
+def make_frame(rng, mid=60000.0, depth=400, tick=0.1, symbol="BTC-USDT-SWAP", exchange="okx"):
+    """
+    Build one synthetic GoQuant-style L2 snapshot (prices/sizes as strings).
+    """
+    spread = tick * rng.integers(1, 4)
+    ask0 = round(mid + spread / 2, 1)
+    bid0 = round(mid - spread / 2, 1)
+    ask_px = ask0 + tick * np.arange(depth)
+    bid_px = bid0 - tick * np.arange(depth)
+    ask_sz = rng.exponential(2.0, depth).round(3) + 0.001
+    bid_sz = rng.exponential(2.0, depth).round(3) + 0.001
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "exchange": exchange,
+        "symbol": symbol,
+        "asks": [[f"{p:.1f}", f"{s:.3f}"] for p, s in zip(ask_px, ask_sz)],
+        "bids": [[f"{p:.1f}", f"{s:.3f}"] for p, s in zip(bid_px, bid_sz)],
+    }
+
+
+def make_frames(n, depth=400, seed=7, **kwargs):
+    """
+    A random-walk sequence of ``n`` snapshots.
+    """
+    rng = np.random.default_rng(seed)
+    mids = 60000.0 + np.cumsum(rng.normal(0, 2.0, n))
+    return [make_frame(rng, mid=m, depth=depth, **kwargs) for m in mids]
+
+
+def make_raw_frames(n, depth=400, seed=7, **kwargs):
+    return [json.dumps(f) for f in make_frames(n, depth=depth, seed=seed, **kwargs)]
@@ -0,0 +1,396 @@
+# calibration.py
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from artifacts import COST_ARTIFACT, impact_artifact_name, publish_artifact
+from estimators import MarketStats
+from impact_model import expected_costs
+from orderbook import BUY, SELL, OrderBook
+from pricing import IMPACT_PARAMS
+
+# Probe orders walked through each sampled book, as fractions of the
+# visible depth on the side they consume. Self-scaling across symbols.
+PROBE_FRACTIONS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.35, 0.5)
+
+# Residuals are measured in bps of notional; beyond this they count linearly.
+HUBER_BPS = 10.0
+
+# Observation arrays: X (quantity), sigma, price, cost. All float64.
+_OBS_FIELDS = ("X", "sigma", "price", "cost")
+
+
+def _empty_obs():
+    return {name: np.empty(0) for name in _OBS_FIELDS}
+
+
+def _concat_obs(parts):
+    parts = [p for p in parts if len(p["X"])]
+    if not parts:
+        return _empty_obs()
+    return {name: np.concatenate([p[name] for p in parts]) for name in _OBS_FIELDS}
+
+
+# ----------------------------------------------------------------------
+# Observations from recorded books (replay.py captures)
+# ----------------------------------------------------------------------
+def _replay_chunk(path, start, stop, sample_ns, probes):
+    """
+    Walk probe orders through the book at every ``sample_ns`` in frames
+    ``start`` .. ``stop`` of one capture. Runs in a worker process.
+
+    Returns the key, (ts_ns, mid) of every sample and the temporary-impact
+    observations. Snapshot frames are decoded only at sample times; a feed
+    of incremental updates is replayed frame by frame up to each sample,
+    starting from the last snapshot before ``start``.
+    """
+    from replay import FrameLog
+
+    log = FrameLog(path)
+    ts = np.asarray(log.timestamps[start:stop])
+    if not len(ts):
+        return None, np.empty(0, dtype=np.int64), np.empty(0), _empty_obs()
+    grid = np.arange(int(ts[0]), int(ts[-1]) + 1, sample_ns)
+    targets = np.unique(start + np.searchsorted(ts, grid, side="left"))
+    targets = targets[targets < stop]
+
+    book = OrderBook()
+    stats = MarketStats(min_samples=2)
+    key = None
+    pos = log.last_snapshot(start) - 1
+    sample_ts, sample_mid = [], []
+    obs = {name: [] for name in _OBS_FIELDS}
+    probes = np.asarray(probes, dtype=float)
+    for i in targets.tolist():
+        data = json.loads(log.frame(i))
+        if data.get("action") == "update":
+            for _, frame in log.iter_frames(pos + 1, i):
+                book.apply(json.loads(frame))
+        book.apply(data)
+        pos = i
+        if key is None and book.symbol:
+            key = f"{book.exchange}:{book.symbol}"
+        if not book.is_ready():
+            continue
+        mid = book.mid()
+        stats.update(float(book.bid_px[0]), float(book.ask_px[0]), int(log.timestamps[i]) / 1e9)
+        sample_ts.append(int(log.timestamps[i]))
+        sample_mid.append(mid)
+        for side, depth in ((BUY, book.ask_sz[:book.n_asks].sum()), (SELL, book.bid_sz[:book.n_bids].sum())):
+            qty = probes * depth
+            price, filled = book.vwap(side, qty)
+            cost = (price - mid if side == BUY else mid - price) * qty
+            ok = (filled >= qty) & (qty > 0)
+            obs["X"].append(qty[ok])
+            obs["sigma"].append(np.full(ok.sum(), stats.sigma))
+            obs["price"].append(np.full(ok.sum(), mid))
+            obs["cost"].append(cost[ok])
+    obs = {name: np.concatenate(v) if v else np.empty(0) for name, v in obs.items()}
+    return key, np.array(sample_ts, dtype=np.int64), np.array(sample_mid), obs
+
+
+def replay_observations(paths, pool, workers, sample_interval=1.0, probes=PROBE_FRACTIONS):
+    """
+    Book-walk observations and mid paths from replay captures, split into
+    frame ranges across ``pool``. Returns ``{key: (ts_ns, mid, obs)}``.
+    """
+    from replay import FrameLog
+
+    chunks = max(1, workers * 4)
+    futures = []
+    for path in paths:
+        n = len(FrameLog(path))
+        bounds = np.linspace(0, n, min(chunks, max(1, n)) + 1).astype(int)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            futures.append(pool.submit(_replay_chunk, path, int(start), int(stop),
+                                       int(sample_interval * 1e9), probes))
+
+    per_key = {}
+    empty = 0
+    for future in futures:
+        key, ts, mid, obs = future.result()
+        if key is not None:
+            per_key.setdefault(key, []).append((ts, mid, obs))
+        if not len(ts):
+            empty += 1
+    if empty:
+        print(f"⚠️ {empty} of {len(futures)} replay chunks had no complete book to sample")
+    out = {}
+    for key, parts in per_key.items():
+        ts = np.concatenate([p[0] for p in parts])
+        order = np.argsort(ts, kind="stable")
+        out[key] = (ts[order], np.concatenate([p[1] for p in parts])[order], _concat_obs([p[2] for p in parts]))
+    return out
+
+
+# ----------------------------------------------------------------------
+# Observations from executed trades (journal.py columnar journals)
+# ----------------------------------------------------------------------
+def _journal_ts_ns(timestamps):
+    """Feed ISO timestamps (bytes) to int64 ns; unparsable entries become -1."""
+    text = np.char.decode(np.asarray(timestamps), "ascii", "ignore")
+    text = np.char.rstrip(text, "Z")
+    out = np.full(len(text), -1, dtype=np.int64)
+    for i, value in enumerate(text.tolist()):
+        try:
+            out[i] = np.datetime64(value, "ns").astype(np.int64)
+        except ValueError:
+            pass
+    return out
+
+
+def journal_trades(paths):
+    """
+    Executed trades from columnar journal directories, grouped by
+    ``venue:symbol``. Returns ``{key: dict of column arrays}`` sorted by time.
+    """
+    from journal import read_columnar
+
+    grouped = {}
+    for path in paths:
+        cols = read_columnar(path)
+        if not len(cols["qty"]):
+            continue
+        ts = _journal_ts_ns(cols["timestamp"])
+        qty = np.asarray(cols["qty"], dtype=float)
+        price = np.asarray(cols["price"], dtype=float)
+        mid = np.asarray(cols["mid"], dtype=float) if "mid" in cols else np.full(len(qty), np.nan)
+        # Journals older than the slippage column: half the quoted spread.
+        slippage = (np.asarray(cols["slippage"], dtype=float) if "slippage" in cols
+                    else price * np.asarray(cols["impact_ratio"], dtype=float) / 2)
+        buy = np.char.lower(np.asarray(cols["action"])) == b"buy"
+        keys = np.char.add(np.char.add(np.asarray(cols["exchange"]), b":"), np.asarray(cols["symbol"]))
+        for key in np.unique(keys):
+            m = keys == key
+            grouped.setdefault(key.decode(), []).append({
+                "ts_ns": ts[m], "qty": qty[m], "price": price[m], "mid": mid[m], "slippage": slippage[m],
+                "buy": buy[m], "volatility": np.asarray(cols["volatility"], dtype=float)[m],
+            })
+    out = {}
+    for key, parts in grouped.items():
+        trades = {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+        order = np.argsort(trades["ts_ns"], kind="stable")
+        out[key] = {name: values[order] for name, values in trades.items()}
+    return out
+
+
+def trade_observations(trades, horizon, mid_path=None):
+    """
+    Temporary and permanent impact observations from executed trades.
+
+    Temporary cost is the realized slippage times quantity. Permanent cost
+    is the signed mid move over ``horizon`` seconds times quantity, read
+    from ``mid_path`` ``(ts_ns, mid)`` when a capture is available and
+    from the journal's own mids otherwise.
+    """
+    qty, price, sigma = trades["qty"], trades["price"], trades["volatility"]
+    sigma = np.where(np.isfinite(sigma), sigma, MarketStats().default_sigma)
+    ok = (qty > 0) & np.isfinite(trades["slippage"]) & np.isfinite(price)
+    temporary = {"X": qty[ok], "sigma": sigma[ok], "price": price[ok], "cost": (trades["slippage"] * qty)[ok]}
+
+    ts = trades["ts_ns"]
+    path_ts, path_mid = mid_path if mid_path is not None else (ts, trades["mid"])
+    valid = np.isfinite(path_mid) & (path_ts >= 0)
+    path_ts, path_mid = path_ts[valid], path_mid[valid]
+    if not len(path_ts):
+        return temporary, _empty_obs()
+    # Mid just before the trade and the first mid at or after trade + horizon.
+    before = np.searchsorted(path_ts, ts, side="right") - 1
+    after = np.searchsorted(path_ts, ts + int(horizon * 1e9), side="left")
+    ok = (ts >= 0) & (before >= 0) & (after < len(path_ts)) & (qty > 0)
+    before, after = before[ok], after[ok]
+    drift = path_mid[after] - path_mid[before]
+    sign = np.where(trades["buy"][ok], 1.0, -1.0)
+    permanent = {"X": qty[ok], "sigma": sigma[ok], "price": path_mid[before], "cost": sign * drift * qty[ok]}
+    return temporary, permanent
+
+
+# ----------------------------------------------------------------------
+# Vectorized losses, evaluated on the pool
+# ----------------------------------------------------------------------
+_WORKER_OBS = {}
+
+
+def _init_worker(observations):
+    _WORKER_OBS.clear()
+    _WORKER_OBS.update(observations)
+
+
+def _huber(r, delta=HUBER_BPS):
+    a = np.abs(r)
+    return np.where(a <= delta, 0.5 * r * r, delta * (a - 0.5 * delta))
+
+
+def losses(obs, kind, candidates, lambd=IMPACT_PARAMS["lambd"], T=IMPACT_PARAMS["T"], block=1 << 21):
+    """
+    Mean Huber loss (bps of notional) of each candidate against ``obs``.
+
+    ``kind`` "temporary" scores eta on the temporary term of the
+    Almgren-Chriss expected cost; "permanent" scores gamma on gamma X^2.
+    Candidates x observations are evaluated as one array per block of
+    observations, so memory stays bounded on a month of data.
+    """
+    candidates = np.asarray(candidates, dtype=float)
+    n = len(obs["X"])
+    if not n:
+        return np.full(len(candidates), np.nan)
+    total = np.zeros(len(candidates))
+    step = max(1, block // max(1, len(candidates)))
+    for s in range(0, n, step):
+        X = obs["X"][s:s + step][None, :]
+        notional = X * obs["price"][s:s + step][None, :]
+        if kind == "temporary":
+            pred = expected_costs(X, obs["sigma"][s:s + step][None, :], candidates[:, None], 0.0, lambd, T)
+        else:
+            pred = candidates[:, None] * X**2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = (pred - obs["cost"][s:s + step][None, :]) / notional * 1e4
+        total += np.nansum(_huber(r), axis=1)
+    return total / n
+
+
+def _pool_losses(key, kind, candidates):
+    return losses(_WORKER_OBS[key][kind], kind, candidates)
+
+
+def grid_search(pool, workers, key, kind, grid, rounds=3, refine=9):
+    """
+    Coarse-to-fine search over a 1-D log grid: each round splits the
+    candidates across the pool, then zooms in around the best one.
+    Returns ``(best, loss)``.
+    """
+    best = best_loss = None
+    for _ in range(rounds):
+        grid = np.unique(np.asarray(grid, dtype=float))
+        parts = [p for p in np.array_split(grid, workers) if len(p)]
+        scores = np.concatenate([f.result() for f in [pool.submit(_pool_losses, key, kind, p) for p in parts]])
+        if np.isnan(scores).all():
+            return None, float("nan")
+        i = int(np.nanargmin(scores))
+        best, best_loss = float(grid[i]), float(scores[i])
+        lo = grid[max(i - 1, 0)]
+        hi = grid[min(i + 1, len(grid) - 1)]
+        if lo <= 0:
+            grid = np.concatenate(([0.0], np.linspace(0.0, hi, refine)[1:]))
+        else:
+            grid = np.geomspace(lo, hi, refine)
+    return best, best_loss
+
+
+# ----------------------------------------------------------------------
+# Cost regression refit
+# ----------------------------------------------------------------------
+def fit_cost_regression(trades, temporary_cost):
+    """
+    Least-squares fit of the CostRegressionModel features on realized
+    trade cost. Returns ``(coef, intercept)`` or None if underdetermined.
+    """
+    ts = trades["ts_ns"]
+    hours = ((ts % (86400 * 10**9)) / 3.6e12).astype(float)
+    X = np.column_stack([
+        trades["qty"], trades["price"], trades["buy"].astype(float),
+        np.nan_to_num(trades["volatility"], nan=0.02), np.where(ts >= 0, np.floor(hours) / 24, 0.5),
+    ])
+    y = temporary_cost
+    ok = np.isfinite(X).all(axis=1) & np.isfinite(y)
+    if ok.sum() <= X.shape[1]:
+        return None
+    A = np.column_stack([X[ok], np.ones(ok.sum())])
+    solution, *_ = np.linalg.lstsq(A, y[ok], rcond=None)
+    return solution[:-1], float(solution[-1])
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+def calibrate(replays=(), journals=(), out="models", workers=None, sample_interval=1.0, horizon=5.0,
+              fit_cost=False, min_observations=50):
+    """
+    Fit eta (temporary) and gamma (permanent) per ``venue:symbol`` and
+    publish each set as a versioned ``impact.<venue>_<symbol>`` artifact in
+    ``out``. Returns ``{key: {"eta", "gamma", ..., "version"}}``.
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+        books = replay_observations(replays, pool, workers, sample_interval) if replays else {}
+    trades = journal_trades(journals) if journals else {}
+    print(f"📥 Loaded {len(books)} captures and {sum(len(t['qty']) for t in trades.values()):,} trades "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    observations = {}
+    for key in sorted(set(books) | set(trades)):
+        temporary, permanent = [], []
+        if key in books:
+            temporary.append(books[key][2])
+        if key in trades:
+            mid_path = books[key][:2] if key in books else None
+            temp, perm = trade_observations(trades[key], horizon, mid_path)
+            temporary.append(temp)
+            permanent.append(perm)
+        observations[key] = {"temporary": _concat_obs(temporary), "permanent": _concat_obs(permanent)}
+
+    results = {}
+    # expected_costs clamps eta at 1e-6, so nothing below it is distinguishable.
+    eta_grid = np.geomspace(1e-6, 1e4, 41)
+    gamma_grid = np.concatenate(([0.0], np.geomspace(1e-10, 1e2, 48)))
+    with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(observations,)) as pool:
+        for key, obs in observations.items():
+            n_temp, n_perm = len(obs["temporary"]["X"]), len(obs["permanent"]["X"])
+            params = dict(IMPACT_PARAMS)
+            meta = {"symbol": key, "temporary_observations": n_temp, "permanent_observations": n_perm,
+                    "replays": list(replays), "journals": list(journals), "horizon_s": horizon}
+            if n_temp >= min_observations:
+                params["eta"], meta["temporary_loss"] = grid_search(pool, workers, key, "temporary", eta_grid)
+            if n_perm >= min_observations:
+                params["gamma"], meta["permanent_loss"] = grid_search(pool, workers, key, "permanent", gamma_grid)
+            if n_temp < min_observations and n_perm < min_observations:
+                print(f"⚠️ {key}: too few observations ({n_temp} temporary, {n_perm} permanent); skipped")
+                continue
+            version = publish_artifact(out, impact_artifact_name(key),
+                                       {name: np.float64(v) for name, v in params.items()}, meta)
+            results[key] = dict(params, version=version)
+            print(f"📐 {key}: eta={params['eta']:.4g} gamma={params['gamma']:.4g} "
+                  f"({n_temp:,} temporary / {n_perm:,} permanent obs) -> v{version}")
+
+    if fit_cost and trades:
+        parts = [(t, t["slippage"] * t["qty"]) for t in trades.values()]
+        merged = {name: np.concatenate([t[name] for t, _ in parts]) for name in parts[0][0]}
+        fitted = fit_cost_regression(merged, np.concatenate([c for _, c in parts]))
+        if fitted is not None:
+            from cost_model import FEATURES
+
+            coef, intercept = fitted
+            version = publish_artifact(out, COST_ARTIFACT, {"coef": coef, "intercept": np.float64(intercept)},
+                                       {"features": FEATURES, "source": "calibration"})
+            print(f"📦 Cost regression refit on {len(merged['qty']):,} trades -> {COST_ARTIFACT} v{version}")
+
+    print(f"⏱️ Calibration took {time.perf_counter() - start:.1f}s on {workers} workers")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate Almgren-Chriss impact parameters per symbol.")
+    parser.add_argument("--replay", nargs="*", default=[], help="replay.py captures (book history)")
+    parser.add_argument("--journal", nargs="*", default=[], help="columnar journal directories (executions)")
+    parser.add_argument("--out", default="models", help="artifact directory the live path loads from")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="seconds between sampled books")
+    parser.add_argument("--horizon", type=float, default=5.0, help="seconds for the permanent mid move")
+    parser.add_argument("--fit-cost", action="store_true", help="also refit the cost regression artifact")
+    args = parser.parse_args()
+    if not args.replay and not args.journal:
+        parser.error("give at least one --replay or --journal")
+    calibrate(args.replay, args.journal, args.out, args.workers, args.sample_interval, args.horizon, args.fit_cost)
+
+
+if __name__ == "__main__":
+    main()
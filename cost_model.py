@@ -1,19 +1,106 @@
 #cost_model.py
 import pickle
-import pandas as pd  # Import pandas
+import numpy as np
 import os
+from artifacts import COST_ARTIFACT, find_artifact, load_artifact, publish_artifact
+
+FEATURES = ['quantity', 'price', 'side', 'volatility', 'time_of_day']
+
+
+def encode_side(side):
+    """
+    Encode side as 1 for buy and 0 for sell. Accepts a single value or an
+    array of strings ("Buy"/"Sell", any case) or already-encoded numbers.
+    """
+    if isinstance(side, str):
+        return 1 if side.lower() == "buy" else 0
+    side = np.asarray(side)
+    if side.dtype.kind in "US":
+        return (np.char.lower(side.astype(str)) == "buy").astype(float)
+    if side.dtype.kind == "O":
+        return np.array([1.0 if str(s).lower() == "buy" else 0.0 for s in side.ravel()]).reshape(side.shape)
+    return side.astype(float)
+
 
 class CostRegressionModel:
     def __init__(self, model_path='cost_model.pkl'):
         """
-        Initialize the model by loading a trained regression model from a pickle file.
+        Initialize the model by loading a trained regression model from a pickle file,
+        or from an npz artifact (a file, or a directory holding versioned artifacts),
+        which needs neither sklearn nor pandas.
         """
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"❌ Model file '{model_path}' not found. Please train and save the model first.")
-        
+
+        self.model = None
+        self.version = 0
+        self._linear = None
+        self._linear_row = None
+
+        if os.path.isdir(model_path) or model_path.endswith(".npz"):
+            artifact = find_artifact(model_path, COST_ARTIFACT)
+            if artifact is None:
+                raise FileNotFoundError(f"❌ No {COST_ARTIFACT} artifact in '{model_path}'.")
+            arrays, meta = load_artifact(artifact)
+            self.swap_linear(arrays["coef"], float(arrays["intercept"]), meta.get("version", 0))
+            return
+
         with open(model_path, 'rb') as f:
             self.model = pickle.load(f)
 
+        linear = self._export_linear(self.model)
+        if linear is not None:
+            self.swap_linear(*linear)
+
+    def export(self, directory):
+        """
+        Publish the linear coefficients as a versioned npz artifact that
+        loads without sklearn or pandas. Returns the artifact version.
+        """
+        if self._linear is None:
+            raise ValueError("Only linear cost models can be exported as coefficients.")
+        coef, intercept = self._linear
+        return publish_artifact(directory, COST_ARTIFACT, {"coef": coef, "intercept": np.float64(intercept)},
+                                {"features": FEATURES, "source": type(self.model).__name__})
+
+    def swap_linear(self, coef, intercept, version=None):
+        """
+        Replace the linear coefficients, e.g. with a version published by the
+        online trainer. Predictions in flight keep the tuple they already
+        read, so the swap never blocks or tears the tick path.
+        """
+        coef = np.array(coef, dtype=float).ravel()
+        if coef.shape != (len(FEATURES),):
+            raise ValueError(f"Expected {len(FEATURES)} coefficients, got {coef.shape}.")
+        coef.flags.writeable = False
+        intercept = float(intercept)
+        # Python-float copy of the coefficients for the single-row path.
+        self._linear_row = (tuple(coef.tolist()), intercept)
+        self._linear = (coef, intercept)
+        if version is not None:
+            self.version = version
+
+    @staticmethod
+    def _export_linear(model):
+        """
+        Return (coef, intercept) when the model is a plain sklearn linear
+        regressor over our five features, otherwise None.
+        """
+        if not type(model).__module__.startswith("sklearn.linear_model"):
+            return None
+        coef = getattr(model, "coef_", None)
+        intercept = getattr(model, "intercept_", None)
+        if coef is None or intercept is None:
+            return None
+        coef = np.asarray(coef, dtype=float).ravel()
+        if coef.shape != (len(FEATURES),):
+            return None
+        return coef, float(np.ravel(intercept)[0])
+
+    @property
+    def is_linear(self):
+        return self._linear is not None
+
     def predict_cost(self, quantity, price, side, volatility, time_of_day):
         """
         Predict the transaction cost for a given trade.
@@ -28,14 +115,62 @@ class CostRegressionModel:
         Returns:
         - float: predicted transaction cost
         """
-        if self.model is None:
+        if self.model is None and self._linear is None:
             raise ValueError("Model is not loaded.")
-        
+
         side_encoded = 1 if side.lower() == "buy" else 0
 
+        linear = self._linear_row
+        if linear is not None:
+            # Fast path: evaluate the exported coefficients directly.
+            w, b = linear
+            return float(
+                b + w[0] * quantity + w[1] * price + w[2] * side_encoded
+                + w[3] * volatility + w[4] * time_of_day
+            )
+
+        import pandas as pd  # only needed by non-linear pickled models
+
         # Create a DataFrame with feature names matching training data
         features = pd.DataFrame([[quantity, price, side_encoded, volatility, time_of_day]],
-                                columns=['quantity', 'price', 'side', 'volatility', 'time_of_day'])
-        
+                                columns=FEATURES)
+
         predicted_cost = self.model.predict(features)
         return predicted_cost[0]
+
+    def predict_costs(self, quantity, price=None, side=None, volatility=None, time_of_day=None):
+        """
+        Predict transaction costs for many trades in one call.
+
+        Either pass five array-likes (broadcast against each other), or a
+        single structured array / DataFrame with the columns in FEATURES.
+        ``side`` may hold "Buy"/"Sell" strings or the 1/0 encoding.
+
+        Returns:
+        - np.ndarray of predicted costs
+        """
+        if self.model is None and self._linear is None:
+            raise ValueError("Model is not loaded.")
+
+        if price is None:
+            table = quantity
+            quantity, price, side, volatility, time_of_day = (table[name] for name in FEATURES)
+
+        X = np.column_stack(np.broadcast_arrays(
+            np.atleast_1d(np.asarray(quantity, dtype=float)),
+            np.atleast_1d(np.asarray(price, dtype=float)),
+            np.atleast_1d(np.asarray(encode_side(side), dtype=float)),
+            np.atleast_1d(np.asarray(volatility, dtype=float)),
+            np.atleast_1d(np.asarray(time_of_day, dtype=float)),
+        ))
+
+        linear = self._linear
+        if linear is not None:
+            w, b = linear
+            return X @ w + b
+
+        if hasattr(self.model, "feature_names_in_"):
+            import pandas as pd
+
+            X = pd.DataFrame(X, columns=FEATURES)
+        return np.asarray(self.model.predict(X), dtype=float)
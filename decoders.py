@@ -0,0 +1,174 @@
+# decoders.py
+#
+# Frame decoders for FeedPipeline / replay_into / the GUI feed thread.
+#
+#   json    stdlib json.loads
+#   orjson  orjson.loads (optional dependency)
+#   auto    orjson when installed, else json
+#   book    BookDecoder: only the header fields and the top ``depth`` book
+#           levels, tokenized straight into preallocated NumPy buffers
+#
+# All of them return a dict that OrderBook.apply accepts.
+
+import json
+import re
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DECODERS = ("auto", "json", "orjson", "book")
+
+HEADER_FIELDS = ("timestamp", "exchange", "symbol", "action")
+
+# Brackets, quotes and commas become spaces, so split() leaves one token per number.
+_STRIP = bytes.maketrans(b'[]",', b"    ")
+_VALUE = re.compile(rb'\s*:\s*("(?:[^"\\]|\\.)*"|[^,}\s]+)')
+# Bytes that can show up inside numeric payloads (exponents, null/true/false/nan/inf).
+_NUMERIC_LETTERS = frozenset(b"eEnulatrfsiINy")
+
+
+class _Key:
+    """
+    A quoted JSON key plus an anchor byte to memchr for. Numbers never
+    contain the anchor, so ``find`` skips the level arrays at memchr speed
+    instead of running a substring search across them.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.token = b'"%s"' % name.encode()
+        self.offset = next((i for i, c in enumerate(self.token[1:-1], 1) if c not in _NUMERIC_LETTERS), 1)
+        self.anchor = self.token[self.offset:self.offset + 1]
+
+    def find(self, raw, start=0):
+        token, offset, find = self.token, self.offset, raw.find
+        j = find(self.anchor, start + offset)
+        while j >= 0:
+            if raw.startswith(token, j - offset):
+                return j - offset
+            j = find(self.anchor, j + 1)
+        return -1
+
+
+_HEADER_KEYS = tuple(_Key(f) for f in HEADER_FIELDS)
+_BIDS = _Key("bids")
+_ASKS = _Key("asks")
+
+
+def fast_loads():
+    """The fastest full JSON decoder available."""
+    return orjson.loads if orjson is not None else json.loads
+
+
+def make_decoder(name="auto", depth=50):
+    """
+    Decoder callable for ``name`` (one of DECODERS). ``depth`` only
+    applies to "book"; None keeps every level, which is no faster than
+    orjson plus OrderBook.apply: the win comes from skipping levels.
+    """
+    if name == "auto":
+        return fast_loads()
+    if name == "json":
+        return json.loads
+    if name == "orjson":
+        if orjson is None:
+            raise ImportError("orjson is not installed (pip install orjson)")
+        return orjson.loads
+    if name == "book":
+        return BookDecoder(depth)
+    raise ValueError(f"unknown decoder {name!r}; expected one of {DECODERS}")
+
+
+class BookDecoder:
+    """
+    Selective L2 snapshot decoder.
+
+    Instead of building the full object tree (a list and two strings per
+    level), it reads the header fields, bounds the top ``depth`` levels of
+    each side with one regex match and converts them with a single
+    ``np.array(..., dtype=float)`` into buffers allocated once. The result
+    carries ``"levels": (bid_px, bid_sz, ask_px, ask_sz)``, best-first
+    views into those buffers: they are overwritten by the next call, so
+    apply them (OrderBook.apply copies) before decoding again.
+
+    Incremental ``"action": "update"`` frames and frames it cannot parse
+    go through the full ``fallback`` decoder.
+    """
+
+    def __init__(self, depth=50, capacity=2048, fallback=None):
+        self.depth = depth
+        n = min(depth, capacity) if depth else capacity
+        self.bid_px = np.zeros(n)
+        self.bid_sz = np.zeros(n)
+        self.ask_px = np.zeros(n)
+        self.ask_sz = np.zeros(n)
+        self.fallback = fallback or fast_loads()
+        self._levels = re.compile(rb"(?:[\s,]*\[[^\]]*\])" + (b"{0,%d}" % n if depth else b"*"))
+        self._all_levels = re.compile(rb"(?:[\s,]*\[[^\]]*\])*")
+        self.decoded = 0
+        self.fallbacks = 0
+
+    def __call__(self, frame):
+        raw = frame.encode() if isinstance(frame, str) else bytes(frame)
+        data = self._header(raw)
+        if data.get("action") != "update":
+            try:
+                nb = self._side(raw, _BIDS, self.bid_px, self.bid_sz, True)
+                na = self._side(raw, _ASKS, self.ask_px, self.ask_sz, False)
+            except ValueError:
+                nb = na = None
+            if nb is not None and na is not None:
+                data["levels"] = (self.bid_px[:nb], self.bid_sz[:nb], self.ask_px[:na], self.ask_sz[:na])
+                self.decoded += 1
+                return data
+        self.fallbacks += 1
+        return self.fallback(frame)
+
+    @staticmethod
+    def _header(raw):
+        data = {}
+        for key in _HEADER_KEYS:
+            i = key.find(raw)
+            if i < 0:
+                continue
+            m = _VALUE.match(raw, i + len(key.token))
+            if m is None:
+                continue
+            value = m.group(1)
+            if value[:1] == b'"' and b"\\" not in value:
+                data[key.name] = value[1:-1].decode()
+            else:
+                data[key.name] = json.loads(value)
+        return data
+
+    def _side(self, raw, key, px_buf, sz_buf, descending):
+        """Fill one side's buffers; returns the level count, or None if the side is malformed."""
+        i = key.find(raw)
+        if i < 0:
+            return 0
+        i += len(key.token)
+        start = raw.find(b"[", i) + 1
+        if not start or raw[i:start - 1].strip(b" \t\r\n:"):
+            return None
+        segment = raw[start:self._levels.match(raw, start).end()]
+        count = segment.count(b"[")
+        if not count:
+            return 0
+        # reshape raises ValueError (-> fallback) on ragged levels.
+        arr = np.array(segment.translate(_STRIP).split(), dtype=float).reshape(count, -1)
+        px = arr[:, 0]
+        if not (px[:-1] > px[1:] if descending else px[:-1] < px[1:]).all():
+            # Not best-first: the top levels may be anywhere, so read the
+            # whole side and sort it.
+            segment = raw[start:self._all_levels.match(raw, start).end()]
+            count = segment.count(b"[")
+            arr = np.array(segment.translate(_STRIP).split(), dtype=float).reshape(count, -1)
+            arr = arr[np.argsort(-arr[:, 0] if descending else arr[:, 0], kind="stable")]
+        n = min(count, len(px_buf))
+        px_buf[:n] = arr[:n, 0]
+        sz_buf[:n] = arr[:n, 1]
+        return n
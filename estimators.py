@@ -0,0 +1,207 @@
+# estimators.py
+
+import math
+import time
+
+
+class WelfordVariance:
+    """
+    Running mean/variance over every observation seen (Welford's method).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self):
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class EWMAVolatility:
+    """
+    Exponentially weighted mean/variance with a half-life in observations.
+    """
+
+    def __init__(self, halflife=50):
+        self.alpha = 1.0 - 0.5 ** (1.0 / halflife)
+        self.count = 0
+        self.mean = 0.0
+        self.variance = 0.0
+
+    def update(self, x):
+        if self.count == 0:
+            self.mean = x
+        else:
+            a = self.alpha
+            delta = x - self.mean
+            self.mean += a * delta
+            self.variance = (1.0 - a) * (self.variance + a * delta * delta)
+        self.count += 1
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class RollingWindow:
+    """
+    Sum, sum of squares and count of observations inside a wall-clock window.
+
+    Observations are folded into ``buckets`` time buckets of
+    ``seconds / buckets`` each, so memory is fixed whatever the tick rate,
+    nothing is ever dropped early, and an update is O(1) with no
+    allocation. The window edge moves in bucket steps: it covers between
+    ``seconds - seconds / buckets`` and ``seconds`` of history.
+    """
+
+    def __init__(self, seconds, buckets=64):
+        self.seconds = seconds
+        self.buckets = buckets
+        self.width = seconds / buckets
+        self._count = [0] * buckets
+        self._sum = [0.0] * buckets
+        self._sum_sq = [0.0] * buckets
+        self._current = None  # Absolute index (ts // width) of the newest bucket.
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def update(self, ts, x):
+        b = int(ts // self.width)
+        if b != self._current:
+            b = self._advance(b)
+        i = b % self.buckets
+        self._count[i] += 1
+        self._sum[i] += x
+        self._sum_sq[i] += x * x
+        self.count += 1
+        self.total += x
+        self.total_sq += x * x
+
+    def _advance(self, b):
+        """Make ``b`` the newest bucket, evicting the ones it pushes out; returns the bucket to use."""
+        current = self._current
+        if current is not None and b < current:
+            # Clock stepped back: count it in the newest bucket.
+            return current
+        if current is None or b - current >= self.buckets:
+            for i in range(self.buckets):
+                self._count[i] = 0
+                self._sum[i] = self._sum_sq[i] = 0.0
+            self.count = 0
+        else:
+            for k in range(current + 1, b + 1):
+                i = k % self.buckets
+                self.count -= self._count[i]
+                self.total -= self._sum[i]
+                self.total_sq -= self._sum_sq[i]
+                self._count[i] = 0
+                self._sum[i] = self._sum_sq[i] = 0.0
+        if not self.count:
+            # Reset to kill accumulated floating point drift.
+            self.total = 0.0
+            self.total_sq = 0.0
+        self._current = b
+        return b
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self):
+        if not self.count:
+            return 0.0
+        mean = self.total / self.count
+        return max(0.0, self.total_sq / self.count - mean * mean)
+
+
+class MarketStats:
+    """
+    Streaming volatility and microstructure statistics fed from top of book.
+
+    Each update takes the best bid/ask and costs O(1) with no allocation.
+    Tracks per-tick mid log returns (EWMA and all-time Welford), spread in
+    basis points, and realized variance / spread means over several
+    wall-clock windows at once.
+    """
+
+    def __init__(self, windows=(1.0, 10.0, 60.0), halflife=50, min_samples=10, default_sigma=0.02):
+        self.min_samples = min_samples
+        self.default_sigma = default_sigma
+        self.returns = WelfordVariance()
+        self.ewma = EWMAVolatility(halflife)
+        self.spread = EWMAVolatility(halflife)
+        self.return_windows = {w: RollingWindow(w) for w in windows}
+        self.spread_windows = {w: RollingWindow(w) for w in windows}
+        self.last_mid = None
+        self.last_ts = None
+
+    def update(self, bid, ask, ts=None):
+        if ts is None:
+            ts = time.monotonic()
+        mid = (bid + ask) / 2
+        if mid <= 0:
+            return
+        spread_bps = (ask - bid) / mid * 1e4
+        self.spread.update(spread_bps)
+        for window in self.spread_windows.values():
+            window.update(ts, spread_bps)
+
+        if self.last_mid is not None:
+            r = math.log(mid / self.last_mid)
+            self.returns.update(r)
+            self.ewma.update(r)
+            for window in self.return_windows.values():
+                window.update(ts, r)
+        self.last_mid = mid
+        self.last_ts = ts
+
+    @property
+    def sigma(self):
+        """
+        Per-tick log-return volatility used by the impact and cost models.
+        Falls back to ``default_sigma`` until enough returns are seen.
+        """
+        if self.ewma.count < self.min_samples:
+            return self.default_sigma
+        return self.ewma.std
+
+    def realized_variance(self, window):
+        """Sum of squared mid log returns over the last ``window`` seconds."""
+        return self.return_windows[window].total_sq
+
+    def realized_vol(self, window):
+        return math.sqrt(self.realized_variance(window))
+
+    def mean_spread_bps(self, window=None):
+        if window is None:
+            return self.spread.mean
+        return self.spread_windows[window].mean
+
+    def snapshot(self):
+        """Plain dict of the current statistics, for logging and display."""
+        out = {
+            "sigma": self.sigma,
+            "ewma_vol": self.ewma.std,
+            "return_mean": self.returns.mean,
+            "return_std": self.returns.std,
+            "spread_bps": self.spread.mean,
+        }
+        for w, window in self.return_windows.items():
+            out[f"rv_{w:g}s"] = window.total_sq
+            out[f"ticks_{w:g}s"] = window.count
+            out[f"spread_bps_{w:g}s"] = self.spread_windows[w].mean
+        return out
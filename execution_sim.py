@@ -0,0 +1,424 @@
+# execution_sim.py
+
+import argparse
+import csv
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from montecarlo import _deterministic_cost, ac_schedule, twap_schedule
+from orderbook import BUY, OrderBook
+from pricing import IMPACT_PARAMS
+
+SCHEDULES = ("AC", "TWAP", "POV")
+AGGRESSIVE = "aggressive"
+PASSIVE = "passive"
+STYLES = (AGGRESSIVE, PASSIVE)
+
+
+class BookTape:
+    """
+    The top ``depth`` levels of every frame in a window of a capture, as
+    dense (frames, depth) arrays. Missing levels have NaN price and 0 size.
+
+    Decoding is the expensive part, so a tape is built once per window and
+    shared by every schedule simulated on it.
+    """
+
+    def __init__(self, ts_ns, bid_px, bid_sz, ask_px, ask_sz, key=None):
+        self.ts_ns = ts_ns
+        self.bid_px = bid_px
+        self.bid_sz = bid_sz
+        self.ask_px = ask_px
+        self.ask_sz = ask_sz
+        self.key = key
+        self.mid = (bid_px[:, 0] + ask_px[:, 0]) / 2
+        self._volume = None
+
+    def __len__(self):
+        return len(self.ts_ns)
+
+    @classmethod
+    def from_log(cls, log, start_ns=None, stop_ns=None, depth=25):
+        """
+        Replay frames received in [start_ns, stop_ns) of a replay.FrameLog.
+        The book is first rebuilt from the last snapshot before the window,
+        so incremental-update feeds work; frames before it has both sides
+        are dropped.
+        """
+        start = log.seek(start_ns) if start_ns is not None else 0
+        stop = log.seek(stop_ns) if stop_ns is not None else len(log)
+        n = max(0, stop - start)
+        ts = np.empty(n, dtype=np.int64)
+        bid_px = np.full((n, depth), np.nan)
+        ask_px = np.full((n, depth), np.nan)
+        bid_sz = np.zeros((n, depth))
+        ask_sz = np.zeros((n, depth))
+        book = OrderBook()
+        for _, frame in log.iter_frames(log.last_snapshot(start), start):
+            book.apply(json.loads(frame))
+        f = 0
+        for t, frame in log.iter_frames(start, stop):
+            book.apply(json.loads(frame))
+            if not book.is_ready():
+                continue
+            nb = min(depth, book.n_bids)
+            na = min(depth, book.n_asks)
+            ts[f] = t
+            bid_px[f, :nb] = book.bid_px[:nb]
+            bid_sz[f, :nb] = book.bid_sz[:nb]
+            ask_px[f, :na] = book.ask_px[:na]
+            ask_sz[f, :na] = book.ask_sz[:na]
+            f += 1
+        key = f"{book.exchange}:{book.symbol}" if book.symbol else None
+        return cls(ts[:f], bid_px[:f], bid_sz[:f], ask_px[:f], ask_sz[:f], key)
+
+    @property
+    def volume(self):
+        """
+        Traded volume inferred between consecutive frames, per side the
+        aggressor consumed: ``(buy, sell)`` arrays of length len(tape),
+        0 for the first frame. Levels better than the new touch count as
+        swept; a shrinking touch level counts by the size it lost.
+        """
+        if self._volume is None:
+            self._volume = (self._swept(self.ask_px, self.ask_sz, asks=True),
+                            self._swept(self.bid_px, self.bid_sz, asks=False))
+        return self._volume
+
+    @staticmethod
+    def _swept(px, sz, asks):
+        out = np.zeros(len(px))
+        if len(px) < 2:
+            return out
+        prev_px, prev_sz = px[:-1], sz[:-1]
+        best = px[1:, :1]
+        gone = prev_px < best if asks else prev_px > best
+        at_best = np.where(prev_px == best, prev_sz, 0.0).sum(axis=1)
+        out[1:] = np.where(gone, prev_sz, 0.0).sum(axis=1) + np.maximum(0.0, at_best - sz[1:, 0]) * (at_best > 0)
+        return out
+
+    def price_sigma(self):
+        """Mid volatility in price units per second, for the AC schedule."""
+        if len(self) < 3:
+            return 0.0
+        dt = np.diff(self.ts_ns) / 1e9
+        dm = np.diff(self.mid)
+        ok = dt > 0
+        if not ok.any():
+            return 0.0
+        return float(np.sqrt(np.sum(dm[ok] ** 2) / np.sum(dt[ok])))
+
+
+# ----------------------------------------------------------------------
+# Fills
+# ----------------------------------------------------------------------
+def _take(px, sz, skip, quantity):
+    """
+    Walk one side of a frame for ``quantity`` after ``skip`` units already
+    taken by earlier children. Returns ``(filled, notional)``.
+    """
+    ok = ~np.isnan(px)
+    px, sz = px[ok], sz[ok]
+    if not len(px):
+        return 0.0, 0.0
+    cum = np.cumsum(sz)
+    cum_notional = np.cumsum(px * sz)
+    lo, hi = np.clip([skip, skip + quantity], 0.0, cum[-1])
+    # Notional of the first q units, for q = lo and q = hi at once.
+    q = np.array([lo, hi])
+    i = np.minimum(np.searchsorted(cum, q, side="left"), len(px) - 1)
+    prev = np.where(i > 0, cum[i - 1], 0.0)
+    prev_notional = np.where(i > 0, cum_notional[i - 1], 0.0)
+    notional = prev_notional + (q - prev) * px[i]
+    return float(hi - lo), float(notional[1] - notional[0])
+
+
+def _rest(tape, side, price, start, stop, quantity):
+    """
+    A passive order of ``quantity`` joining the back of the queue at
+    ``price`` on frame ``start`` and resting through frame ``stop - 1``.
+
+    Size lost at our level is treated as trades ahead of us (cancels
+    included, so queue progress is optimistic); the book trading through
+    our price fills the rest. Returns ``(filled, fill_frame)``.
+    """
+    buy = side == BUY
+    px = (tape.bid_px if buy else tape.ask_px)[start:stop]
+    sz = (tape.bid_sz if buy else tape.ask_sz)[start:stop]
+    at_level = np.where(px == price, sz, 0.0).sum(axis=1)
+    ahead = at_level[0]
+    depleted = np.concatenate(([0.0], np.cumsum(np.maximum(0.0, -np.diff(at_level)))))
+    filled = np.clip(depleted - ahead, 0.0, quantity)
+    best = px[:, 0]
+    through = (best < price) if buy else (best > price)
+    if through.any():
+        filled[np.argmax(through):] = quantity
+    done = np.flatnonzero(filled >= quantity)
+    if len(done):
+        return quantity, start + int(done[0])
+    return float(filled[-1]), stop - 1
+
+
+class _Execution:
+    """Fills of one parent order, with consumed depth and permanent impact carried between children."""
+
+    def __init__(self, tape, side, gamma, resilience):
+        self.tape = tape
+        self.side = side
+        self.sign = 1.0 if side == BUY else -1.0
+        self.gamma = gamma
+        self.resilience = resilience
+        self.consumed = 0.0
+        self.consumed_ts = None
+        self.filled = 0.0
+        self.notional = 0.0
+        self.passive = 0.0
+        self.children = 0
+
+    def _record(self, qty, notional):
+        # Recorded books never show our own footprint: add the modelled
+        # permanent impact of everything executed before this fill.
+        self.notional += notional + self.sign * self.gamma * self.filled * qty
+        self.filled += qty
+
+    def cross(self, frame, quantity):
+        if quantity <= 0:
+            return 0.0
+        tape = self.tape
+        t = tape.ts_ns[frame]
+        if self.consumed_ts is not None and self.resilience > 0:
+            self.consumed *= 0.5 ** ((t - self.consumed_ts) / 1e9 / self.resilience)
+        self.consumed_ts = t
+        buy = self.side == BUY
+        px = (tape.ask_px if buy else tape.bid_px)[frame]
+        sz = (tape.ask_sz if buy else tape.bid_sz)[frame]
+        qty, notional = _take(px, sz, self.consumed, quantity)
+        self.consumed += qty
+        self._record(qty, notional)
+        self.children += 1
+        return qty
+
+    def post(self, start, stop, quantity):
+        """Rest passively from frame ``start`` to ``stop``; cross whatever is left at ``stop - 1``."""
+        if quantity <= 0:
+            return 0.0
+        tape = self.tape
+        price = (tape.bid_px if self.side == BUY else tape.ask_px)[start, 0]
+        qty, _ = _rest(tape, self.side, price, start, stop, quantity)
+        self._record(qty, qty * price)
+        self.passive += qty
+        self.children += 1
+        return qty + self.cross(stop - 1, quantity - qty)
+
+
+# ----------------------------------------------------------------------
+# Schedules
+# ----------------------------------------------------------------------
+def _frame_at(tape, ts_ns):
+    return min(int(np.searchsorted(tape.ts_ns, ts_ns, side="left")), len(tape) - 1)
+
+
+def simulate(tape, side, quantity, schedule="TWAP", slices=10, duration=60.0, style=AGGRESSIVE,
+             participation=0.1, impact_params=IMPACT_PARAMS, resilience=1.0, start_ns=None):
+    """
+    Execute a parent order of ``quantity`` over ``duration`` seconds from
+    ``start_ns`` (default: the tape's first frame) in ``slices`` children.
+
+    AC and TWAP children follow montecarlo's holdings schedules; POV sizes
+    each child at ``participation`` of the volume the book showed trading
+    over the previous slice (the first child is quantity / slices). With
+    ``style`` "aggressive" children cross the book at slice start; with
+    "passive" they rest at the touch for the slice and cross any remainder
+    at its end. Whatever is left after the last slice crosses at the end.
+
+    Returns realized implementation shortfall against the arrival mid and
+    the cost the impact model predicted for the executed holdings.
+    """
+    side = side.lower()
+    if not len(tape):
+        raise ValueError("empty tape")
+    start_ns = int(tape.ts_ns[0]) if start_ns is None else int(start_ns)
+    step = int(duration * 1e9 / slices)
+    bounds = [_frame_at(tape, start_ns + k * step) for k in range(slices + 1)]
+    arrival = bounds[0]
+    arrival_mid = float(tape.mid[arrival])
+    half_spread = float(tape.ask_px[arrival, 0] - tape.bid_px[arrival, 0]) / 2
+    eta, gamma, lambd = impact_params["eta"], impact_params["gamma"], impact_params["lambd"]
+
+    if schedule == "AC":
+        planned = ac_schedule(quantity, slices, max(tape.price_sigma(), 1e-9), eta, gamma, lambd, duration)
+    elif schedule in ("TWAP", "POV"):
+        planned = twap_schedule(quantity, slices)
+    else:
+        raise ValueError(f"unknown schedule {schedule!r}; expected one of {SCHEDULES}")
+    planned = np.asarray(planned, dtype=float)
+
+    run = _Execution(tape, side, gamma, resilience)
+    volume = tape.volume[0 if side == BUY else 1]
+    holdings = [quantity]
+    for k in range(slices):
+        lo, hi = bounds[k], max(bounds[k + 1], bounds[k] + 1)
+        remaining = quantity - run.filled
+        if schedule == "POV" and k:
+            child = participation * float(volume[bounds[k - 1] + 1:lo + 1].sum())
+        else:
+            child = planned[k] - planned[k + 1]
+        child = min(max(child, 0.0), remaining)
+        if style == PASSIVE and hi > lo + 1:
+            run.post(lo, hi, child)
+        else:
+            run.cross(lo, child)
+        holdings.append(quantity - run.filled)
+    run.cross(bounds[-1], quantity - run.filled)
+    holdings[-1] = quantity - run.filled
+
+    sign = 1.0 if side == BUY else -1.0
+    realized = sign * (run.notional - arrival_mid * run.filled)
+    executed = np.asarray(holdings)
+    executed = executed - executed[-1]  # unfilled quantity never traded
+    predicted = half_spread * run.filled + _deterministic_cost(executed, duration, eta, gamma)
+    notional = arrival_mid * max(run.filled, 1e-12)
+    end_mid = float(tape.mid[bounds[-1]])
+    return {
+        "schedule": schedule,
+        "style": style,
+        "side": side,
+        "quantity": quantity,
+        "filled": run.filled,
+        "children": run.children,
+        "passive_fraction": run.passive / run.filled if run.filled else 0.0,
+        "avg_price": run.notional / run.filled if run.filled else float("nan"),
+        "arrival_mid": arrival_mid,
+        "realized_cost": realized,
+        "predicted_cost": predicted,
+        "cost_error": realized - predicted,
+        "realized_bps": realized / notional * 1e4,
+        "predicted_bps": predicted / notional * 1e4,
+        "market_move": sign * (end_mid - arrival_mid) * run.filled,
+    }
+
+
+# ----------------------------------------------------------------------
+# Batch sweeps
+# ----------------------------------------------------------------------
+def _sweep_window(path, start_ns, orders, duration, depth, impact_params, resilience):
+    """Build one window's tape and run every order spec on it. Runs in a worker."""
+    from replay import FrameLog
+
+    tape = BookTape.from_log(FrameLog(path), start_ns, start_ns + int(duration * 1e9), depth)
+    if len(tape) < 2:
+        return []
+    rows = []
+    for spec in orders:
+        row = simulate(tape, duration=duration, impact_params=impact_params, resilience=resilience,
+                       start_ns=start_ns, **spec)
+        row["start_ns"] = start_ns
+        rows.append(row)
+    return rows
+
+
+def sweep(path, orders, duration=300.0, every=None, depth=25, impact_params=IMPACT_PARAMS, resilience=1.0,
+          workers=None):
+    """
+    Run every order spec (kwargs for ``simulate`` such as side, quantity,
+    schedule, slices, style) in each ``duration`` window of a capture,
+    starting every ``every`` seconds (default: back to back). Windows are
+    decoded and simulated in parallel on a process pool.
+    """
+    from replay import FrameLog
+
+    log = FrameLog(path)
+    if not len(log):
+        return []
+    first, last = int(log.timestamps[0]), int(log.timestamps[-1])
+    every_ns = int((every or duration) * 1e9)
+    starts = list(range(first, max(first + 1, last - int(duration * 1e9) + 1), every_ns))
+    args = (orders, duration, depth, impact_params, resilience)
+    if workers and workers > 1 and len(starts) > 1:
+        with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn")) as pool:
+            parts = list(pool.map(_sweep_window, *zip(*[(path, s) + args for s in starts])))
+    else:
+        parts = [_sweep_window(path, s, *args) for s in starts]
+    skipped = sum(not part for part in parts)
+    if skipped and orders:
+        print(f"⚠️ Skipped {skipped} of {len(starts)} windows with fewer than two complete books",
+              file=sys.stderr)
+    return [row for part in parts for row in part]
+
+
+def summarize(rows):
+    """Mean realized vs predicted cost (bps) per schedule and style."""
+    out = {}
+    for row in rows:
+        out.setdefault((row["schedule"], row["style"]), []).append(row)
+    return {
+        key: {
+            "orders": len(group),
+            "fill_ratio": float(np.mean([r["filled"] / r["quantity"] for r in group])),
+            "realized_bps": float(np.mean([r["realized_bps"] for r in group])),
+            "predicted_bps": float(np.mean([r["predicted_bps"] for r in group])),
+            "error_bps": float(np.mean([r["realized_bps"] - r["predicted_bps"] for r in group])),
+            "passive_fraction": float(np.mean([r["passive_fraction"] for r in group])),
+        }
+        for key, group in out.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate child-order execution schedules on a recorded book.")
+    parser.add_argument("capture", help="replay.py capture path (without .frames/.index)")
+    parser.add_argument("--side", default="buy", choices=["buy", "sell"])
+    parser.add_argument("--qty", type=float, nargs="+", default=[10.0])
+    parser.add_argument("--duration", type=float, default=300.0, help="seconds per parent order")
+    parser.add_argument("--slices", type=int, default=10)
+    parser.add_argument("--schedules", nargs="+", default=list(SCHEDULES), choices=SCHEDULES)
+    parser.add_argument("--styles", nargs="+", default=list(STYLES), choices=STYLES)
+    parser.add_argument("--participation", type=float, default=0.1, help="POV participation rate")
+    parser.add_argument("--every", type=float, default=None, help="seconds between parent orders")
+    parser.add_argument("--depth", type=int, default=25, help="book levels kept per frame")
+    parser.add_argument("--resilience", type=float, default=1.0, help="half-life (s) of consumed depth")
+    parser.add_argument("--impact", default=None, help="artifact dir with calibrated impact parameters")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default=None, help="CSV of every simulated order")
+    args = parser.parse_args()
+
+    from pricing import load_impact_params
+    from replay import FrameLog
+
+    log = FrameLog(args.capture)
+    if not len(log):
+        parser.error("the capture is empty")
+    key = BookTape.from_log(log, stop_ns=int(log.timestamps[min(len(log) - 1, 100)]) + 1).key or ""
+    impact_params, version = load_impact_params(args.impact, key)
+    if version:
+        print(f"📐 Calibrated impact for {key} (v{version})", file=sys.stderr)
+
+    orders = [
+        {"side": args.side, "quantity": qty, "schedule": schedule, "slices": args.slices, "style": style,
+         "participation": args.participation}
+        for qty in args.qty for schedule in args.schedules for style in args.styles
+    ]
+    start = time.perf_counter()
+    rows = sweep(args.capture, orders, args.duration, args.every, args.depth, impact_params, args.resilience,
+                 args.workers)
+    elapsed = time.perf_counter() - start
+
+    if args.out and rows:
+        with open(args.out, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    for (schedule, style), stats in summarize(rows).items():
+        line = "  ".join(f"{k}={v:,.3f}" for k, v in stats.items() if k != "orders")
+        print(f"{schedule:>5} {style:<10} n={stats['orders']}  {line}")
+    print(f"⏱️ {len(rows):,} parent orders over {log.duration_s():,.0f}s of book in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# feeds.py
+
+import asyncio
+import multiprocessing as mp
+import queue
+import random
+import time
+from collections import namedtuple
+
+FEED_URL_TEMPLATE = "wss://ws.gomarket-cpp.goquant.io/ws/l2-orderbook/{venue}/{symbol}"
+
+
+def feed_url(venue, symbol):
+    return FEED_URL_TEMPLATE.format(venue=venue, symbol=symbol)
+
+
+class FeedSpec(namedtuple("FeedSpec", ["venue", "symbol", "url"])):
+    """
+    One L2 subscription: venue, symbol and the websocket URL serving it.
+    """
+
+    @classmethod
+    def parse(cls, text, default_venue="okx"):
+        """
+        Accepts ``venue:symbol``, a bare symbol (on ``default_venue``) or a
+        full ``ws://`` / ``wss://`` URL.
+        """
+        if text.startswith(("ws://", "wss://")):
+            parts = text.rstrip("/").split("/")
+            venue, symbol = (parts[-2], parts[-1]) if len(parts) >= 5 else ("local", text)
+            return cls(venue, symbol, text)
+        venue, _, symbol = text.rpartition(":")
+        venue = venue or default_venue
+        return cls(venue, symbol, feed_url(venue, symbol))
+
+    @property
+    def key(self):
+        return f"{self.venue}:{self.symbol}"
+
+
+class FeedManager:
+    """
+    Runs any number of feed connections on one event loop.
+
+    Each feed has its own reconnect loop with exponential backoff and
+    jitter; all of them push frames into one shared FeedPipeline, keyed by
+    ``venue:symbol`` so conflation and lag are tracked per feed.
+    """
+
+    def __init__(self, feeds, pipeline, initial_backoff=0.5, max_backoff=30.0, connect_kwargs=None):
+        self.feeds = list(feeds)
+        self.pipeline = pipeline
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.connect_kwargs = connect_kwargs or {}
+        self.status = {f.key: "idle" for f in self.feeds}
+        self.reconnects = {f.key: 0 for f in self.feeds}
+
+    async def run(self):
+        self.pipeline.start()
+        await asyncio.gather(*(self._run_feed(feed) for feed in self.feeds))
+
+    async def _run_feed(self, feed):
+        import websockets
+
+        backoff = self.initial_backoff
+        while True:
+            try:
+                self.status[feed.key] = "connecting"
+                async with websockets.connect(feed.url, **self.connect_kwargs) as websocket:
+                    print(f"✅ Connected to {feed.key}")
+                    self.status[feed.key] = "connected"
+                    backoff = self.initial_backoff
+                    await self.pipeline.receive(websocket, feed.key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.status[feed.key] = "backoff"
+                self.reconnects[feed.key] += 1
+                # Equal jitter keeps feeds on the same venue from reconnecting in lockstep.
+                delay = backoff / 2 + random.uniform(0, backoff / 2)
+                print(f"🔌 {feed.key}: {e!r}; reconnecting in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                backoff = min(backoff * 2, self.max_backoff)
+
+
+def shard(feeds, workers):
+    """Split ``feeds`` round-robin into at most ``workers`` non-empty groups."""
+    groups = [feeds[i::workers] for i in range(workers)]
+    return [g for g in groups if g]
+
+
+def _worker(index, feeds, stats_queue, interval, trader_kwargs, record):
+    from journal import TradeJournal
+    from websocket_client import WebSocketTrader
+
+    # Each process journals (and records) to its own files; interleaved
+    # appends from several processes would corrupt the layouts.
+    journal = TradeJournal(prefix=f"executed_trades-w{index}")
+    recorder = None
+    if record:
+        from replay import FrameRecorder
+        recorder = FrameRecorder(f"{record}-w{index}")
+    trader = WebSocketTrader(feeds=feeds, journal=journal, recorder=recorder, report_interval=None,
+                             **trader_kwargs)
+
+    async def main():
+        task = asyncio.create_task(trader.connect_websocket())
+        while not task.done():
+            await asyncio.sleep(interval)
+            stats_queue.put((index, time.time(), trader.pipeline.metrics.snapshot()))
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        trader.close()
+
+
+def run_sharded(feeds, workers, interval=10.0, trader_kwargs=None, record=None):
+    """
+    Shard ``feeds`` across ``workers`` processes, each running its own
+    WebSocketTrader, and print aggregate throughput and per-feed lag.
+    With ``record``, worker ``i`` captures its raw frames to ``<record>-w<i>``.
+    """
+    ctx = mp.get_context("spawn")
+    stats_queue = ctx.Queue()
+    processes = [
+        ctx.Process(target=_worker, args=(i, group, stats_queue, interval, trader_kwargs or {}, record),
+                    daemon=True)
+        for i, group in enumerate(shard(list(feeds), workers))
+    ]
+    for p in processes:
+        p.start()
+    print(f"🧩 Sharded {len(feeds)} feeds over {len(processes)} workers")
+
+    latest = {}
+    try:
+        while any(p.is_alive() for p in processes):
+            try:
+                index, ts, snap = stats_queue.get(timeout=interval * 2)
+            except queue.Empty:
+                continue
+            prev = latest.get(index)
+            rate = 0.0
+            if prev is not None and ts > prev[0]:
+                rate = (snap["processed"] - prev[1]["processed"]) / (ts - prev[0])
+            latest[index] = (ts, snap, rate)
+
+            total_rate = sum(entry[2] for entry in latest.values())
+            print(f"📊 {len(latest)}/{len(processes)} workers reporting: {total_rate:,.0f} frames/s total")
+            for _, worker_snap, _ in latest.values():
+                for key, lag in worker_snap["per_key"].items():
+                    print(f"   {key:<30} lag mean={lag['mean_latency_us']:.0f}us "
+                          f"max={lag['max_latency_us']:.0f}us processed={lag['processed']}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in processes:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
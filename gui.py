@@ -1,45 +1,79 @@
 #gui.py
 from PyQt5.QtWidgets import (
     QMainWindow, QLabel, QVBoxLayout, QHBoxLayout, QWidget,
-    QPushButton, QTextEdit, QLineEdit, QComboBox, QTableWidget,
-    QTableWidgetItem, QGroupBox, QFormLayout, QProgressBar, QMessageBox
+    QPushButton, QLineEdit, QComboBox, QTableView,
+    QGroupBox, QFormLayout, QProgressBar
 )
-from PyQt5.QtCore import pyqtSignal, Qt, QTimer
+from PyQt5.QtCore import QTimer
 import asyncio
 import threading
-import websockets
-import json
+import os
 import time
-import numpy as np
-from collections import deque
 from cost_model import CostRegressionModel
 from models import ModelManager
-from impact_model import AlmgrenChrissModel
+from pricing import FEE_TIERS, IMPACT_PARAMS, fee_rate, load_impact_params, quote_costs
+from orderbook import OrderBook
+from decoders import make_decoder
+from market_snapshot import SnapshotPublisher
+from estimators import MarketStats
+from websocket_client import WS_URL
+from feeds import FeedSpec
+from gui_views import OrdersTableModel, LogView
+from artifacts import COST_ARTIFACT, MAKER_TAKER_ARTIFACT, find_artifact
+from latency import (
+    LATENCY, JSON_DECODE, BOOK_UPDATE, GUI_PUBLISH
+)
+
+# Price, metrics, log and table changes reach the widgets at most this often.
+FRAME_RATE = 30
 
-class MainWindow(QMainWindow):
-    update_price_signal = pyqtSignal(str)
 
+class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Trading Cost Analytics Simulator")
         self.setGeometry(100, 100, 1100, 640)
         self.setStyleSheet(self.load_stylesheet())
         self.init_ui()
-        self.update_price_signal.connect(self.update_price_label)
-        self.latest_price = None
-        self.top_bid_price = None
-        self.top_ask_price = None
-        self.price_history = deque(maxlen=100)
-        self.volatility = 0.02
-
+        # The feed thread publishes immutable MarketSnapshots here; the GUI
+        # thread only ever reads market data through market.current().
+        self.market = SnapshotPublisher()
+        self._price_dirty = False
+        self._metrics = None
+        self.frame_timer = QTimer(self)
+        self.frame_timer.timeout.connect(self.render_frame)
+        self.frame_timer.start(1000 // FRAME_RATE)
+        self.ws_url = WS_URL
+        self.ws_thread = None
+        self.order_book = OrderBook()
+        self.market_stats = MarketStats()
+        self.impact_params = dict(IMPACT_PARAMS)
+        # Orders walk the full book, so decode every level unless TCA_DECODER=book
+        # (with TCA_DEPTH levels per side) trades depth for decode time.
+        self.decode = make_decoder(os.environ.get("TCA_DECODER", "auto"), int(os.environ.get("TCA_DEPTH", 400)))
+
+        # TCA_MODEL_DIR: start from the npz artifacts there (no sklearn/pandas
+        # import or unpickling) and hot-swap to newer versions as they are published.
+        model_dir = os.environ.get("TCA_MODEL_DIR")
+        cost_path, maker_taker_path = "cost_model.pkl", "maker_taker_model.pkl"
+        if model_dir and find_artifact(model_dir, COST_ARTIFACT):
+            cost_path = model_dir
+        if model_dir and find_artifact(model_dir, MAKER_TAKER_ARTIFACT):
+            maker_taker_path = model_dir
         try:
-            self.cost_model = CostRegressionModel()
-            self.model_mgr = ModelManager()
+            self.cost_model = CostRegressionModel(cost_path)
+            self.model_mgr = ModelManager(maker_taker_path)
             self.append_log("✅ Models loaded successfully.")
         except FileNotFoundError as e:
             self.cost_model = None
             self.append_log(f"⚠️ Warning: {str(e)}")
 
+        self.online_models = None
+        if model_dir and self.cost_model:
+            from trainer import OnlineLearning
+            self.online_models = OnlineLearning(model_dir, self.cost_model, self.model_mgr, train=False)
+            self.append_log(f"🔄 Following models published to {model_dir}")
+
     def load_stylesheet(self):
         return '''
         QWidget {
@@ -48,7 +82,7 @@ class MainWindow(QMainWindow):
             font-family: Consolas;
             font-size: 11pt;
         }
-        QLineEdit, QComboBox, QTextEdit {
+        QLineEdit, QComboBox, QPlainTextEdit {
             background-color: #2e2e2e;
             border: 1px solid #555;
             padding: 4px;
@@ -68,7 +102,7 @@ class MainWindow(QMainWindow):
             padding: 10px;
             font-weight: bold;
         }
-        QTableWidget {
+        QTableView {
             background-color: #2e2e2e;
             border: 1px solid #333;
         }
@@ -87,7 +121,7 @@ class MainWindow(QMainWindow):
         self.side_input.addItems(["Buy", "Sell"])
         self.qty_input = QLineEdit("100")
         self.fee_input = QComboBox()
-        self.fee_input.addItems(["Tier 1 (0.10%)", "Tier 2 (0.08%)", "Tier 3 (0.05%)"])
+        self.fee_input.addItems(list(FEE_TIERS))
 
         self.order_button = QPushButton("Place Order")
         self.order_button.clicked.connect(self.place_order)
@@ -104,11 +138,14 @@ class MainWindow(QMainWindow):
 
         output_layout = QVBoxLayout()
         self.price_label = QLabel("💰 Live Price: ---")
-        self.log_output = QTextEdit()
-        self.log_output.setReadOnly(True)
+        self.log_output = LogView()
 
-        self.orders_table = QTableWidget(0, 6)
-        self.orders_table.setHorizontalHeaderLabels(["Time", "Symbol", "Side", "Qty", "Price", "Status"])
+        self.orders_model = OrdersTableModel(["Time", "Symbol", "Side", "Qty", "Price", "Status", "Book v"])
+        self.orders_table = QTableView()
+        self.orders_table.setModel(self.orders_model)
+        # Fixed row heights let the view skip measuring 100k rows.
+        self.orders_table.verticalHeader().setDefaultSectionSize(22)
+        self.orders_table.verticalHeader().setSectionResizeMode(self.orders_table.verticalHeader().Fixed)
 
         self.metrics_group = QGroupBox("📊 Performance Metrics")
         metrics_layout = QFormLayout()
@@ -150,11 +187,11 @@ class MainWindow(QMainWindow):
 
     def place_order(self):
         try:
-            start_time = time.perf_counter()
             symbol = self.symbol_input.text()
             side = self.side_input.currentText()
             quantity = self.qty_input.text()
-            price = float(self.latest_price) if self.latest_price else 0.0
+            snap = self.market.current()
+            price = snap.mid if snap is not None else 0.0
 
             if not symbol or not quantity or price == 0.0:
                 self.append_log("❌ Invalid input.")
@@ -165,121 +202,161 @@ class MainWindow(QMainWindow):
                 self.append_log("❌ Quantity must be positive.")
                 return
 
-            row = self.orders_table.rowCount()
-            self.orders_table.insertRow(row)
-            self.orders_table.setItem(row, 0, QTableWidgetItem(time.strftime("%H:%M:%S")))
-            self.orders_table.setItem(row, 1, QTableWidgetItem(symbol))
-            self.orders_table.setItem(row, 2, QTableWidgetItem(side))
-            self.orders_table.setItem(row, 3, QTableWidgetItem(quantity))
-            self.orders_table.setItem(row, 4, QTableWidgetItem(f"{price:.2f}"))
-            self.orders_table.setItem(row, 5, QTableWidgetItem("Pending"))
+            row = self.orders_model.add_row(
+                [time.strftime("%H:%M:%S"), symbol, side, quantity, f"{price:.2f}", "Pending", ""]
+            )
 
             self.reset_metrics_pending()
-            QTimer.singleShot(1000, lambda: self.execute_order(row, qty_float, price, side, start_time))
+            QTimer.singleShot(1000, lambda: self.execute_order(row, qty_float, price, side))
         except Exception as e:
             self.append_log(f"❌ Error in placing order: {e}")
 
-    def execute_order(self, row, quantity, order_price, side, start_time):
+    def execute_order(self, row, quantity, order_price, side):
         try:
-            if side.lower() == "buy":
-                exec_price = float(self.top_ask_price) if self.top_ask_price else order_price
-            else:
-                exec_price = float(self.top_bid_price) if self.top_bid_price else order_price
-
-            slippage = exec_price - order_price if side.lower() == "buy" else order_price - exec_price
-            fee_map = {"Tier 1 (0.10%)": 0.0010, "Tier 2 (0.08%)": 0.0008, "Tier 3 (0.05%)": 0.0005}
-            rate = fee_map[self.fee_input.currentText()]
-            fees = exec_price * quantity * rate
+            # One snapshot for the whole quote: book, mid and vol from the same tick.
+            snap = self.market.current()
+            if snap is None:
+                self.append_log("❌ No market data to price against.")
+                return
+            # Latency covers pricing work only, not the simulated fill delay.
+            start_time = time.perf_counter()
+            # Walk the book so large orders pay for the depth they consume.
+            quote = quote_costs(
+                snap.book, side, quantity, order_price, fee=fee_rate(self.fee_input.currentText()),
+                volatility=snap.volatility, time_of_day=time.gmtime().tm_hour / 24,
+                cost_model=self.cost_model, model_manager=self.model_mgr, impact_params=self.impact_params,
+            )
+            latency_ms = (time.perf_counter() - start_time) * 1000
 
+            exec_price = float(quote["exec_price"][0])
+            filled = float(quote["filled"][0])
+            slippage = float(quote["slippage"][0])
+            fees = float(quote["fees"][0])
+            impact_cost = float(quote["impact"][0])
+            net_cost = float(quote["net_cost"][0])
+            maker_taker = "Maker" if quote["maker_taker"][0] == 1 else "Taker"
+            predicted_cost = float(quote["predicted_cost"][0]) if self.cost_model else None
+
+            if filled < quantity:
+                self.append_log(f"⚠️ Book depth only covers {filled:.4f} of {quantity}; remainder priced at the book VWAP.")
             # Safeguard against fees exploding due to wrong quantity/price
             if fees > 0.1 * exec_price * quantity:
                 self.append_log(f"⚠️ Warning: Fee unusually high. Check quantity input. Computed fee: {fees:.2f}")
 
-            ac = AlmgrenChrissModel(X=quantity, N=10, sigma=self.volatility, eta=0.01, gamma=0.01, lambd=1e-6, T=1)
-            impact_cost = ac.expected_cost()
-            net_cost = slippage + fees + impact_cost
-            latency_ms = (time.perf_counter() - start_time) * 1000
-
-            spread = slippage / ((exec_price + order_price) / 2) if (exec_price + order_price) > 0 else 0
-            maker_taker = "Maker" if self.model_mgr.predict_maker_taker(spread) == 1 else "Taker"
-
-            time_of_day = float(time.strftime("%H")) / 24
-            side_str = side.lower()
-            predicted_cost = None
-            if self.cost_model:
-                try:
-                    predicted_cost = self.cost_model.predict_cost(
-                        quantity, exec_price, side_str, self.volatility, time_of_day
-                    )
-                except Exception as e:
-                    self.append_log(f"❌ Prediction error: {e}")
-
-            self.orders_table.setItem(row, 4, QTableWidgetItem(f"{exec_price:.2f}"))
-            self.orders_table.setItem(row, 5, QTableWidgetItem("Executed"))
-
-            self.slippage_label.setText(f"${slippage:.4f}")
-            self.fees_label.setText(f"${fees:.4f}")
-            self.impact_label.setText(f"${impact_cost:.4f}")
-            self.net_cost_label.setText(f"${net_cost:.4f}")
-            self.latency_label.setText(f"{latency_ms:.2f} ms")
-            self.maker_taker_label.setText(maker_taker)
-            if predicted_cost is not None:
-                self.predicted_cost_label.setText(f"${predicted_cost:.4f}")
-            self.cost_bar.setValue(min(int(net_cost), 1000))
-
-            self.append_log(f"✅ Executed {side} {quantity} @ {exec_price:.2f}")
-
-            msg = QMessageBox()
-            msg.setIcon(QMessageBox.Information)
-            msg.setText(f"✅ Order Confirmed")
-            msg.setInformativeText(f"{side} {quantity} units @ {exec_price:.2f}")
-            msg.setWindowTitle("Trade Executed")
-            msg.exec_()
+            self.orders_model.set_cell(row, 4, f"{exec_price:.2f}")
+            self.orders_model.set_cell(row, 5, "Executed")
+            self.orders_model.set_cell(row, 6, str(snap.version))
+
+            self._metrics = {
+                self.slippage_label: f"${slippage:.4f}",
+                self.fees_label: f"${fees:.4f}",
+                self.impact_label: f"${impact_cost:.4f}",
+                self.net_cost_label: f"${net_cost:.4f}",
+                self.latency_label: f"{latency_ms:.2f} ms",
+                self.maker_taker_label: maker_taker,
+                self.predicted_cost_label: f"${predicted_cost:.4f}" if predicted_cost is not None else "---",
+                self.cost_bar: min(int(net_cost), 1000),
+            }
+
+            self.append_log(f"✅ Executed {side} {quantity} @ {exec_price:.2f} "
+                            f"(book v{snap.version}, {snap.age_ms:.1f} ms old)")
+            # A status message instead of a modal box, so bursts of orders never block the UI.
+            self.statusBar().showMessage(f"✅ Order Confirmed: {side} {quantity} units @ {exec_price:.2f}", 5000)
         except Exception as e:
             self.append_log(f"❌ Execution error: {e}")
 
     def reset_metrics_pending(self):
-        self.slippage_label.setText("---")
-        self.fees_label.setText("---")
-        self.impact_label.setText("---")
-        self.net_cost_label.setText("---")
-        self.maker_taker_label.setText("---")
-        self.latency_label.setText("---")
-        self.predicted_cost_label.setText("---")
-        self.cost_bar.setValue(0)
+        self._metrics = {
+            label: "---" for label in (
+                self.slippage_label, self.fees_label, self.impact_label, self.net_cost_label,
+                self.maker_taker_label, self.latency_label, self.predicted_cost_label,
+            )
+        }
+        self._metrics[self.cost_bar] = 0
+
+    def render_frame(self):
+        """
+        Push everything that changed since the last frame to the widgets:
+        queued orders and log lines, the latest price and the latest metrics.
+        Ticks and orders only update Python state; this runs FRAME_RATE
+        times per second however fast they arrive.
+        """
+        self.orders_model.flush()
+        self.log_output.flush()
+        if self.ws_thread is not None and not self.ws_thread.is_alive():
+            # The feed ended (connection error); allow a new one.
+            self.ws_thread = None
+            self.start_button.setEnabled(True)
+        if self._price_dirty:
+            self._price_dirty = False
+            snap = self.market.current()
+            if snap is not None:
+                self.update_price_label(f"{snap.mid:.2f}")
+        metrics, self._metrics = self._metrics, None
+        if metrics:
+            for widget, value in metrics.items():
+                if widget is self.cost_bar:
+                    widget.setValue(value)
+                else:
+                    widget.setText(value)
 
     def start_ws(self):
-        self.append_log("🔌 Connecting to GoQuant WebSocket...")
-        thread = threading.Thread(target=self.run_ws_thread)
-        thread.daemon = True
-        thread.start()
+        # One feed thread at a time: order_book and market_stats belong to it.
+        if self.ws_thread is not None:
+            return
+        self.start_button.setEnabled(False)
+        # The symbol field picks the feed ("venue:symbol" or a bare OKX symbol)
+        # unless TCA_WS_URL pins one explicitly.
+        spec = FeedSpec.parse(self.symbol_input.text().strip())
+        if "TCA_WS_URL" not in os.environ:
+            self.ws_url = spec.url
+        # Impact parameters calibrated for this symbol (calibration.py), if any.
+        self.impact_params, version = load_impact_params(os.environ.get("TCA_MODEL_DIR"), spec.key)
+        if version:
+            self.append_log(f"📐 Calibrated impact for {spec.key} (v{version}): "
+                            f"eta={self.impact_params['eta']:.4g} gamma={self.impact_params['gamma']:.4g}")
+        self.order_book = OrderBook()
+        self.market_stats = MarketStats()
+        self.market.clear()
+        self.append_log(f"🔌 Connecting to GoQuant WebSocket ({self.ws_url})...")
+        self.ws_thread = threading.Thread(target=self.run_ws_thread)
+        self.ws_thread.daemon = True
+        self.ws_thread.start()
 
     def run_ws_thread(self):
         asyncio.run(self.websocket_loop())
 
     async def websocket_loop(self):
-        url = "wss://ws.gomarket-cpp.goquant.io/ws/l2-orderbook/okx/BTC-USDT-SWAP"
+        import websockets
+
         try:
-            async with websockets.connect(url, ping_interval=10, ping_timeout=5) as ws:
+            async with websockets.connect(self.ws_url, ping_interval=10, ping_timeout=5) as ws:
                 self.append_log("📡 Subscribed to GoQuant orderbook")
                 while True:
                     message = await ws.recv()
-                    data = json.loads(message)
-                    self.top_bid_price = float(data["bids"][0][0])
-                    self.top_ask_price = float(data["asks"][0][0])
-                    mid_price = (self.top_bid_price + self.top_ask_price) / 2
-
-                    self.latest_price = f"{mid_price:.2f}"
-                    self.update_price_signal.emit(self.latest_price)
-
-                    self.price_history.append(mid_price)
-                    if len(self.price_history) > 10:
-                        log_returns = np.diff(np.log(self.price_history))
-                        self.volatility = np.std(log_returns)
+                    with LATENCY.stage(JSON_DECODE):
+                        data = self.decode(message)
+                    self.on_frame(data)
 
         except Exception as e:
             self.append_log(f"❌ WebSocket error: {e}")
 
+    def on_frame(self, data):
+        """
+        Apply one decoded book frame and publish a new MarketSnapshot (feed
+        thread). order_book and market_stats belong to this thread; the GUI
+        sees the snapshot on its next render_frame.
+        """
+        with LATENCY.stage(BOOK_UPDATE):
+            self.order_book.apply(data)
+        if not self.order_book.is_ready():
+            return
+        self.market_stats.update(self.order_book.best_bid(), self.order_book.best_ask())
+
+        with LATENCY.stage(GUI_PUBLISH):
+            self.market.publish(self.order_book, self.market_stats.sigma)
+            self._price_dirty = True
+
     def append_log(self, text):
         self.log_output.append(text)
 
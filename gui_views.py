@@ -0,0 +1,114 @@
+# gui_views.py
+
+import threading
+from collections import deque
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QTextCursor
+from PyQt5.QtWidgets import QPlainTextEdit
+
+
+class OrdersTableModel(QAbstractTableModel):
+    """
+    Orders for a QTableView. Rows are plain lists; the view only asks for
+    the cells it shows, so 100k orders cost no more to draw than 20.
+
+    ``add_row`` and ``set_cell`` only record the change; ``flush`` (called
+    once per frame) announces all queued rows with one insert and all
+    edits with one dataChanged per column range.
+    """
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self._rows = []
+        self._pending = []
+        self._dirty = None  # (first_row, last_row, first_col, last_col)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self._rows[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def add_row(self, values):
+        """Queue a row; returns its row number."""
+        self._pending.append(list(values))
+        return len(self._rows) + len(self._pending) - 1
+
+    def set_cell(self, row, column, value):
+        if row >= len(self._rows):
+            self._pending[row - len(self._rows)][column] = value
+            return
+        self._rows[row][column] = value
+        if self._dirty is None:
+            self._dirty = (row, row, column, column)
+        else:
+            r0, r1, c0, c1 = self._dirty
+            self._dirty = (min(r0, row), max(r1, row), min(c0, column), max(c1, column))
+
+    def cell(self, row, column):
+        if row >= len(self._rows):
+            return self._pending[row - len(self._rows)][column]
+        return self._rows[row][column]
+
+    def flush(self):
+        """Publish queued inserts and edits to the views. Returns rows inserted."""
+        if self._dirty is not None:
+            r0, r1, c0, c1 = self._dirty
+            self._dirty = None
+            self.dataChanged.emit(self.index(r0, c0), self.index(r1, c1), [Qt.DisplayRole])
+        n = len(self._pending)
+        if n:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + n - 1)
+            self._rows.extend(self._pending)
+            self._pending = []
+            self.endInsertRows()
+        return n
+
+
+class LogView(QPlainTextEdit):
+    """
+    Read-only log capped at ``max_lines`` blocks. ``append`` is thread-safe
+    and only queues the line; ``flush`` (GUI thread, once per frame) adds
+    everything queued in one edit.
+    """
+
+    def __init__(self, max_lines=5000, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_lines)
+        self.max_lines = max_lines
+        self._queue = deque()
+        self._lines = deque(maxlen=max_lines)  # what the widget currently shows
+        self._lock = threading.Lock()
+
+    def append(self, text):
+        with self._lock:
+            self._queue.append(text)
+
+    def flush(self):
+        with self._lock:
+            if not self._queue:
+                return 0
+            lines = list(self._queue)
+            self._queue.clear()
+        self._lines.extend(lines)
+        if len(lines) * 4 >= self.max_lines:
+            # Trimming block by block is slow; re-set the visible tail in one go.
+            self.setPlainText("\n".join(self._lines))
+            self.moveCursor(QTextCursor.End)
+        else:
+            self.appendPlainText("\n".join(lines))
+        return len(lines)
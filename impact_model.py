@@ -2,6 +2,110 @@
 
 import numpy as np
 
+# Below this kappa*T the closed forms are replaced by their Taylor series.
+_SMALL_KT = 1e-4
+
+
+def _clamp(X, sigma, eta, gamma, lambd, T):
+    """Apply the same lower bounds as AlmgrenChrissModel, element-wise."""
+    return (
+        np.maximum(0.01, np.asarray(X, dtype=float)),
+        np.maximum(1e-6, np.asarray(sigma, dtype=float)),
+        np.maximum(1e-6, np.asarray(eta, dtype=float)),
+        np.maximum(0.0, np.asarray(gamma, dtype=float)),
+        np.maximum(1e-10, np.asarray(lambd, dtype=float)),
+        np.maximum(1e-3, np.asarray(T, dtype=float)),
+    )
+
+
+def _kappa(sigma, eta, lambd):
+    return np.sqrt(lambd * sigma**2 / eta)
+
+
+def _kappa_coth(kappa, T):
+    """
+    kappa * coth(kappa * T), stable for all kappa * T >= 0.
+
+    Uses 1 / tanh, which saturates to 1 instead of overflowing like
+    cosh / sinh, and the series 1/T + kappa^2 T / 3 near zero.
+    """
+    y = kappa * T
+    small = y < _SMALL_KT
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exact = kappa / np.tanh(np.where(small, 1.0, y))
+    return np.where(small, 1.0 / T + kappa * y / 3.0, exact)
+
+
+def _variance_factor(kappa, T):
+    """
+    Integral of (sinh(kappa (T - t)) / sinh(kappa T))^2 over [0, T].
+
+    Closed form: coth(kT) / (2k) - T / (2 sinh^2(kT)). The csch^2 term is
+    evaluated as 4 e^{-2y} / expm1(-2y)^2 so it decays to 0 without
+    overflow; the series T (1/3 - 2 y^2 / 45 + 2 y^4 / 315) covers small y.
+    """
+    y = kappa * T
+    small = y < 1e-2
+    ys = np.where(small, 1.0, y)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        csch2 = 4.0 * np.exp(-2.0 * ys) / np.expm1(-2.0 * ys) ** 2
+        exact = 1.0 / (2.0 * np.where(small, 1.0, kappa) * np.tanh(ys)) - T * csch2 / 2.0
+    return np.where(small, T * (1.0 / 3.0 - 2.0 * y**2 / 45.0 + 2.0 * y**4 / 315.0), exact)
+
+
+def expected_costs(X, sigma, eta, gamma, lambd, T):
+    """
+    Expected cost of the optimal strategy for a whole parameter grid.
+    All arguments broadcast against each other; returns an ndarray.
+    """
+    X, sigma, eta, gamma, lambd, T = _clamp(X, sigma, eta, gamma, lambd, T)
+    kappa = _kappa(sigma, eta, lambd)
+    return gamma * X**2 + eta * X**2 * _kappa_coth(kappa, T)
+
+
+def cost_variances(X, sigma, eta, lambd, T):
+    """
+    Variance of the cost of the optimal strategy, sigma^2 * integral of x(t)^2,
+    for a whole parameter grid. Arguments broadcast against each other.
+    """
+    X, sigma, eta, _, lambd, T = _clamp(X, sigma, eta, 0.0, lambd, T)
+    kappa = _kappa(sigma, eta, lambd)
+    return sigma**2 * X**2 * _variance_factor(kappa, T)
+
+
+def trajectories(X, sigma, eta, lambd, T, N):
+    """
+    Optimal holdings x_0..x_N for a whole parameter grid.
+
+    Returns an array of shape broadcast(X, sigma, eta, lambd, T) + (N + 1,).
+    sinh(k (T - t)) / sinh(k T) is evaluated as
+    e^{-k t} * expm1(-2k (T - t)) / expm1(-2k T), which neither overflows
+    for large k T nor loses precision for small k T.
+    """
+    X, sigma, eta, _, lambd, T = _clamp(X, sigma, eta, 0.0, lambd, T)
+    N = max(1, int(N))
+    kappa = _kappa(sigma, eta, lambd)[..., None]
+    T = np.asarray(T)[..., None]
+    times = T * (np.arange(N + 1) / N)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.exp(-kappa * times) * np.expm1(-2.0 * kappa * (T - times)) / np.expm1(-2.0 * kappa * T)
+    ratio = np.where(kappa * T > 0, ratio, (T - times) / T)
+    return np.asarray(X)[..., None] * ratio
+
+
+def efficient_frontier(X, sigma, eta, gamma, T, lambdas):
+    """
+    Expected cost and variance of the optimal strategy across risk aversions.
+    Returns (lambdas, costs, variances) as arrays.
+    """
+    lambdas = np.asarray(lambdas, dtype=float)
+    return (
+        lambdas,
+        expected_costs(X, sigma, eta, gamma, lambdas, T),
+        cost_variances(X, sigma, eta, lambdas, T),
+    )
+
+
 class AlmgrenChrissModel:
     def __init__(self, X, N, sigma, eta, gamma, lambd, T):
         """
@@ -26,35 +130,16 @@ class AlmgrenChrissModel:
         """
         Returns the optimal execution schedule (x_0, x_1, ..., x_N)
         """
-        kappa = np.sqrt(self.lambd * self.sigma**2 / self.eta)
-        times = np.arange(self.N + 1) * self.dt
-        sinh_kappa_T = np.sinh(kappa * self.T)
-
-        if sinh_kappa_T == 0 or np.isnan(sinh_kappa_T) or np.isinf(sinh_kappa_T):
-            print("⚠️ Unstable sinh(kappa*T) in trajectory. Returning flat schedule.")
-            return np.full(self.N + 1, self.X / (self.N + 1))
-
-        x = self.X * (np.sinh(kappa * (self.T - times)) / sinh_kappa_T)
-        return x
+        return trajectories(self.X, self.sigma, self.eta, self.lambd, self.T, self.N)
 
     def expected_cost(self):
         """
         Calculate the expected cost of the optimal strategy
         """
-        kappa = np.sqrt(self.lambd * self.sigma**2 / self.eta)
-        sinh_kappa_T = np.sinh(kappa * self.T)
-
-        if sinh_kappa_T == 0 or np.isnan(sinh_kappa_T) or np.isinf(sinh_kappa_T):
-            print("⚠️ Unstable sinh(kappa*T). Falling back to 0 impact cost.")
-            return 0.0
-
-        cost = (
-            self.gamma * self.X**2
-            + self.eta * self.X**2 * kappa * np.cosh(kappa * self.T) / sinh_kappa_T
-        )
+        return float(expected_costs(self.X, self.sigma, self.eta, self.gamma, self.lambd, self.T))
 
-        if np.isnan(cost) or np.isinf(cost):
-            print("⚠️ Computed expected cost is invalid. Returning 0.")
-            return 0.0
-
-        return cost
\ No newline at end of file
+    def variance(self):
+        """
+        Calculate the variance of the cost of the optimal strategy
+        """
+        return float(cost_variances(self.X, self.sigma, self.eta, self.lambd, self.T))
@@ -0,0 +1,339 @@
+# journal.py
+
+import csv
+import io
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# Column layout of an executed trade, shared by the CSV and columnar writers.
+TRADE_DTYPE = np.dtype([
+    ("timestamp", "S32"),
+    ("exchange", "S16"),
+    ("symbol", "S32"),
+    ("action", "S8"),
+    ("maker_taker", "S8"),
+    ("price", "f8"),
+    ("qty", "f8"),
+    ("impact_ratio", "f8"),
+    ("volatility", "f8"),
+    ("mid", "f8"),
+    ("slippage", "f8"),
+])
+TRADE_FIELDS = TRADE_DTYPE.names
+
+
+def _to_records(trades, dtype=TRADE_DTYPE):
+    """Turn a list of trade dicts into a structured array."""
+    records = np.empty(len(trades), dtype=dtype)
+    for name, column in _to_columns(trades, dtype).items():
+        records[name] = column
+    return records
+
+
+def _to_columns(trades, dtype=TRADE_DTYPE):
+    """Turn a list of trade dicts into one NumPy array per field."""
+    columns = {}
+    for name in dtype.names:
+        kind = dtype[name].kind
+        default = b"" if kind == "S" else np.nan
+        values = [t.get(name, default) for t in trades]
+        if kind == "S":
+            values = [v.encode() if isinstance(v, str) else (b"" if v is None else v) for v in values]
+        else:
+            values = [np.nan if v is None else v for v in values]
+        columns[name] = np.array(values, dtype=dtype[name])
+    return columns
+
+
+def read_columnar(path):
+    """
+    Memory-map a columnar journal directory written by TradeJournal.
+    Returns a dict of field name -> read-only np.memmap.
+    """
+    with open(os.path.join(path, "schema.json")) as f:
+        schema = json.load(f)
+    columns = {}
+    for name, code in schema["fields"]:
+        file = os.path.join(path, f"{name}.bin")
+        dtype = np.dtype(code)
+        if os.path.getsize(file) < dtype.itemsize:
+            columns[name] = np.empty(0, dtype=dtype)
+        else:
+            columns[name] = np.memmap(file, dtype=dtype, mode="r")
+    return columns
+
+
+def _csv_bytes(rows):
+    buffer = io.StringIO(newline="")
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _write_all(f, data):
+    """Write all of ``data`` to the unbuffered file ``f``."""
+    view = memoryview(data)
+    while view:
+        view = view[f.write(view):]
+
+
+class TradeJournal:
+    """
+    Buffered, asynchronous trade journal.
+
+    ``append`` only puts the trade in an in-memory batch; a background
+    thread flushes batches when ``batch_size`` trades are pending or every
+    ``flush_interval`` seconds, so disk latency never reaches the caller.
+    Files are rotated by UTC date:
+
+    - ``csv``: ``<directory>/<prefix>-YYYYMMDD.csv``
+    - ``columnar``: ``<directory>/<prefix>-YYYYMMDD.cols/<field>.bin``, one
+      append-only raw NumPy file per field that ``read_columnar`` memory-maps.
+
+    A batch that fails to write (disk full, permissions) is truncated off
+    every file it reached, so the columns stay aligned, and queued again;
+    retries back off from ``flush_interval`` up to ``max_retry_delay``
+    seconds. Beyond ``max_pending`` queued trades further failed batches
+    are dropped and counted in ``dropped``.
+
+    If the day's files were written with a different ``dtype`` (e.g. by an
+    older version), a new ``<prefix>-YYYYMMDD-N`` set is started instead of
+    appending misaligned rows to them.
+    """
+
+    def __init__(self, directory="journal", prefix="executed_trades", formats=("csv", "columnar"),
+                 batch_size=4096, flush_interval=0.5, dtype=TRADE_DTYPE, max_pending=1_000_000,
+                 max_retry_delay=10.0):
+        self.directory = directory
+        self.prefix = prefix
+        self.formats = tuple(formats)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dtype = dtype
+        self.max_pending = max_pending
+        self.max_retry_delay = max_retry_delay
+
+        self.written = 0
+        self.flushes = 0
+        self.max_flush_ms = 0.0
+        self.write_errors = 0
+        self.dropped = 0
+
+        self._pending = []  # trade dicts and structured-array blocks, in order
+        self._pending_rows = 0  # extra rows held by blocks beyond one per entry
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._retry_delay = 0.0
+        self._retry_at = 0.0
+        self._date = None
+        self._csv_file = None
+        self._col_files = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="trade-journal", daemon=True)
+        self._thread.start()
+
+    def append(self, trade):
+        """Queue one trade dict for writing. Never touches the disk."""
+        with self._lock:
+            self._pending.append(trade)
+            full = len(self._pending) + self._pending_rows >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def append_records(self, records):
+        """
+        Queue a structured array of trades in ``dtype`` layout, e.g. a block
+        spilled from a TradeRingBuffer. The array is written as is, so pass
+        a copy if the caller will reuse its memory.
+        """
+        with self._lock:
+            self._pending.append(records)
+            self._pending_rows += len(records) - 1
+            full = len(self._pending) + self._pending_rows >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def pending(self):
+        return len(self._pending) + self._pending_rows
+
+    def close(self):
+        """Flush everything still pending and close the files."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self._close_files()
+        if self.pending() or self.dropped:
+            print(f"⚠️ Journal closed with {self.pending()} unwritten and {self.dropped} dropped trades.")
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closing = self._closed
+            if not closing and time.monotonic() < self._retry_at:
+                continue  # backing off after a failed write
+            self._flush()
+            if closing:
+                return
+
+    def _flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._pending_rows = 0
+        if not batch:
+            return
+        start = time.perf_counter()
+        try:
+            records = self._to_records(batch)
+        except Exception as e:
+            # Bad trade data will not write on a retry either.
+            self.dropped += len(batch)
+            print(f"[⚠️ Journal dropped {len(batch)} unconvertible entries] {e}")
+            return
+        try:
+            self._rotate(time.strftime("%Y%m%d", time.gmtime()))
+            self._write(records)
+        except Exception as e:
+            self.write_errors += 1
+            self._requeue(records)
+            self._retry_delay = min(self.max_retry_delay, max(self.flush_interval, 2 * self._retry_delay))
+            self._retry_at = time.monotonic() + self._retry_delay
+            print(f"[⚠️ Journal write error] {e}; {len(records)} trades queued for retry "
+                  f"in {self._retry_delay:g}s")
+            return
+        self._retry_delay = 0.0
+        self.written += len(records)
+        self.flushes += 1
+        self.max_flush_ms = max(self.max_flush_ms, (time.perf_counter() - start) * 1000)
+
+    def _rotate(self, date):
+        if date == self._date:
+            return
+        self._close_files()
+        try:
+            self._open_files(date)
+        except Exception:
+            # Leave nothing half-open: the next flush retries the whole set.
+            self._close_files()
+            raise
+        # Only now, so a failed open is retried instead of skipped.
+        self._date = date
+
+    def _open_files(self, date):
+        schema = {"fields": [[name, self.dtype[name].str] for name in self.dtype.names]}
+        base = self._base_path(date, schema)
+
+        if "csv" in self.formats:
+            path = base + ".csv"
+            new_file = not os.path.isfile(path)
+            # Unbuffered, like the columns: a failed write leaves nothing
+            # behind in Python that could reach the file after a rollback.
+            self._csv_file = open(path, "ab", buffering=0)
+            if new_file:
+                _write_all(self._csv_file, _csv_bytes([self.dtype.names]))
+
+        if "columnar" in self.formats:
+            path = base + ".cols"
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, "schema.json"), "w") as f:
+                json.dump(schema, f)
+            for name in self.dtype.names:
+                self._col_files[name] = open(os.path.join(path, f"{name}.bin"), "ab", buffering=0)
+
+    def _base_path(self, date, schema):
+        """First ``<prefix>-<date>[-N]`` whose existing files (if any) match ``schema``."""
+        n = 0
+        while True:
+            base = os.path.join(self.directory, f"{self.prefix}-{date}" + (f"-{n}" if n else ""))
+            if self._compatible(base, schema):
+                if n:
+                    print(f"ℹ️ Journal layout changed; writing to {base}")
+                return base
+            n += 1
+
+    def _compatible(self, base, schema):
+        if "csv" in self.formats and os.path.isfile(base + ".csv"):
+            with open(base + ".csv", newline="") as f:
+                header = next(csv.reader(f), None)
+            if header is not None and tuple(header) != self.dtype.names:
+                return False
+        schema_path = os.path.join(base + ".cols", "schema.json")
+        if "columnar" in self.formats and os.path.isfile(schema_path):
+            with open(schema_path) as f:
+                if json.load(f) != schema:
+                    return False
+        return True
+
+    def _to_records(self, batch):
+        """One structured array from pending dicts and blocks, keeping their order."""
+        parts = []
+        dicts = []
+        for item in batch:
+            if isinstance(item, dict):
+                dicts.append(item)
+                continue
+            if dicts:
+                parts.append(_to_records(dicts, self.dtype))
+                dicts = []
+            parts.append(np.asarray(item, dtype=self.dtype))
+        if dicts:
+            parts.append(_to_records(dicts, self.dtype))
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def _write(self, records):
+        """Write ``records`` to every format, or truncate each file back to where it was."""
+        files = [f for f in (self._csv_file, *self._col_files.values()) if f is not None]
+        marks = [os.fstat(f.fileno()).st_size for f in files]
+        try:
+            if "csv" in self.formats:
+                self._write_csv(records)
+            if "columnar" in self.formats:
+                self._write_columnar(records)
+        except Exception:
+            try:
+                for f, mark in zip(files, marks):
+                    os.ftruncate(f.fileno(), mark)
+            except Exception as e:
+                print(f"[⚠️ Journal could not roll back a partial write] {e}")
+            raise
+
+    def _requeue(self, records):
+        with self._lock:
+            if self.pending() + len(records) > self.max_pending:
+                self.dropped += len(records)
+                print(f"[⚠️ Journal dropped {len(records)} trades] over max_pending={self.max_pending}")
+                return
+            self._pending.insert(0, records)
+            self._pending_rows += len(records) - 1
+
+    def _write_csv(self, records):
+        columns = []
+        for name in self.dtype.names:
+            column = records[name].tolist()
+            if records.dtype[name].kind == "S":
+                column = [v.decode("utf-8", "replace") for v in column]
+            columns.append(column)
+        _write_all(self._csv_file, _csv_bytes(zip(*columns)))
+
+    def _write_columnar(self, records):
+        for name in self.dtype.names:
+            _write_all(self._col_files[name], np.ascontiguousarray(records[name]).tobytes())
+
+    def _close_files(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+        for f in self._col_files.values():
+            f.close()
+        self._col_files = {}
+        self._date = None
@@ -0,0 +1,203 @@
+# latency.py
+
+import json
+import os
+import threading
+import time
+from functools import wraps
+from time import perf_counter_ns
+
+import numpy as np
+
+# Named stages of the tick path.
+FRAME_RECEIVE = "frame_receive"    # receiver timestamp -> consumer dequeue
+JSON_DECODE = "json_decode"
+BOOK_UPDATE = "book_update"
+MAKER_TAKER = "maker_taker_inference"
+COST_INFERENCE = "cost_inference"
+IMPACT_CALC = "impact_calc"
+TRADE_RECORD = "trade_record"      # ring-buffer append; the journal writes on its own thread
+GUI_PUBLISH = "gui_publish"
+TICK_TOTAL = "tick_total"          # receiver timestamp -> decision made
+
+# Log-linear buckets: values below 2**_SUB_BITS are exact, above that each
+# power of two is split into 2**(_SUB_BITS - 1) buckets (< 1.6% error).
+_SUB_BITS = 7
+_LINEAR = 1 << _SUB_BITS
+_HALF_BITS = _SUB_BITS - 1
+_MAX_SHIFT = 40  # ~18 minutes in ns; larger values land in the last bucket.
+_N_BUCKETS = (_MAX_SHIFT + 2) << _HALF_BITS
+
+
+def _bucket_upper(i):
+    """Largest value that maps to bucket ``i``."""
+    if i < _LINEAR:
+        return i
+    shift = (i >> _HALF_BITS) - 1
+    mantissa = i - (shift << _HALF_BITS)
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram over integer nanoseconds.
+
+    ``record`` is a handful of integer operations on a preallocated list,
+    cheap enough to call on every stage of every tick. Counts are updated
+    without a lock; concurrent writers can very rarely lose an increment,
+    which is acceptable for monitoring.
+    """
+
+    __slots__ = ("name", "counts", "count", "total", "max")
+
+    def __init__(self, name):
+        self.name = name
+        self.counts = [0] * _N_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns):
+        if ns < _LINEAR:
+            i = ns if ns > 0 else 0
+        else:
+            shift = ns.bit_length() - _SUB_BITS
+            i = (shift << _HALF_BITS) + (ns >> shift)
+            if i >= _N_BUCKETS:
+                i = _N_BUCKETS - 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def reset(self):
+        self.counts = [0] * _N_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def percentiles(self, ps=(50.0, 99.0, 99.9)):
+        """Values (ns) at the given percentiles, as bucket upper bounds."""
+        if not self.count:
+            return [0] * len(ps)
+        cum = np.cumsum(self.counts)
+        out = []
+        for p in ps:
+            i = int(np.searchsorted(cum, max(1.0, p / 100.0 * cum[-1]), side="left"))
+            out.append(min(_bucket_upper(i), self.max))
+        return out
+
+    def summary(self):
+        p50, p99, p999 = self.percentiles((50.0, 99.0, 99.9))
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count / 1000 if self.count else 0.0,
+            "p50_us": p50 / 1000,
+            "p99_us": p99 / 1000,
+            "p999_us": p999 / 1000,
+            "max_us": self.max / 1000,
+        }
+
+
+class _Stage:
+    """``with`` block timer for one histogram; a plain class, not a generator."""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(perf_counter_ns() - self.start)
+
+
+class LatencyRegistry:
+    """
+    Named latency histograms, one per stage.
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        h = self._histograms.get(name)
+        if h is None:
+            with self._lock:
+                h = self._histograms.setdefault(name, LatencyHistogram(name))
+        return h
+
+    def record(self, name, ns):
+        self.histogram(name).record(ns)
+
+    def stage(self, name):
+        """Time a ``with`` block into histogram ``name``."""
+        return _Stage(self.histogram(name))
+
+    def timed(self, name=None):
+        """Decorator recording each call of the function."""
+        def decorator(func):
+            h = self.histogram(name or func.__qualname__)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    h.record(perf_counter_ns() - start)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        return {name: h.summary() for name, h in sorted(self._histograms.items())}
+
+    def reset(self):
+        for h in self._histograms.values():
+            h.reset()
+
+    def write_snapshot(self, path):
+        """Atomically write the current summary as JSON."""
+        data = {"time": time.time(), "stages": self.snapshot()}
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+
+
+# Process-wide registry used by the tick path.
+LATENCY = LatencyRegistry()
+
+
+class SnapshotWriter:
+    """
+    Background thread writing ``registry`` to ``path`` every ``interval`` s.
+    """
+
+    def __init__(self, path, interval=5.0, registry=LATENCY):
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="latency-snapshot", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._write()
+
+    def _write(self):
+        try:
+            self.registry.write_snapshot(self.path)
+        except OSError as e:
+            print(f"[⚠️ Latency snapshot error] {e}")
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self._write()
@@ -1,8 +1,61 @@
 #model.py 
 
-from sklearn.linear_model import LogisticRegression
-import joblib
+import math
 import os
+import numpy as np
+from artifacts import MAKER_TAKER_ARTIFACT, find_artifact, load_artifact, publish_artifact
+
+# sklearn and joblib are imported where they are used: loading an npz
+# artifact needs neither, and importing them costs about a second.
+
+
+def _expit(x):
+    # Overflow-free logistic sigmoid.
+    return np.exp(-np.logaddexp(0.0, -x))
+
+
+class CompiledLogisticModel:
+    """
+    Coefficient export of a fitted binary, single-feature LogisticRegression.
+
+    The decision is the same single multiply-add sklearn performs
+    (x * w + b > 0), so predictions agree exactly without sklearn's input
+    conversion and validation. ``threshold`` is the equivalent decision
+    boundary on the ratio, kept for display and diagnostics.
+    """
+
+    def __init__(self, coef, intercept, classes):
+        self.w = float(coef)
+        self.b = float(intercept)
+        self.classes = np.asarray(classes)
+        self.negative = int(self.classes[0])
+        self.positive = int(self.classes[1])
+        self.threshold = -self.b / self.w if self.w else math.inf
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Return a compiled model, or None when the shape is not supported."""
+        coef = getattr(model, "coef_", None)
+        intercept = getattr(model, "intercept_", None)
+        classes = getattr(model, "classes_", None)
+        if coef is None or intercept is None or classes is None:
+            return None
+        if np.shape(coef) != (1, 1) or len(classes) != 2:
+            return None
+        return cls(coef[0, 0], intercept[0], classes)
+
+    def predict(self, x):
+        return self.positive if x * self.w + self.b > 0 else self.negative
+
+    def decision_function(self, x):
+        return np.asarray(x, dtype=float) * self.w + self.b
+
+    def predict_batch(self, x):
+        return np.where(self.decision_function(x) > 0, self.positive, self.negative)
+
+    def predict_proba(self, x):
+        p = _expit(self.decision_function(x))
+        return np.stack([1 - p, p], axis=-1)
 
 class ModelManager:
     """
@@ -12,8 +65,12 @@ class ModelManager:
     def __init__(self, model_path="maker_taker_model.pkl", retrain_if_missing=False):
         self.model_path = model_path
         self.maker_taker_model = None
+        self.compiled_model = None
+        self.version = 0
 
-        if os.path.exists(self.model_path):
+        if os.path.isdir(self.model_path) or self.model_path.endswith(".npz"):
+            self._load_artifact()
+        elif os.path.exists(self.model_path):
             self._load_model()
         elif retrain_if_missing:
             self.train_and_save_model()
@@ -25,25 +82,66 @@ class ModelManager:
         """
         Load the ML model from disk.
         """
+        import joblib
+
         try:
             self.maker_taker_model = joblib.load(self.model_path)
+            self.compiled_model = CompiledLogisticModel.from_sklearn(self.maker_taker_model)
             print("✅ Maker-Taker model loaded from disk.")
         except Exception as e:
             raise RuntimeError(f"❌ Error loading model: {e}")
 
+    def _load_artifact(self):
+        """
+        Load the compiled classifier from an npz artifact, without sklearn.
+        """
+        artifact = find_artifact(self.model_path, MAKER_TAKER_ARTIFACT)
+        if artifact is None:
+            raise FileNotFoundError(f"No {MAKER_TAKER_ARTIFACT} artifact in {self.model_path}.")
+        arrays, meta = load_artifact(artifact)
+        self.swap_compiled(CompiledLogisticModel(arrays["coef"], arrays["intercept"], arrays["classes"]),
+                           meta.get("version", 0))
+        print("✅ Maker-Taker model loaded from artifact.")
+
+    def export(self, directory):
+        """
+        Publish the compiled coefficients as a versioned npz artifact.
+        Returns the artifact version.
+        """
+        compiled = self.compiled_model
+        if compiled is None:
+            raise ValueError("Only single-feature logistic models can be exported.")
+        return publish_artifact(directory, MAKER_TAKER_ARTIFACT, {
+            "coef": np.float64(compiled.w), "intercept": np.float64(compiled.b), "classes": compiled.classes,
+        })
+
     def train_and_save_model(self):
         """
         Train a Logistic Regression model on mock data and save it.
         """
+        from sklearn.linear_model import LogisticRegression
+        import joblib
+
         # Mock training data — replace this with real historical trade features
         X_train = [[0.8], [1.2], [0.5], [1.5], [0.6]]
         y_train = [1, 1, 0, 1, 0]  # 1 = maker, 0 = taker
 
         self.maker_taker_model = LogisticRegression()
         self.maker_taker_model.fit(X_train, y_train)
+        self.compiled_model = CompiledLogisticModel.from_sklearn(self.maker_taker_model)
         joblib.dump(self.maker_taker_model, self.model_path)
         print("🧠 Model trained on mock data and saved to disk.")
 
+    def swap_compiled(self, compiled, version=None):
+        """
+        Hot-swap the compiled classifier (e.g. from the online trainer).
+        A single reference assignment, so concurrent predictions see either
+        the old model or the new one.
+        """
+        self.compiled_model = compiled
+        if version is not None:
+            self.version = version
+
     def predict_maker_taker(self, ratio):
         """
         Predict whether a given ratio belongs to a maker (1) or taker (0) trade.
@@ -51,6 +149,19 @@ class ModelManager:
         :param ratio: A float value (e.g., slippage/execution price).
         :return: 1 for maker, 0 for taker, or -1 on error.
         """
+        compiled = self.compiled_model
+        if compiled is not None:
+            try:
+                x = float(ratio)
+            except (TypeError, ValueError) as e:
+                print(f"[⚠️ Prediction error] {e}")
+                return -1
+            if not math.isfinite(x):
+                # sklearn rejects NaN/inf input; keep the same contract.
+                print(f"[⚠️ Prediction error] Input contains NaN or infinity: {ratio}")
+                return -1
+            return compiled.predict(x)
+
         if self.maker_taker_model:
             try:
                 prediction = self.maker_taker_model.predict([[ratio]])
@@ -61,3 +172,33 @@ class ModelManager:
         else:
             print("⚠️ No model loaded.")
             return -1
+
+    def predict_maker_taker_batch(self, ratios):
+        """
+        Vectorized predict_maker_taker over an array of ratios.
+
+        :return: int array of 1 (maker) / 0 (taker), -1 where the input is not finite.
+        """
+        x = np.asarray(ratios, dtype=float)
+        compiled = self.compiled_model
+        if self.maker_taker_model is None and compiled is None:
+            return np.full(x.shape, -1)
+        finite = np.isfinite(x)
+        out = np.full(x.shape, -1)
+        if compiled is not None:
+            out[finite] = compiled.predict_batch(x[finite])
+        elif finite.any():
+            out[finite] = self.maker_taker_model.predict(x[finite].reshape(-1, 1))
+        return out
+
+    def predict_proba(self, ratios):
+        """
+        Class probabilities for one ratio or an array of ratios, ordered as
+        the model's classes (taker, maker).
+        """
+        x = np.asarray(ratios, dtype=float)
+        compiled = self.compiled_model
+        if compiled is not None:
+            return compiled.predict_proba(x)
+        proba = self.maker_taker_model.predict_proba(x.reshape(-1, 1))
+        return proba.reshape(x.shape + (proba.shape[-1],))
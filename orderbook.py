@@ -0,0 +1,247 @@
+# orderbook.py
+
+from itertools import chain
+
+import numpy as np
+
+BUY = "buy"
+SELL = "sell"
+
+
+class OrderBook:
+    """
+    Full-depth L2 order book backed by sorted NumPy price/size arrays.
+
+    Asks are kept in ascending price order and bids in descending price order,
+    so index 0 is always the top of book on both sides. Depth queries work on
+    cumulative size arrays that are rebuilt lazily after each update.
+    """
+
+    def __init__(self, capacity=2048):
+        self.capacity = capacity
+        self.bid_px = np.zeros(capacity)
+        self.bid_sz = np.zeros(capacity)
+        self.ask_px = np.zeros(capacity)
+        self.ask_sz = np.zeros(capacity)
+        self.n_bids = 0
+        self.n_asks = 0
+        self.timestamp = None
+        self.exchange = None
+        self.symbol = None
+        self.updates = 0
+        self._cum = {}
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def apply(self, data):
+        """
+        Apply one L2 message in place.
+
+        Messages carrying ``"action": "update"`` are treated as incremental
+        level changes (a size of 0 removes the level); anything else is a
+        full snapshot that replaces both sides. Frames from
+        decoders.BookDecoder carry pre-parsed ``"levels"`` arrays instead.
+        """
+        self.timestamp = data.get("timestamp")
+        self.exchange = data.get("exchange", self.exchange)
+        self.symbol = data.get("symbol", self.symbol)
+
+        levels = data.get("levels")
+        if levels is not None:
+            self.apply_arrays(*levels)
+            return
+        if data.get("action") == "update":
+            for px, sz in data.get("bids", ()):
+                self._apply_level(BUY, float(px), float(sz))
+            for px, sz in data.get("asks", ()):
+                self._apply_level(SELL, float(px), float(sz))
+        else:
+            self.n_bids = self._load_side(self.bid_px, self.bid_sz, data.get("bids", ()), descending=True)
+            self.n_asks = self._load_side(self.ask_px, self.ask_sz, data.get("asks", ()), descending=False)
+
+        self.updates += 1
+        self._cum.clear()
+
+    def apply_arrays(self, bid_px, bid_sz, ask_px, ask_sz):
+        """
+        Replace both sides from already-decoded price/size arrays.
+        Arrays must be sorted best-first (bids descending, asks ascending).
+        """
+        nb = min(len(bid_px), self.capacity)
+        na = min(len(ask_px), self.capacity)
+        self.bid_px[:nb] = bid_px[:nb]
+        self.bid_sz[:nb] = bid_sz[:nb]
+        self.ask_px[:na] = ask_px[:na]
+        self.ask_sz[:na] = ask_sz[:na]
+        self.n_bids = nb
+        self.n_asks = na
+        self.updates += 1
+        self._cum.clear()
+
+    def _load_side(self, px_buf, sz_buf, levels, descending):
+        count = len(levels)
+        if not count:
+            return 0
+        # fromiter over the flattened levels avoids building a nested
+        # object array and accepts both numeric and string prices.
+        arr = np.fromiter(chain.from_iterable(levels), dtype=float, count=2 * count).reshape(count, 2)
+        px = arr[:, 0]
+        n = min(count, self.capacity)
+        step = np.diff(px)
+        if (step < 0).all() if descending else (step > 0).all():
+            # Feeds normally arrive best-first; skip the sort in that case.
+            px_buf[:n] = px[:n]
+            sz_buf[:n] = arr[:n, 1]
+        else:
+            order = np.argsort(-px if descending else px, kind="stable")[:n]
+            px_buf[:n] = px[order]
+            sz_buf[:n] = arr[order, 1]
+        return n
+
+    def _apply_level(self, side, price, size):
+        if side == BUY:
+            px, sz, n = self.bid_px, self.bid_sz, self.n_bids
+            # Bids are stored descending; search on the negated prices.
+            i = int(np.searchsorted(-px[:n], -price))
+        else:
+            px, sz, n = self.ask_px, self.ask_sz, self.n_asks
+            i = int(np.searchsorted(px[:n], price))
+
+        exists = i < n and px[i] == price
+        if size <= 0:
+            if not exists:
+                return
+            px[i:n - 1] = px[i + 1:n]
+            sz[i:n - 1] = sz[i + 1:n]
+            n -= 1
+        elif exists:
+            sz[i] = size
+        else:
+            if n == self.capacity:
+                if i == n:
+                    return  # Beyond the deepest level we track.
+                n -= 1
+            px[i + 1:n + 1] = px[i:n]
+            sz[i + 1:n + 1] = sz[i:n]
+            px[i] = price
+            sz[i] = size
+            n += 1
+
+        if side == BUY:
+            self.n_bids = n
+        else:
+            self.n_asks = n
+
+    def snapshot(self):
+        """
+        Read-only copy of the book trimmed to its live levels. Safe to hand
+        to other threads: later updates to this book never touch it.
+        """
+        snap = OrderBook.__new__(OrderBook)
+        snap.__dict__.update(self.__dict__)
+        for name, n in (("bid_px", self.n_bids), ("bid_sz", self.n_bids),
+                        ("ask_px", self.n_asks), ("ask_sz", self.n_asks)):
+            arr = getattr(self, name)[:n].copy()
+            arr.flags.writeable = False
+            setattr(snap, name, arr)
+        snap._cum = {}
+        return snap
+
+    # ------------------------------------------------------------------
+    # Views
+    # ------------------------------------------------------------------
+    def bids(self):
+        return self.bid_px[:self.n_bids], self.bid_sz[:self.n_bids]
+
+    def asks(self):
+        return self.ask_px[:self.n_asks], self.ask_sz[:self.n_asks]
+
+    def best_bid(self):
+        return float(self.bid_px[0]) if self.n_bids else None
+
+    def best_ask(self):
+        return float(self.ask_px[0]) if self.n_asks else None
+
+    def mid(self):
+        if not self.n_bids or not self.n_asks:
+            return None
+        return (float(self.bid_px[0]) + float(self.ask_px[0])) / 2
+
+    def is_ready(self):
+        return self.n_bids > 0 and self.n_asks > 0
+
+    def _side_for_order(self, side):
+        """A buy order consumes the asks, a sell order consumes the bids."""
+        return (self.asks() if side.lower() == BUY else self.bids())
+
+    def _cumulative(self, side):
+        key = side.lower()
+        cached = self._cum.get(key)
+        if cached is None:
+            px, sz = self._side_for_order(key)
+            cached = (px, np.cumsum(sz), np.cumsum(px * sz))
+            self._cum[key] = cached
+        return cached
+
+    # ------------------------------------------------------------------
+    # Depth queries
+    # ------------------------------------------------------------------
+    def vwap(self, side, quantity):
+        """
+        Average fill price for a market order of ``quantity`` walking the book.
+
+        ``quantity`` may be a scalar or an array. Returns ``(price, filled)``;
+        when the book is too thin the fill is capped at the available depth.
+        Price is NaN when nothing can be filled.
+        """
+        px, cum_sz, cum_notional = self._cumulative(side)
+        qty = np.asarray(quantity, dtype=float)
+        if not len(px):
+            nan = np.full(qty.shape, np.nan)
+            return (nan, np.zeros(qty.shape)) if qty.ndim else (float("nan"), 0.0)
+
+        filled = np.minimum(qty, cum_sz[-1])
+        # Index of the level where the last unit is filled.
+        i = np.minimum(np.searchsorted(cum_sz, filled, side="left"), len(px) - 1)
+        prev_sz = np.where(i > 0, cum_sz[i - 1], 0.0)
+        prev_notional = np.where(i > 0, cum_notional[i - 1], 0.0)
+        notional = prev_notional + (filled - prev_sz) * px[i]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            price = np.where(filled > 0, notional / filled, np.nan)
+
+        if qty.ndim == 0:
+            return float(price), float(filled)
+        return price, filled
+
+    def depth_within_bps(self, side, bps):
+        """
+        Cumulative size available within ``bps`` basis points of the mid,
+        on the side a ``side`` order would consume. ``bps`` may be an array.
+        """
+        mid = self.mid()
+        px, cum_sz, _ = self._cumulative(side)
+        bps = np.asarray(bps, dtype=float)
+        if mid is None:
+            return np.zeros(bps.shape) if bps.ndim else 0.0
+
+        if side.lower() == BUY:
+            limit = mid * (1 + bps / 1e4)
+            k = np.searchsorted(px, limit, side="right")
+        else:
+            limit = mid * (1 - bps / 1e4)
+            k = np.searchsorted(-px, -limit, side="right")
+        depth = np.where(k > 0, cum_sz[np.maximum(k - 1, 0)], 0.0)
+        return float(depth) if bps.ndim == 0 else depth
+
+    def imbalance(self, levels=None):
+        """
+        Size imbalance (bid - ask) / (bid + ask) over the top ``levels``
+        levels of each side (full depth when None). Range is [-1, 1].
+        """
+        nb = self.n_bids if levels is None else min(levels, self.n_bids)
+        na = self.n_asks if levels is None else min(levels, self.n_asks)
+        bid = self.bid_sz[:nb].sum()
+        ask = self.ask_sz[:na].sum()
+        total = bid + ask
+        return float((bid - ask) / total) if total > 0 else 0.0
@@ -0,0 +1,281 @@
+# pipeline.py
+
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+
+from latency import LATENCY, FRAME_RECEIVE, JSON_DECODE, TICK_TOTAL
+
+CONFLATE = "conflate"
+DROP_OLDEST = "drop_oldest"
+
+
+def is_incremental(frame):
+    """
+    True for a raw ``"action": "update"`` delta frame (str or bytes).
+    Anchors on the ``p`` of ``"update"``, which numbers never contain, so
+    the scan runs at memchr speed over the level arrays.
+    """
+    token = '"update"' if isinstance(frame, str) else b'"update"'
+    anchor = token[2:3]
+    j = frame.find(anchor)
+    while j >= 0:
+        if frame.startswith(token, j - 2):
+            return True
+        j = frame.find(anchor, j + 1)
+    return False
+
+
+class _Slot(tuple):
+    """Queue key of a frame that must not be conflated: (feed key, sequence)."""
+
+
+class PipelineMetrics:
+    """
+    Counters for one pipeline: queue depth, drops, conflation and
+    receive-to-decision latency.
+    """
+
+    def __init__(self):
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.resyncs = 0
+        self.incremental_keys = 0
+        self.errors = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.last_latency_us = 0.0
+        self.mean_latency_us = 0.0
+        self.max_latency_us = 0.0
+        # key -> [processed, mean_latency_us, max_latency_us]
+        self.per_key = {}
+
+    def record_latency(self, ns, key=None):
+        us = ns / 1000
+        self.last_latency_us = us
+        if us > self.max_latency_us:
+            self.max_latency_us = us
+        # Exponentially weighted so the figure tracks the current load.
+        self.mean_latency_us += 0.01 * (us - self.mean_latency_us)
+
+        if key is not None:
+            stats = self.per_key.get(key)
+            if stats is None:
+                self.per_key[key] = [1, us, us]
+            else:
+                stats[0] += 1
+                stats[1] += 0.01 * (us - stats[1])
+                if us > stats[2]:
+                    stats[2] = us
+
+    def snapshot(self):
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+            "resyncs": self.resyncs,
+            "incremental_keys": self.incremental_keys,
+            "errors": self.errors,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "last_latency_us": self.last_latency_us,
+            "mean_latency_us": self.mean_latency_us,
+            "max_latency_us": self.max_latency_us,
+            "per_key": {
+                str(k): {"processed": v[0], "mean_latency_us": v[1], "max_latency_us": v[2]}
+                for k, v in self.per_key.items()
+            },
+        }
+
+
+class FrameQueue:
+    """
+    Bounded frame queue whose ``put`` never blocks the receiver.
+
+    Policies:
+    - ``conflate``: keep only the latest frame per key (symbol). Only safe
+      for snapshot feeds, where a newer frame fully supersedes an older one;
+      once a key carries ``"action": "update"`` deltas its frames are
+      queued FIFO instead, since dropping a delta corrupts the book. If
+      the queue overflows onto such a frame, all of that key's queued
+      deltas are dropped and its new ones discarded until the next full
+      snapshot (counted in ``metrics.resyncs``).
+    - ``drop_oldest``: FIFO; when full the oldest frame is discarded.
+    """
+
+    def __init__(self, maxsize=1024, policy=CONFLATE, metrics=None):
+        if policy not in (CONFLATE, DROP_OLDEST):
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        self._items = OrderedDict() if policy == CONFLATE else deque()
+        self._ready = asyncio.Event()
+        self._incremental = set()  # keys seen carrying delta frames
+        self._resyncing = set()  # incremental keys waiting for a full snapshot
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, key, frame, received_ns):
+        m = self.metrics
+        m.received += 1
+        items = self._items
+        if self.policy == CONFLATE:
+            if key in self._incremental or is_incremental(frame):
+                self._put_incremental(key, frame, received_ns)
+            elif key in items:
+                m.conflated += 1
+                # Keep the original arrival time so latency covers the wait.
+                items[key] = (frame, items[key][1])
+            else:
+                self._make_room()
+                items[key] = (frame, received_ns)
+        else:
+            if len(items) >= self.maxsize:
+                items.popleft()
+                m.dropped += 1
+            items.append((key, frame, received_ns))
+
+        depth = len(items)
+        m.depth = depth
+        if depth > m.max_depth:
+            m.max_depth = depth
+        self._ready.set()
+
+    def _put_incremental(self, key, frame, received_ns):
+        m = self.metrics
+        if key not in self._incremental:
+            self._incremental.add(key)
+            m.incremental_keys += 1
+        if key not in self._resyncing:
+            self._make_room()
+        if key in self._resyncing:
+            if is_incremental(frame):
+                m.dropped += 1
+                return
+            self._resyncing.discard(key)
+            self._make_room()
+        self._seq += 1
+        self._items[_Slot((key, self._seq))] = (frame, received_ns)
+
+    def _make_room(self):
+        items = self._items
+        if len(items) < self.maxsize:
+            return
+        old, _ = items.popitem(last=False)
+        self.metrics.dropped += 1
+        if type(old) is _Slot:
+            self._resync(old[0])
+
+    def _resync(self, key):
+        """A delta of ``key`` was lost: drop the rest until a snapshot rebuilds its book."""
+        stale = [k for k in self._items if type(k) is _Slot and k[0] == key]
+        for k in stale:
+            del self._items[k]
+        self.metrics.dropped += len(stale)
+        self.metrics.resyncs += 1
+        self._resyncing.add(key)
+
+    async def get(self):
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        if self.policy == CONFLATE:
+            key, (frame, received_ns) = self._items.popitem(last=False)
+            if type(key) is _Slot:
+                key = key[0]
+        else:
+            key, frame, received_ns = self._items.popleft()
+        self.metrics.depth = len(self._items)
+        return key, frame, received_ns
+
+
+class FeedPipeline:
+    """
+    Staged receive/processing pipeline.
+
+    ``receive`` only timestamps raw frames and enqueues them (and appends
+    them to an optional replay.FrameRecorder); consumer
+    tasks decode and hand them to ``handler``. A slow handler therefore
+    shows up as queue depth, drops or conflation in ``metrics`` instead of
+    backing up the socket.
+    """
+
+    def __init__(self, handler, policy=CONFLATE, maxsize=1024, consumers=1, decode=json.loads, recorder=None,
+                 keyed=False):
+        self.handler = handler
+        # keyed: call handler(data, key) with the key of the feed the frame came from.
+        self.keyed = keyed
+        self.decode = decode
+        self.recorder = recorder
+        self.metrics = PipelineMetrics()
+        self.queue = FrameQueue(maxsize=maxsize, policy=policy, metrics=self.metrics)
+        self.n_consumers = consumers
+        self._consumers = []
+
+    def start(self):
+        """Start the consumer tasks on the running event loop."""
+        if not self._consumers:
+            self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.n_consumers)]
+
+    async def stop(self):
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+
+    async def receive(self, websocket, key=None):
+        """Pump frames from ``websocket`` into the queue until it closes."""
+        put = self.queue.put
+        clock = time.perf_counter_ns
+        recorder = self.recorder
+        while True:
+            frame = await websocket.recv()
+            put(key, frame, clock())
+            if recorder is not None:
+                recorder.write(frame)
+
+    async def _consume(self):
+        get = self.queue.get
+        metrics = self.metrics
+        clock = time.perf_counter_ns
+        wait_h = LATENCY.histogram(FRAME_RECEIVE)
+        decode_h = LATENCY.histogram(JSON_DECODE)
+        total_h = LATENCY.histogram(TICK_TOTAL)
+        while True:
+            key, frame, received_ns = await get()
+            start = clock()
+            wait_h.record(start - received_ns)
+            try:
+                data = self.decode(frame)
+                decode_h.record(clock() - start)
+                if self.keyed:
+                    self.handler(data, key)
+                else:
+                    self.handler(data)
+            except Exception as e:
+                metrics.errors += 1
+                print(f"[⚠️ Pipeline handler error] {e}")
+            metrics.processed += 1
+            done = clock()
+            total_h.record(done - received_ns)
+            metrics.record_latency(done - received_ns, key)
+            # Yield so the receiver can drain the socket between frames.
+            await asyncio.sleep(0)
+
+    async def report(self, interval=10.0):
+        """Print the metrics every ``interval`` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            m = self.metrics
+            print(
+                f"📈 Pipeline: recv={m.received} proc={m.processed} depth={m.depth} "
+                f"dropped={m.dropped} conflated={m.conflated} resyncs={m.resyncs} "
+                f"latency mean={m.mean_latency_us:.0f}us max={m.max_latency_us:.0f}us"
+            )
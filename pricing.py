@@ -0,0 +1,108 @@
+# pricing.py
+
+import os
+import time
+
+import numpy as np
+
+from artifacts import find_artifact, impact_artifact_name, load_artifact
+from impact_model import expected_costs
+from latency import LATENCY, COST_INFERENCE, IMPACT_CALC, MAKER_TAKER
+from orderbook import BUY, SELL
+
+FEE_TIERS = {"Tier 1 (0.10%)": 0.0010, "Tier 2 (0.08%)": 0.0008, "Tier 3 (0.05%)": 0.0005}
+DEFAULT_FEE_TIER = "Tier 1 (0.10%)"
+
+# Almgren-Chriss parameters used for the impact estimate when no calibrated
+# set (see calibration.py) exists for the symbol.
+IMPACT_PARAMS = {"eta": 0.01, "gamma": 0.01, "lambd": 1e-6, "T": 1.0}
+
+
+def load_impact_params(path, key):
+    """
+    Calibrated impact parameters for ``key`` (``venue:symbol``) from an
+    artifact directory or npz file written by calibration.py. Falls back to
+    IMPACT_PARAMS when ``path`` is None or holds no set for the symbol.
+    Returns ``(params, version)``; version 0 means the defaults.
+    """
+    if path is None:
+        return dict(IMPACT_PARAMS), 0
+    artifact = find_artifact(path, impact_artifact_name(key))
+    if artifact is None or not os.path.exists(artifact):
+        return dict(IMPACT_PARAMS), 0
+    arrays, meta = load_artifact(artifact)
+    params = {name: float(arrays[name]) if name in arrays else default for name, default in IMPACT_PARAMS.items()}
+    return params, meta.get("version", 0)
+
+
+def fee_rate(tier):
+    """Fee rate for a tier name from FEE_TIERS, or a numeric rate as is."""
+    if isinstance(tier, str):
+        return FEE_TIERS[tier]
+    return float(tier)
+
+
+def quote_costs(book, side, quantity, order_price=None, fee=FEE_TIERS[DEFAULT_FEE_TIER], volatility=0.02,
+                time_of_day=None, cost_model=None, model_manager=None, impact_params=IMPACT_PARAMS):
+    """
+    Slippage, fees, market impact, maker/taker and regression cost for a
+    batch of market orders against the current ``book``.
+
+    ``side`` ("Buy"/"Sell"), ``quantity``, ``order_price`` and ``fee`` (a
+    rate) broadcast against each other. ``order_price`` defaults to the
+    mid; fills walk the book and fall back to ``order_price`` when it is
+    empty. ``time_of_day`` defaults to the current UTC hour / 24, the
+    convention the cost model is trained on. Returns a dict of arrays, one
+    entry per order.
+    """
+    quantity = np.atleast_1d(np.asarray(quantity, dtype=float))
+    side = np.char.lower(np.atleast_1d(np.asarray(side, dtype=str)))
+    if order_price is None:
+        order_price = book.mid() if book.is_ready() else np.nan
+    side, quantity, order_price, fee = np.broadcast_arrays(
+        side, quantity, np.asarray(order_price, dtype=float), np.asarray(fee, dtype=float))
+    buy = side == BUY
+
+    # Walk the book once per side so large orders pay for the depth they consume.
+    exec_price = order_price.copy()
+    filled = np.zeros(quantity.shape)
+    if book.is_ready():
+        for book_side, mask in ((BUY, buy), (SELL, ~buy)):
+            if mask.any():
+                price, fill = book.vwap(book_side, quantity[mask])
+                exec_price[mask] = np.where(fill > 0, price, order_price[mask])
+                filled[mask] = fill
+
+    slippage = np.where(buy, exec_price - order_price, order_price - exec_price)
+    fees = exec_price * quantity * fee
+
+    with LATENCY.stage(IMPACT_CALC):
+        impact = expected_costs(quantity, volatility, impact_params["eta"], impact_params["gamma"],
+                                impact_params["lambd"], impact_params["T"])
+    net_cost = slippage + fees + impact
+
+    maker_taker = np.full(quantity.shape, -1)
+    if model_manager is not None:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = slippage / ((exec_price + order_price) / 2)
+        with LATENCY.stage(MAKER_TAKER):
+            maker_taker = model_manager.predict_maker_taker_batch(np.where(exec_price + order_price > 0, ratio, 0.0))
+
+    predicted_cost = np.full(quantity.shape, np.nan)
+    if cost_model is not None:
+        if time_of_day is None:
+            time_of_day = time.gmtime().tm_hour / 24
+        with LATENCY.stage(COST_INFERENCE):
+            predicted_cost = cost_model.predict_costs(quantity, exec_price, buy.astype(float), volatility,
+                                                      time_of_day)
+
+    return {
+        "exec_price": exec_price,
+        "filled": filled,
+        "slippage": slippage,
+        "fees": fees,
+        "impact": impact,
+        "net_cost": net_cost,
+        "maker_taker": maker_taker,
+        "predicted_cost": predicted_cost,
+    }
@@ -0,0 +1,356 @@
+# quote_service.py
+
+import argparse
+import asyncio
+import json
+import math
+import os
+
+import numpy as np
+
+from feeds import FeedManager, FeedSpec
+from latency import LATENCY
+from pipeline import FeedPipeline, CONFLATE
+from pricing import DEFAULT_FEE_TIER, fee_rate, load_impact_params, quote_costs
+from websocket_client import MarketState, WS_URL
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            500: "Internal Server Error", 503: "Service Unavailable"}
+_MAKER_TAKER = {1: "maker", 0: "taker"}
+
+
+class MicroBatcher:
+    """
+    Collects items submitted within ``window`` seconds of the first one
+    (or until ``max_batch`` are waiting) and hands them to ``process`` in
+    one call. ``process(items)`` returns one result per item.
+
+    The window bounds the extra latency a request can pick up by waiting
+    for company; under load batches fill up and flush early instead.
+    """
+
+    def __init__(self, process, window=0.002, max_batch=1024):
+        self.process = process
+        self.window = window
+        self.max_batch = max_batch
+        self._items = []
+        self._futures = []
+        self._timer = None
+        self.batches = 0
+        self.items = 0
+        self.max_size = 0
+
+    def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._items.append(item)
+        self._futures.append(future)
+        if len(self._items) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return future
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, futures = self._items, self._futures
+        if not items:
+            return
+        self._items, self._futures = [], []
+        self.batches += 1
+        self.items += len(items)
+        self.max_size = max(self.max_size, len(items))
+        try:
+            results = self.process(items)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    def snapshot(self):
+        return {
+            "batches": self.batches,
+            "quotes": self.items,
+            "mean_batch": self.items / self.batches if self.batches else 0.0,
+            "max_batch": self.max_size,
+        }
+
+
+def _finite(value):
+    return value if math.isfinite(value) else None
+
+
+class QuoteService:
+    """
+    Headless cost quotes over HTTP against live order books.
+
+    Books are kept up to date from ``feeds`` through the usual
+    FeedPipeline; ``POST /quote`` with one order (or a list) such as
+    ``{"side": "Buy", "quantity": 2.5, "symbol": "okx:BTC-USDT-SWAP"}``
+    returns slippage, fees, impact, net and predicted cost and the
+    maker/taker call. Concurrent requests are micro-batched into one
+    vectorized quote_costs call per symbol.
+
+    An order that cannot be quoted gets ``{"error": ..., "status": ...}``.
+    A single-order request returns that status (503 while the symbol has
+    no book yet, 500 if quoting failed); a list request returns 200 with
+    the per-order results.
+    """
+
+    def __init__(self, feeds=None, cost_model=None, model_manager=None, window=0.002, max_batch=1024,
+                 queue_policy=CONFLATE, impact_dir=None):
+        self.feeds = list(feeds or [])
+        self.cost_model = cost_model
+        self.model_manager = model_manager
+        self.impact_dir = impact_dir
+        self.markets = {}
+        # Feed key parsed from the URL -> "exchange:symbol" its frames carry
+        # (e.g. local:SYNTH -> okx:BTC-USDT-SWAP for a replay feed).
+        self.aliases = {}
+        self.impact_params = {}
+        self.pipeline = FeedPipeline(self.on_frame, policy=queue_policy, keyed=True)
+        self.feed_manager = FeedManager(self.feeds, self.pipeline) if self.feeds else None
+        self.batcher = MicroBatcher(self.quote_batch, window, max_batch)
+        self.server = None
+        self._feeds_task = None
+
+    @property
+    def default_symbol(self):
+        if self.feeds:
+            return self.resolve(self.feeds[0].key)
+        return next(iter(self.markets), None)
+
+    def resolve(self, symbol):
+        """Market key for ``symbol``, which may also be a feed key."""
+        return self.aliases.get(symbol, symbol)
+
+    def on_frame(self, data, feed=None):
+        key = f"{data.get('exchange')}:{data.get('symbol')}"
+        if feed is not None and feed != key:
+            self.aliases[feed] = key
+        state = self.markets.get(key)
+        if state is None:
+            state = self.markets[key] = MarketState()
+            self.impact_params[key], _ = load_impact_params(self.impact_dir, key)
+        book = state.order_book
+        book.apply(data)
+        if book.is_ready():
+            state.market_stats.update(float(book.bid_px[0]), float(book.ask_px[0]))
+
+    # ------------------------------------------------------------------
+    # Quoting
+    # ------------------------------------------------------------------
+    @staticmethod
+    def parse_order(order):
+        """Validate one request order; returns a normalised dict or raises ValueError."""
+        if not isinstance(order, dict):
+            raise ValueError("order must be a JSON object")
+        side = str(order.get("side", "")).lower()
+        if side not in ("buy", "sell"):
+            raise ValueError("side must be 'Buy' or 'Sell'")
+        try:
+            quantity = float(order["quantity"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("quantity must be a number")
+        if not quantity > 0 or not math.isfinite(quantity):
+            raise ValueError("quantity must be positive")
+        try:
+            fee = fee_rate(order.get("fee_rate", order.get("fee_tier", DEFAULT_FEE_TIER)))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("unknown fee_tier / bad fee_rate")
+        symbol = order.get("symbol")
+        if symbol is not None and not isinstance(symbol, str):
+            raise ValueError("symbol must be a string")
+        try:
+            price = float(order["order_price"]) if order.get("order_price") is not None else math.nan
+        except (TypeError, ValueError):
+            raise ValueError("order_price must be a number")
+        return {
+            "symbol": symbol,
+            "side": side,
+            "quantity": quantity,
+            "fee": fee,
+            "order_price": price,
+        }
+
+    def quote_batch(self, orders):
+        """Quote a list of parsed orders, one vectorized call per symbol."""
+        results = [None] * len(orders)
+        groups = {}
+        default = self.default_symbol
+        for i, order in enumerate(orders):
+            groups.setdefault(self.resolve(order["symbol"]) if order["symbol"] else default, []).append(i)
+
+        for key, idx in groups.items():
+            state = self.markets.get(key)
+            if state is None or not state.order_book.is_ready():
+                for i in idx:
+                    results[i] = {"error": f"no order book for {key}", "status": 503}
+                continue
+            # One failing symbol must not fail the other orders in the batch.
+            try:
+                self._quote_group(key, state, [orders[i] for i in idx], idx, results)
+            except Exception as e:
+                print(f"[⚠️ Quote error] {key}: {e!r}")
+                for i in idx:
+                    results[i] = {"error": f"quote failed for {key}: {e}", "status": 500}
+        return results
+
+    def _quote_group(self, key, state, group, idx, results):
+        """Quote one symbol's orders into ``results`` at positions ``idx``."""
+        book = state.order_book
+        order_price = np.array([o["order_price"] for o in group])
+        order_price[np.isnan(order_price)] = book.mid()
+        quote = quote_costs(
+            book,
+            np.array([o["side"] for o in group]),
+            np.array([o["quantity"] for o in group]),
+            order_price,
+            fee=np.array([o["fee"] for o in group]),
+            volatility=state.market_stats.sigma,
+            cost_model=self.cost_model,
+            model_manager=self.model_manager,
+            impact_params=self.impact_params[key],
+        )
+        columns = {name: values.tolist() for name, values in quote.items()}
+        mid = book.mid()
+        for j, i in enumerate(idx):
+            results[i] = {
+                "symbol": key,
+                "mid": mid,
+                "exec_price": _finite(columns["exec_price"][j]),
+                "filled": columns["filled"][j],
+                "slippage": _finite(columns["slippage"][j]),
+                "fees": _finite(columns["fees"][j]),
+                "impact": columns["impact"][j],
+                "net_cost": _finite(columns["net_cost"][j]),
+                "maker_taker": _MAKER_TAKER.get(columns["maker_taker"][j]),
+                "predicted_cost": _finite(columns["predicted_cost"][j]),
+            }
+
+    async def quote(self, body):
+        """Quote a decoded request body: one order or a list of orders."""
+        orders = body if isinstance(body, list) else [body]
+        parsed = [self.parse_order(order) for order in orders]
+        results = await asyncio.gather(*(self.batcher.submit(order) for order in parsed))
+        return results if isinstance(body, list) else results[0]
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+    async def _route(self, method, path, body):
+        if path == "/quote":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                result = await self.quote(json.loads(body))
+            except ValueError as e:  # includes JSONDecodeError
+                return 400, {"error": str(e)}
+            except Exception as e:
+                print(f"[⚠️ Quote error] {e!r}")
+                return 500, {"error": f"internal error: {e}"}
+            if isinstance(result, dict) and "error" in result:
+                return result.get("status", 500), result
+            return 200, result
+        if path == "/health":
+            return 200, {
+                "markets": {key: state.order_book.is_ready() for key, state in self.markets.items()},
+                "feeds": dict(self.feed_manager.status) if self.feed_manager else {},
+            }
+        if path == "/metrics":
+            return 200, {"batcher": self.batcher.snapshot(), "latency": LATENCY.snapshot()}
+        return 404, {"error": f"no route {path}"}
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                status, payload = await self._route(method, path, body)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}"
+                    f"\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            # Dropped connection or a request we cannot parse: close it.
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """Start the HTTP listener and the feeds; returns the bound port."""
+        self.server = await asyncio.start_server(self._handle_client, host, port)
+        if self.feed_manager is not None:
+            self._feeds_task = asyncio.create_task(self.feed_manager.run())
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self, host="127.0.0.1", port=8080):
+        port = await self.start(host, port)
+        print(f"💱 Quote service on http://{host}:{port}/quote "
+              f"(window={self.batcher.window * 1000:g}ms, max_batch={self.batcher.max_batch})")
+        async with self.server:
+            await self.server.serve_forever()
+
+
+async def _read_request(reader):
+    """Read one HTTP/1.1 request; returns (method, path, body, keep_alive) or None on EOF."""
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, version = line.decode("latin-1").split()
+    length = 0
+    keep_alive = version == "HTTP/1.1"
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection":
+            keep_alive = value.strip().lower() == "keep-alive"
+    body = await reader.readexactly(length) if length else b""
+    return method, path, body, keep_alive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless cost-quote HTTP service.")
+    parser.add_argument("--feeds", nargs="+", default=[WS_URL], metavar="VENUE:SYMBOL")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--window-ms", type=float, default=2.0, help="micro-batching window")
+    parser.add_argument("--max-batch", type=int, default=1024)
+    parser.add_argument("--cost-model", default="cost_model.pkl", help="pickle, npz artifact or artifact dir")
+    parser.add_argument("--models", default="maker_taker_model.pkl", help="maker/taker pickle, artifact or dir")
+    parser.add_argument("--impact", default=None, help="artifact dir with calibrated impact parameters")
+    args = parser.parse_args()
+
+    from cost_model import CostRegressionModel
+    from models import ModelManager
+
+    cost_model = CostRegressionModel(args.cost_model) if os.path.exists(args.cost_model) else None
+    model_manager = ModelManager(args.models) if os.path.exists(args.models) else None
+    service = QuoteService([FeedSpec.parse(f) for f in args.feeds], cost_model, model_manager,
+                           window=args.window_ms / 1000, max_batch=args.max_batch, impact_dir=args.impact)
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+# replay.py
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+
+from decoders import DECODERS
+from pipeline import is_incremental
+
+# One index entry per frame: receive time (ns since epoch), byte offset and
+# length in the data file.
+INDEX_DTYPE = np.dtype([("ts_ns", "<i8"), ("offset", "<i8"), ("length", "<u4")])
+
+
+class FrameRecorder:
+    """
+    Append raw websocket frames with receive timestamps to an indexed log.
+
+    The log is two files: ``<path>.frames`` holds the concatenated frame
+    bytes and ``<path>.index`` a packed INDEX_DTYPE array, both append-only
+    so an interrupted capture stays readable.
+    """
+
+    def __init__(self, path, index_batch=1024):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._data = open(path + ".frames", "ab")
+        self._index = open(path + ".index", "ab")
+        self._offset = self._data.tell()
+        self._entries = np.zeros(index_batch, dtype=INDEX_DTYPE)
+        self._n = 0
+        self.count = 0
+
+    def write(self, frame, ts_ns=None):
+        if isinstance(frame, str):
+            frame = frame.encode()
+        if ts_ns is None:
+            ts_ns = time.time_ns()
+        self._data.write(frame)
+        self._entries[self._n] = (ts_ns, self._offset, len(frame))
+        self._offset += len(frame)
+        self._n += 1
+        self.count += 1
+        if self._n == len(self._entries):
+            self._flush_index()
+
+    def _flush_index(self):
+        # Data first, so every index entry points at bytes already on disk.
+        self._data.flush()
+        self._index.write(self._entries[:self._n].tobytes())
+        self._index.flush()
+        self._n = 0
+
+    def flush(self):
+        self._flush_index()
+
+    def close(self):
+        self._flush_index()
+        self._data.close()
+        self._index.close()
+
+
+class FrameLog:
+    """
+    Read-only, memory-mapped view of a log written by FrameRecorder.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index = self._map(path + ".index", INDEX_DTYPE)
+        self.data = self._map(path + ".frames", np.uint8)
+        self.timestamps = self.index["ts_ns"]
+
+    @staticmethod
+    def _map(file, dtype):
+        if os.path.getsize(file) < np.dtype(dtype).itemsize:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(file, dtype=dtype, mode="r")
+
+    def __len__(self):
+        return len(self.index)
+
+    def frame(self, i):
+        entry = self.index[i]
+        start = int(entry["offset"])
+        return self.data[start:start + int(entry["length"])].tobytes()
+
+    def seek(self, ts_ns):
+        """Position of the first frame received at or after ``ts_ns``."""
+        return int(np.searchsorted(self.timestamps, ts_ns, side="left"))
+
+    def last_snapshot(self, i):
+        """
+        Position of the last full snapshot frame at or before ``i`` (0 if
+        there is none): where a replay has to start for the book at frame
+        ``i`` of an incremental-update feed to be complete.
+        """
+        for j in range(min(i, len(self) - 1), 0, -1):
+            if not is_incremental(self.frame(j)):
+                return j
+        return 0
+
+    def iter_frames(self, start=0, stop=None):
+        """Yield ``(ts_ns, frame_bytes)`` for frames ``start`` .. ``stop``."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        ts = self.timestamps[start:stop].tolist()
+        offsets = self.index["offset"][start:stop].tolist()
+        lengths = self.index["length"][start:stop].tolist()
+        data = self.data
+        for t, off, n in zip(ts, offsets, lengths):
+            yield t, data[off:off + n].tobytes()
+
+    def duration_s(self):
+        if not len(self):
+            return 0.0
+        return (int(self.timestamps[-1]) - int(self.timestamps[0])) / 1e9
+
+
+def replay_into(trader, log, start_ts_ns=None, decode=json.loads):
+    """
+    Feed every frame of ``log`` into ``trader.process_orderbook`` as fast as
+    possible. Returns ``(frames, seconds)``.
+    """
+    start = log.seek(start_ts_ns) if start_ts_ns is not None else 0
+    process = trader.process_orderbook
+    n = 0
+    t0 = time.perf_counter()
+    for _, frame in log.iter_frames(start):
+        process(decode(frame))
+        n += 1
+    return n, time.perf_counter() - t0
+
+
+async def serve(log, host="127.0.0.1", port=8765, speed=1.0, start_ts_ns=None, loop_forever=False):
+    """
+    Serve ``log`` as a local websocket feed.
+
+    Each client gets the frames from ``start_ts_ns`` onwards, paced at
+    ``speed`` x the recorded rate (``None`` or 0 for unbounded).
+    """
+    import websockets
+
+    start = log.seek(start_ts_ns) if start_ts_ns is not None else 0
+
+    async def handler(websocket):
+        try:
+            await _stream(websocket)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _stream(websocket):
+        while True:
+            t0 = time.perf_counter()
+            first_ts = None
+            for i, (ts, frame) in enumerate(log.iter_frames(start)):
+                delay = 0.0
+                if speed:
+                    if first_ts is None:
+                        first_ts = ts
+                    delay = (ts - first_ts) / 1e9 / speed - (time.perf_counter() - t0)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                elif i % 64 == 0:
+                    # send() rarely suspends; let other clients run when behind pace.
+                    await asyncio.sleep(0)
+                await websocket.send(frame.decode())
+            if not loop_forever:
+                return
+
+    async with websockets.serve(handler, host, port):
+        print(f"📼 Replaying {len(log)} frames on ws://{host}:{port} (speed={speed or 'max'})")
+        await asyncio.Future()
+
+
+async def record(url, path):
+    """Capture a live feed into ``path`` until interrupted."""
+    import websockets
+
+    recorder = FrameRecorder(path)
+    try:
+        async with websockets.connect(url) as websocket:
+            print(f"⏺️ Recording {url} -> {path}")
+            while True:
+                recorder.write(await websocket.recv())
+    finally:
+        recorder.close()
+        print(f"💾 Recorded {recorder.count} frames.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay L2 websocket feeds.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("record", help="capture a live feed")
+    p.add_argument("path")
+    p.add_argument("--url", default=None)
+
+    p = sub.add_parser("serve", help="serve a capture as a local websocket")
+    p.add_argument("path")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--speed", type=float, default=1.0, help="0 for unbounded")
+    p.add_argument("--start", type=float, default=None, help="start time, unix seconds")
+    p.add_argument("--loop", action="store_true")
+
+    p = sub.add_parser("run", help="feed a capture into WebSocketTrader at max speed")
+    p.add_argument("path")
+    p.add_argument("--start", type=float, default=None, help="start time, unix seconds")
+    p.add_argument("--decoder", default="book", choices=DECODERS)
+    p.add_argument("--depth", type=int, default=50, help="book levels per side kept by --decoder book")
+
+    args = parser.parse_args()
+    start_ts = int(args.start * 1e9) if getattr(args, "start", None) is not None else None
+
+    try:
+        if args.command == "record":
+            from websocket_client import WS_URL
+            asyncio.run(record(args.url or WS_URL, args.path))
+        elif args.command == "serve":
+            asyncio.run(serve(FrameLog(args.path), args.host, args.port, args.speed or None,
+                              start_ts, args.loop))
+        else:
+            from websocket_client import WebSocketTrader
+            trader = WebSocketTrader(decoder=args.decoder, depth=args.depth)
+            try:
+                n, seconds = replay_into(trader, FrameLog(args.path), start_ts, decode=trader.pipeline.decode)
+            finally:
+                trader.close()
+            print(f"✅ Replayed {n} frames in {seconds:.2f}s ({n / max(seconds, 1e-9):,.0f} frames/s)")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# trade_buffer.py
+
+import time
+
+import numpy as np
+
+from journal import TRADE_DTYPE
+
+
+def _number(value):
+    """Float value for the running sums; missing or NaN counts as 0."""
+    if value is None:
+        return 0.0
+    value = float(value)
+    return value if value == value else 0.0
+
+
+class _Window:
+    """Running sums over the trades of the last ``seconds``."""
+
+    __slots__ = ("seconds", "tail", "count", "makers", "slippage", "qty", "notional", "cost")
+
+    def __init__(self, seconds, tail):
+        self.seconds = seconds
+        self.tail = tail  # sequence number of the oldest trade still counted
+        self.count = 0
+        self.makers = 0
+        self.slippage = 0.0
+        self.qty = 0.0
+        self.notional = 0.0
+        self.cost = 0.0
+
+    def add(self, sign, maker, slippage, qty, price):
+        self.count += sign
+        self.makers += sign * maker
+        self.slippage += sign * slippage
+        self.qty += sign * qty
+        self.notional += sign * qty * price
+        self.cost += sign * qty * slippage
+        if self.count == 0:
+            # Nothing left in the window: clear accumulated rounding error.
+            self.makers = 0
+            self.slippage = self.qty = self.notional = self.cost = 0.0
+
+    def summary(self):
+        n = self.count
+        return {
+            "trades": n,
+            "avg_slippage": self.slippage / n if n else 0.0,
+            "maker_fraction": self.makers / n if n else 0.0,
+            "vwap": self.notional / self.qty if self.qty else 0.0,
+            "cost_per_notional_bps": self.cost / self.notional * 1e4 if self.notional else 0.0,
+            "notional": self.notional,
+        }
+
+
+class TradeRingBuffer:
+    """
+    Fixed-capacity store of executed trades in a TRADE_DTYPE structured
+    array, with rolling TCA aggregates.
+
+    Rows are handed to ``journal`` in blocks (``spill_block`` trades, or
+    whatever is older than ``spill_interval`` seconds) and always before
+    the ring wraps over them, so memory stays at ``capacity`` rows while
+    the journal keeps the full history.
+
+    Each window in ``windows`` (seconds) keeps running sums that are
+    updated as trades enter and age out, so ``aggregates`` is O(1). A
+    window can never cover more than the last ``capacity`` trades.
+    Not thread-safe: append and read from the same thread, and call
+    ``spill_due`` from that thread every ``spill_interval`` or so, so the
+    trades of a quiet market still reach the journal.
+    """
+
+    def __init__(self, capacity=65536, windows=(10, 60, 300), journal=None, spill_block=None,
+                 spill_interval=1.0, dtype=TRADE_DTYPE, clock=time.monotonic):
+        self.capacity = capacity
+        self.journal = journal
+        self.spill_block = spill_block or max(1, capacity // 4)
+        self.spill_interval = spill_interval
+        self.dtype = dtype
+        self.clock = clock
+
+        self._rows = np.zeros(capacity, dtype=dtype)
+        self._times = np.zeros(capacity)
+        # Per-slot (maker, slippage, qty, price) as Python values, so window
+        # updates never read back from the structured array.
+        self._values = [None] * capacity
+        self._names = dtype.names
+        self._defaults = tuple(b"" if dtype[n].kind == "S" else np.nan for n in self._names)
+        self._total = 0    # trades ever appended; the next sequence number
+        self._spilled = 0  # trades handed to the journal
+        self._windows = {w: _Window(w, 0) for w in windows}
+
+    def __len__(self):
+        return min(self._total, self.capacity)
+
+    @property
+    def total(self):
+        return self._total
+
+    def append(self, trade):
+        """Store one trade dict (TRADE_DTYPE fields; missing ones are blank/NaN)."""
+        now = self.clock()
+        seq = self._total
+        if seq - self._spilled >= self.capacity:
+            self.spill()
+        i = seq % self.capacity
+        if seq >= self.capacity:
+            self._evict_slot(seq - self.capacity)
+
+        get = trade.get
+        row = []
+        for name, default in zip(self._names, self._defaults):
+            value = get(name)
+            row.append(default if value is None else value)
+        self._rows[i] = tuple(row)
+        self._times[i] = now
+        self._total = seq + 1
+
+        values = (
+            1 if str(get("maker_taker")).lower() == "maker" else 0,
+            _number(get("slippage")),
+            _number(get("qty")),
+            _number(get("price")),
+        )
+        self._values[i] = values
+        for window in self._windows.values():
+            window.add(1, *values)
+        self._expire(now)
+        self.spill_due(now)
+
+    def _evict_slot(self, seq):
+        """Drop trade ``seq`` from any window still counting it before its slot is reused."""
+        i = seq % self.capacity
+        for window in self._windows.values():
+            if window.tail == seq:
+                window.add(-1, *self._values[i])
+                window.tail = seq + 1
+
+    def _expire(self, now):
+        times = self._times
+        for window in self._windows.values():
+            cutoff = now - window.seconds
+            while window.tail < self._total and times[window.tail % self.capacity] < cutoff:
+                window.add(-1, *self._values[window.tail % self.capacity])
+                window.tail += 1
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def aggregates(self, window):
+        """
+        Average slippage, maker fraction, VWAP and cost per notional (bps)
+        over the last ``window`` seconds (one of ``windows``).
+        """
+        self._expire(self.clock())
+        return self._windows[window].summary()
+
+    def snapshot(self):
+        self._expire(self.clock())
+        return {w: window.summary() for w, window in self._windows.items()}
+
+    def recent(self, n=None):
+        """Copy of the last ``n`` trades (all held when None), oldest first."""
+        n = len(self) if n is None else min(n, len(self))
+        start = (self._total - n) % self.capacity
+        idx = (start + np.arange(n)) % self.capacity
+        return self._rows[idx]
+
+    # ------------------------------------------------------------------
+    # Journal spill
+    # ------------------------------------------------------------------
+    def spill_due(self, now=None):
+        """Spill once a block is full or the oldest unjournaled trade is ``spill_interval`` old."""
+        unspilled = self._total - self._spilled
+        if not unspilled:
+            return
+        if now is None:
+            now = self.clock()
+        if unspilled >= self.spill_block or now - self._times[self._spilled % self.capacity] >= self.spill_interval:
+            self.spill()
+
+    def spill(self):
+        """Hand every trade not yet journaled to the journal as one block."""
+        n = self._total - self._spilled
+        if not n:
+            return
+        if self.journal is not None:
+            start = self._spilled % self.capacity
+            stop = start + n
+            if stop <= self.capacity:
+                block = self._rows[start:stop].copy()
+            else:
+                block = np.concatenate((self._rows[start:], self._rows[:stop - self.capacity]))
+            self.journal.append_records(block)
+        self._spilled = self._total
+
+    def flush(self):
+        self.spill()
@@ -0,0 +1,283 @@
+# trainer.py
+
+import argparse
+import multiprocessing as mp
+import queue
+import time
+
+import numpy as np
+
+from artifacts import (
+    COST_ARTIFACT, MAKER_TAKER_ARTIFACT, ArtifactWatcher, latest_artifact, load_artifact, publish_artifact,
+)
+
+
+class RecursiveLeastSquares:
+    """
+    Exponentially-weighted recursive least squares over ``n_features`` plus
+    an intercept. Each update is O(n^2) with no refit, and ``forgetting``
+    < 1 lets the fit track a drifting market.
+    """
+
+    def __init__(self, n_features, forgetting=0.999, delta=1e3, coef=None, intercept=0.0, P=None):
+        n = n_features + 1
+        self.forgetting = forgetting
+        self.delta = delta
+        self.theta = np.zeros(n)
+        if coef is not None:
+            self.theta[:-1] = coef
+            self.theta[-1] = intercept
+        self.P = np.eye(n) * delta if P is None else np.array(P, dtype=float)
+        self.samples = 0
+
+    @property
+    def coef(self):
+        return self.theta[:-1].copy()
+
+    @property
+    def intercept(self):
+        return float(self.theta[-1])
+
+    def update(self, x, y):
+        x = np.append(np.asarray(x, dtype=float), 1.0)
+        Px = self.P @ x
+        gain = Px / (self.forgetting + x @ Px)
+        self.theta += gain * (y - x @ self.theta)
+        self.P = (self.P - np.outer(gain, Px)) / self.forgetting
+        # Directions the data never excites grow by 1/forgetting per step;
+        # cap them so a quiet feature cannot blow the covariance up.
+        if np.trace(self.P) > self.delta * len(x):
+            self.P *= self.delta * len(x) / np.trace(self.P)
+        self.samples += 1
+
+
+class OnlineLogistic:
+    """
+    Binary logistic regression on one feature, updated one labelled sample
+    at a time with a forgetting-weighted Newton step. Unseeded, the weak
+    ``prior`` keeps the step close to scale-free, so raw impact ratios
+    (~1e-4) need no normalisation. A model seeded with a non-zero ``coef``
+    starts as if it had seen ``seed_weight`` samples around its decision
+    boundary (|x| ~ 1/|coef|), so early samples refine the seed instead of
+    replacing it.
+    """
+
+    def __init__(self, coef=0.0, intercept=0.0, classes=(0, 1), forgetting=0.999, prior=1e-9, H=None,
+                 seed_weight=100.0):
+        self.theta = np.array([coef, intercept], dtype=float)
+        self.classes = np.asarray(classes)
+        self.forgetting = forgetting
+        if H is not None:
+            self.H = np.array(H, dtype=float)
+        elif coef:
+            # Fisher information of seed_weight samples at p = 0.5, |x| = 1/|coef|.
+            self.H = 0.25 * seed_weight * np.diag([1.0 / float(coef) ** 2, 1.0])
+        else:
+            self.H = np.eye(2) * prior
+        self.samples = 0
+
+    def update(self, x, label):
+        z = np.array([float(x), 1.0])
+        p = 1.0 / (1.0 + np.exp(-(z @ self.theta)))
+        y = 1.0 if label == self.classes[1] else 0.0
+        self.H = self.forgetting * self.H + max(p * (1 - p), 1e-6) * np.outer(z, z)
+        self.theta += np.linalg.solve(self.H, z * (y - p))
+        self.samples += 1
+
+
+def _cost_state(directory, seed, cold_start=False):
+    path = latest_artifact(directory, COST_ARTIFACT)
+    if path is not None:
+        arrays, _ = load_artifact(path)
+        return RecursiveLeastSquares(len(arrays["coef"]), coef=arrays["coef"],
+                                     intercept=float(arrays["intercept"]), P=arrays.get("P"))
+    if seed is None and cold_start:
+        return RecursiveLeastSquares(5)
+    if seed is None:
+        # A fit from zero coefficients would be hot-swapped into live
+        # pricing long before it means anything; only refine a real model.
+        print("ℹ️ No linear cost model to seed from; online cost training disabled.")
+        return None
+    coef, intercept = seed
+    return RecursiveLeastSquares(len(coef), coef=coef, intercept=intercept)
+
+
+def _maker_taker_state(directory, seed):
+    path = latest_artifact(directory, MAKER_TAKER_ARTIFACT)
+    if path is not None:
+        arrays, _ = load_artifact(path)
+        return OnlineLogistic(float(arrays["coef"]), float(arrays["intercept"]), arrays["classes"],
+                              H=arrays.get("H"))
+    if seed is not None:
+        return OnlineLogistic(*seed)
+    return OnlineLogistic()
+
+
+def _publish(directory, cost, maker_taker):
+    if cost is not None and cost.samples:
+        version = publish_artifact(directory, COST_ARTIFACT, {
+            "coef": cost.coef, "intercept": np.float64(cost.intercept), "P": cost.P,
+        }, {"samples": cost.samples})
+        print(f"📦 Published {COST_ARTIFACT} v{version} ({cost.samples} samples)")
+        cost.samples = 0
+    if maker_taker.samples:
+        version = publish_artifact(directory, MAKER_TAKER_ARTIFACT, {
+            "coef": np.float64(maker_taker.theta[0]), "intercept": np.float64(maker_taker.theta[1]),
+            "classes": maker_taker.classes, "H": maker_taker.H,
+        }, {"samples": maker_taker.samples})
+        print(f"📦 Published {MAKER_TAKER_ARTIFACT} v{version} ({maker_taker.samples} samples)")
+        maker_taker.samples = 0
+
+
+def train_loop(directory, samples, publish_every=256, publish_interval=5.0,
+               cost_seed=None, maker_taker_seed=None, cold_start=False):
+    """
+    Consume trade samples from ``samples`` until a ``None`` sentinel and
+    publish updated model artifacts every ``publish_every`` samples or
+    ``publish_interval`` seconds, whichever comes first.
+
+    A sample is a dict with ``quantity, price, side (1/0), volatility,
+    time_of_day`` (UTC hour / 24) and the realised ``cost`` (journal slippage x quantity,
+    the same target calibration.py --fit-cost and ``main`` fit). The cost
+    model is only trained when there is one to start from, a published
+    artifact or ``cost_seed``, unless ``cold_start`` (an offline fit that
+    publishes once at the end). Samples that also carry
+    ``ratio`` and a ground-truth ``label`` (1 maker, 0 taker) update the
+    maker/taker classifier.
+    """
+    cost = _cost_state(directory, cost_seed, cold_start)
+    maker_taker = _maker_taker_state(directory, maker_taker_seed)
+    pending = 0
+    deadline = time.monotonic() + publish_interval
+    while True:
+        try:
+            sample = samples.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            sample = ()
+        if sample is None:
+            break
+        if sample:
+            if cost is not None:
+                cost.update((sample["quantity"], sample["price"], sample["side"],
+                            sample["volatility"], sample["time_of_day"]), sample["cost"])
+            if "label" in sample:
+                maker_taker.update(sample["ratio"], sample["label"])
+            pending += 1
+        if pending >= publish_every or time.monotonic() >= deadline:
+            _publish(directory, cost, maker_taker)
+            pending = 0
+            deadline = time.monotonic() + publish_interval
+    _publish(directory, cost, maker_taker)
+
+
+class OnlineLearning:
+    """
+    Runs train_loop in a separate process and hot-swaps the live models
+    when it publishes.
+
+    ``submit`` is a non-blocking queue put; when the trainer falls behind,
+    samples are dropped (and counted) rather than slowing the caller.
+    Watcher threads load new artifacts off the tick path and swap them into
+    ``cost_model`` / ``model_manager`` with a single reference assignment.
+    With ``train=False`` only the watchers run, to follow models that
+    another process trains into ``directory``.
+    """
+
+    def __init__(self, directory, cost_model=None, model_manager=None, train=True, publish_every=256,
+                 publish_interval=5.0, poll_interval=1.0, queue_size=65536):
+        self.directory = directory
+        self.cost_model = cost_model
+        self.model_manager = model_manager
+        self.dropped = 0
+        self._queue = None
+        self._process = None
+
+        if train:
+            cost_seed = None
+            if cost_model is not None and cost_model.is_linear:
+                cost_seed = cost_model._linear
+            maker_taker_seed = None
+            compiled = getattr(model_manager, "compiled_model", None)
+            if compiled is not None:
+                maker_taker_seed = (compiled.w, compiled.b, compiled.classes)
+
+            ctx = mp.get_context("spawn")
+            self._queue = ctx.Queue(queue_size)
+            self._process = ctx.Process(
+                target=train_loop, name="online-trainer", daemon=True,
+                args=(directory, self._queue, publish_every, publish_interval, cost_seed, maker_taker_seed),
+            )
+            self._process.start()
+
+        self._watchers = []
+        if cost_model is not None:
+            self._watchers.append(ArtifactWatcher(directory, COST_ARTIFACT, self._swap_cost, poll_interval))
+        if model_manager is not None:
+            self._watchers.append(ArtifactWatcher(directory, MAKER_TAKER_ARTIFACT, self._swap_maker_taker,
+                                                  poll_interval))
+
+    def _swap_cost(self, arrays, meta):
+        self.cost_model.swap_linear(arrays["coef"], float(arrays["intercept"]), meta["version"])
+        print(f"🔄 Cost model -> v{meta['version']}")
+
+    def _swap_maker_taker(self, arrays, meta):
+        from models import CompiledLogisticModel
+
+        self.model_manager.swap_compiled(
+            CompiledLogisticModel(arrays["coef"], arrays["intercept"], arrays["classes"]), meta["version"])
+        print(f"🔄 Maker-Taker model -> v{meta['version']}")
+
+    def submit(self, sample):
+        if self._queue is None:
+            return
+        try:
+            self._queue.put_nowait(sample)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=10.0):
+        """Stop the trainer after it publishes what it has seen, then stop watching."""
+        if self._process is not None:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+        for watcher in self._watchers:
+            watcher.poll()
+            watcher.close()
+        if self.dropped:
+            print(f"⚠️ Online trainer dropped {self.dropped} samples.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the cost model on a trade journal and publish an artifact.")
+    parser.add_argument("journal", help="columnar journal directory (<prefix>-YYYYMMDD.cols)")
+    parser.add_argument("--out", default="models", help="artifact directory")
+    args = parser.parse_args()
+
+    from journal import read_columnar
+
+    cols = read_columnar(args.journal)
+    samples = queue.SimpleQueue()
+    ts = np.char.decode(np.asarray(cols["timestamp"]), "ascii", "ignore")
+    # Journals older than the slippage column: half the quoted spread.
+    slippage = cols["slippage"] if "slippage" in cols else cols["price"] * cols["impact_ratio"] / 2
+    for i in range(len(cols["price"])):
+        hour = ts[i][11:13]
+        samples.put({
+            "quantity": float(cols["qty"][i]),
+            "price": float(cols["price"][i]),
+            "side": 1.0 if cols["action"][i].lower() == b"buy" else 0.0,
+            "volatility": float(cols["volatility"][i]),
+            "time_of_day": int(hour) / 24 if hour.isdigit() else 0.5,
+            "cost": float(slippage[i] * cols["qty"][i]),
+        })
+    samples.put(None)
+    train_loop(args.out, samples, publish_every=len(cols["price"]) + 1, cold_start=True)
+
+
+if __name__ == "__main__":
+    main()
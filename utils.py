@@ -1,13 +1,11 @@
 # utils.py
 
-import time
+from latency import LATENCY
 
 def measure_latency(func):
-    """Decorator to measure latency for trade simulation"""
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        latency = (time.time() - start_time) * 1000  # Convert to milliseconds
-        print(f"Latency: {latency:.4f} ms")
-        return result
-    return wrapper
+    """Decorator to measure latency for trade simulation.
+
+    Records every call into the shared latency registry under the function's
+    qualified name (see latency.LATENCY.snapshot()) instead of printing.
+    """
+    return LATENCY.timed()(func)
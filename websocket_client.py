@@ -1,55 +1,119 @@
 #websocket_client.py
+import argparse
 import asyncio
-import websockets
-import json
 import time
 import os
-import csv
 from models import ModelManager
+from orderbook import OrderBook
+from estimators import MarketStats
+from journal import TradeJournal
+from trade_buffer import TradeRingBuffer
+from pipeline import FeedPipeline, CONFLATE
+from decoders import DECODERS, make_decoder
+from feeds import FeedManager, FeedSpec, run_sharded
+from latency import LATENCY, BOOK_UPDATE, MAKER_TAKER, TRADE_RECORD, SnapshotWriter
+from time import perf_counter_ns
 
-WS_URL = "wss://ws.gomarket-cpp.goquant.io/ws/l2-orderbook/okx/BTC-USDT-SWAP"
+_BOOK_H = LATENCY.histogram(BOOK_UPDATE)
+_MAKER_TAKER_H = LATENCY.histogram(MAKER_TAKER)
+_TRADE_RECORD_H = LATENCY.histogram(TRADE_RECORD)
+
+# TCA_WS_URL points the client (and GUI) at another feed, e.g. a local `replay.py serve`.
+WS_URL = os.environ.get("TCA_WS_URL", "wss://ws.gomarket-cpp.goquant.io/ws/l2-orderbook/okx/BTC-USDT-SWAP")
+
+class MarketState:
+    """
+    Per-symbol book and volatility state.
+    """
 
-class WebSocketTrader:
     def __init__(self):
-        self.model_manager = ModelManager()
-        self.executed_trades = []
+        self.order_book = OrderBook()
+        self.market_stats = MarketStats()
+
+
+class WebSocketTrader:
+    def __init__(self, journal=None, queue_policy=CONFLATE, queue_size=1024, consumers=1,
+                 url=WS_URL, recorder=None, feeds=None, report_interval=10.0, latency_snapshot=None,
+                 online_train=None, model_path="maker_taker_model.pkl", decoder="book", depth=50,
+                 cost_model_path="cost_model.pkl"):
+        self.feeds = list(feeds) if feeds else [FeedSpec.parse(url)]
+        self.recorder = recorder
+        self.report_interval = report_interval
+        self.model_manager = ModelManager(model_path)
+        self.journal = journal if journal is not None else TradeJournal()
+        # Bounded trade history with rolling TCA aggregates; spills to the journal.
+        self.trades = TradeRingBuffer(journal=self.journal)
+        self.markets = {}
+        # The tick path only reads the top of book, so by default only the
+        # top ``depth`` levels are parsed (decoders.BookDecoder).
+        self.pipeline = FeedPipeline(self.process_orderbook, policy=queue_policy,
+                                     maxsize=queue_size, consumers=consumers,
+                                     decode=make_decoder(decoder, depth), recorder=recorder)
+        self.feed_manager = FeedManager(self.feeds, self.pipeline)
+        self.latency_writer = SnapshotWriter(latency_snapshot) if latency_snapshot else None
+        # Executed trades feed a background trainer; new versions are swapped in, never fit inline.
+        self.online_learning = None
+        if online_train:
+            from cost_model import CostRegressionModel
+            from trainer import OnlineLearning
+            # The cost regression is refined from the current model, never fit from scratch.
+            cost_model = CostRegressionModel(cost_model_path) if os.path.exists(cost_model_path) else None
+            self.online_learning = OnlineLearning(online_train, cost_model=cost_model,
+                                                  model_manager=self.model_manager)
+
+    def market(self, exchange, symbol):
+        """Book and stats for one venue/symbol, created on first use."""
+        key = (exchange, symbol)
+        state = self.markets.get(key)
+        if state is None:
+            state = self.markets[key] = MarketState()
+        return state
 
     async def connect_websocket(self):
+        # Every feed runs its own reconnect loop on this event loop and feeds
+        # one bounded queue, so a slow tick shows up in pipeline metrics,
+        # not the socket.
+        tasks = [asyncio.create_task(self._spill_trades())]
+        if self.report_interval:
+            tasks.append(asyncio.create_task(self.pipeline.report(self.report_interval)))
+        try:
+            await self.feed_manager.run()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self.pipeline.stop()
+
+    async def _spill_trades(self):
+        # Runs on the tick thread (the ring buffer is not thread-safe) so
+        # trades reach the journal within spill_interval even without new ticks.
         while True:
-            try:
-                async with websockets.connect(WS_URL) as websocket:
-                    print("✅ Connected to WebSocket")
-                    while True:
-                        msg = await websocket.recv()
-                        data = json.loads(msg)
-                        self.process_orderbook(data)
-
-            except websockets.ConnectionClosed:
-                print("🔌 Connection closed, reconnecting in 2 seconds...")
-                await asyncio.sleep(2)
-
-            except Exception as e:
-                print(f"⚠️ Error: {e}")
-                await asyncio.sleep(1)
+            await asyncio.sleep(self.trades.spill_interval)
+            self.trades.spill_due()
 
     def process_orderbook(self, data):
         timestamp = data.get("timestamp")
         exchange = data.get("exchange")
         symbol = data.get("symbol")
-        asks = data.get("asks", [])
-        bids = data.get("bids", [])
 
-        if not asks or not bids:
+        state = self.market(exchange, symbol)
+        book = state.order_book
+        t0 = perf_counter_ns()
+        book.apply(data)
+        _BOOK_H.record(perf_counter_ns() - t0)
+        if not book.is_ready():
             print("⚠️ Orderbook missing data.")
             return
 
-        top_ask_price, top_ask_qty = asks[0]
-        top_bid_price, top_bid_qty = bids[0]
+        top_ask_price, top_ask_qty = float(book.ask_px[0]), float(book.ask_sz[0])
+        top_bid_price, top_bid_qty = float(book.bid_px[0]), float(book.bid_sz[0])
         mid_price = (top_ask_price + top_bid_price) / 2
+        state.market_stats.update(top_bid_price, top_ask_price)
         price_impact_ratio = abs(top_ask_price - top_bid_price) / mid_price
 
         # 🧠 Predict maker/taker
+        t0 = perf_counter_ns()
         prediction = self.model_manager.predict_maker_taker(price_impact_ratio)
+        _MAKER_TAKER_H.record(perf_counter_ns() - t0)
         maker_taker = "maker" if prediction == 1 else "taker"
 
         # 🧠 Strategy: Buy if spread < 0.1%
@@ -65,23 +129,77 @@ class WebSocketTrader:
                 "maker_taker": maker_taker,
                 "price": top_ask_price,
                 "qty": top_ask_qty,
-                "impact_ratio": price_impact_ratio
+                "impact_ratio": price_impact_ratio,
+                "volatility": state.market_stats.sigma,
+                "mid": mid_price,
+                "slippage": top_ask_price - mid_price,
             }
-            self.executed_trades.append(trade)
             print(f"🟢 Executed Trade: {trade}")
-            self.save_trade_to_csv(trade)
+            t0 = perf_counter_ns()
+            self.trades.append(trade)
+            _TRADE_RECORD_H.record(perf_counter_ns() - t0)
+            if self.online_learning is not None:
+                self.online_learning.submit({
+                    "quantity": top_ask_qty,
+                    "price": top_ask_price,
+                    "side": 1.0 if trade["action"] == "buy" else 0.0,
+                    "volatility": trade["volatility"],
+                    "time_of_day": time.gmtime().tm_hour / 24,
+                    "cost": trade["slippage"] * top_ask_qty,
+                })
         else:
             print("⏸️ Skipped trade due to spread")
 
-    def save_trade_to_csv(self, trade, filename="executed_trades.csv"):
-        file_exists = os.path.isfile(filename)
-        with open(filename, mode='a', newline='') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=trade.keys())
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(trade)
+    def close(self):
+        """Flush the trade journal, recorder, latency snapshot and trainer; call once on shutdown."""
+        self.trades.flush()
+        self.journal.close()
+        if self.online_learning is not None:
+            self.online_learning.close()
+        if self.latency_writer is not None:
+            self.latency_writer.close()
+        if self.recorder is not None:
+            self.recorder.close()
 
 # 🚀 Main entry point
 if __name__ == "__main__":
-    trader = WebSocketTrader()
-    asyncio.run(trader.connect_websocket())
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=WS_URL)
+    parser.add_argument("--feeds", nargs="+", metavar="VENUE:SYMBOL",
+                        help="subscribe to several feeds, e.g. okx:BTC-USDT-SWAP okx:ETH-USDT-SWAP")
+    parser.add_argument("--workers", type=int, default=1, help="shard feeds across worker processes")
+    parser.add_argument("--record", metavar="PATH", help="also capture raw frames for replay.py")
+    parser.add_argument("--latency-snapshot", metavar="PATH", help="write per-stage latency JSON every 5s")
+    parser.add_argument("--models", default="maker_taker_model.pkl", metavar="PATH",
+                        help="maker/taker model: a pickle, or an npz artifact / directory for a fast start")
+    parser.add_argument("--online-train", metavar="DIR",
+                        help="retrain models on executed trades in the background, publishing to DIR")
+    parser.add_argument("--cost-model", default="cost_model.pkl", metavar="PATH",
+                        help="cost regression the online trainer starts from (pickle, npz artifact or dir)")
+    parser.add_argument("--decoder", default="book", choices=DECODERS,
+                        help="frame decoder: book parses only the top --depth levels")
+    parser.add_argument("--depth", type=int, default=50, help="book levels per side kept by --decoder book")
+    args = parser.parse_args()
+
+    feeds = [FeedSpec.parse(f) for f in args.feeds] if args.feeds else None
+    if feeds and args.workers > 1:
+        if args.online_train or args.latency_snapshot:
+            parser.error("--online-train and --latency-snapshot need --workers 1")
+        run_sharded(feeds, args.workers, record=args.record,
+                    trader_kwargs={"decoder": args.decoder, "depth": args.depth, "model_path": args.models})
+        raise SystemExit(0)
+
+    recorder = None
+    if args.record:
+        from replay import FrameRecorder
+        recorder = FrameRecorder(args.record)
+    trader = WebSocketTrader(url=args.url, recorder=recorder, feeds=feeds,
+                             latency_snapshot=args.latency_snapshot, online_train=args.online_train,
+                             model_path=args.models, decoder=args.decoder, depth=args.depth,
+                             cost_model_path=args.cost_model)
+    try:
+        asyncio.run(trader.connect_websocket())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        trader.close()